@@ -0,0 +1,103 @@
+"""
+Benchmark: peak memory of the streaming CSV report.
+
+Generates a synthetic multi-year dataset and measures the tracemalloc peak of
+report_generator generate_csv for growing date ranges, next to loading the
+same range into a list (the previous approach). The streaming peak should
+stay flat: beyond the bounded storage read cache it does not grow with the
+number of trips.
+
+Usage:
+    python benchmarks/bench_csv_streaming.py
+    python benchmarks/bench_csv_streaming.py --years 3 --trips-per-month 500
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from bench_month_pruning import VEHICLE_ID, generate_dataset
+
+# Allowed peak growth from the shortest to the longest measured range
+MAX_GROWTH = 1.25
+
+
+def peak_kb(func, repeat: int = 3) -> float:
+    """Lowest peak traced allocation (KB) over several runs of func"""
+    peaks = []
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        finally:
+            tracemalloc.stop()
+    return min(peaks)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming CSV report memory")
+    parser.add_argument("--years", type=int, default=2, help="Years of data (default: 2)")
+    parser.add_argument(
+        "--trips-per-month", type=int, default=300, help="Trips per month (default: 300)"
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        os.environ["DATA_PATH"] = str(data_path)
+
+        from car_log_core.storage import atomic_write_json, clear_read_cache, rebuild_index
+        from report_generator.tools import generate_csv
+
+        count = generate_dataset(data_path, args.years, args.trips_per_month)
+        atomic_write_json(data_path / "vehicles" / f"{VEHICLE_ID}.json", {
+            "vehicle_id": VEHICLE_ID,
+            "vin": "WBAXX01234ABC5678",
+            "license_plate": "BA-456CD",
+        })
+        rebuild_index()
+        print(f"[DATA] {count} trips in {args.years * 12} month folders")
+
+        # Ranges ending with the last generated month (December 2025)
+        first_year = 2025 - args.years + 1
+        spans = [span for span in (3, 6, 12, 24, 36, 60) if span <= args.years * 12]
+        peaks = []
+
+        print(f"{'months':>8}{'trips':>8}{'streaming':>14}{'as list':>14}")
+        for span in spans:
+            first_month = args.years * 12 - span
+            start_date = f"{first_year + first_month // 12}-{first_month % 12 + 1:02d}-01"
+            arguments = {
+                "start_date": start_date,
+                "end_date": "2025-12-31",
+                "business_only": False,
+                "output_filename": "bench.csv",
+            }
+
+            # First run builds manifests; measured runs then share the cache state
+            result = asyncio.run(generate_csv.execute(arguments))
+            clear_read_cache()
+            streaming = peak_kb(lambda: asyncio.run(generate_csv.execute(arguments)))
+            as_list = peak_kb(
+                lambda: generate_csv.load_trips_in_range(start_date, arguments["end_date"])
+            )
+            peaks.append(streaming)
+            print(f"{span:>8}{result['trip_count']:>8}{streaming:>12.0f}KB{as_list:>12.0f}KB")
+
+    if peaks[-1] > peaks[0] * MAX_GROWTH:
+        print(f"streaming peak grew more than {MAX_GROWTH}x with the range")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
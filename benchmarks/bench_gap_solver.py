@@ -0,0 +1,87 @@
+"""
+Benchmark: gap-filling solvers for reconstruction proposals.
+
+Generates synthetic matched templates (5-400 km, some round trips) and times
+the optimal knapsack solver against greedy for a range of gap distances,
+reporting coverage of each. The optimal solver should stay under 50 ms for
+100 templates and a 5,000 km gap.
+
+Usage:
+    python benchmarks/bench_gap_solver.py
+    python benchmarks/bench_gap_solver.py --templates 200 --gaps 820 5000 10000
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from bench_month_pruning import best_of
+
+from trip_reconstructor.gap_solver import solve_gap
+
+TARGET_MS = 50
+
+
+def generate_matches(count: int, seed: int = 42) -> list:
+    """Matched templates sorted by confidence, as match_templates produces them"""
+    rng = random.Random(seed)
+    matches = [
+        {
+            "template_id": f"tmpl-{i}",
+            "template_name": f"Route {i}",
+            "confidence_score": round(rng.uniform(70, 100), 2),
+            "template": {
+                "distance_km": round(rng.uniform(5, 400), 1),
+                "is_round_trip": rng.random() < 0.3,
+            },
+        }
+        for i in range(count)
+    ]
+    matches.sort(key=lambda m: m["confidence_score"], reverse=True)
+    return matches
+
+
+def coverage(allocation) -> float:
+    """Kilometers covered by an allocation"""
+    return sum(num * distance for _, num, distance in allocation)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark gap-filling solvers")
+    parser.add_argument("--templates", type=int, default=100, help="Templates (default: 100)")
+    parser.add_argument(
+        "--gaps", type=float, nargs="+", default=[500, 820, 2000, 5000],
+        help="Gap distances in km (default: 500 820 2000 5000)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args(argv)
+
+    matches = generate_matches(args.templates)
+    slow = False
+
+    print(f"{'gap km':>8}{'optimal':>12}{'covered':>10}{'greedy':>12}{'covered':>10}")
+    for gap in args.gaps:
+        # Large budget so the timing reflects the solver, not the fallback
+        optimal, _ = solve_gap(gap, matches, "optimal", time_budget_ms=10_000)
+        greedy, _ = solve_gap(gap, matches, "greedy")
+        optimal_ms = best_of(
+            lambda: solve_gap(gap, matches, "optimal", time_budget_ms=10_000), args.repeat
+        )
+        greedy_ms = best_of(lambda: solve_gap(gap, matches, "greedy"), args.repeat)
+        slow = slow or optimal_ms > TARGET_MS
+        print(
+            f"{gap:>8.0f}{optimal_ms:>10.1f}ms{coverage(optimal):>10.1f}"
+            f"{greedy_ms:>10.1f}ms{coverage(greedy):>10.1f}"
+        )
+
+    if slow:
+        print(f"optimal solver exceeded {TARGET_MS} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Benchmark: list_trips latency per JSON codec and on-disk style.
+
+For each style (pretty, compact) a synthetic dataset is written, then
+list_trips is timed with every installed codec (stdlib json, orjson, ujson).
+The read cache is disabled so every run parses files.
+
+Usage:
+    python benchmarks/bench_json_codecs.py
+    python benchmarks/bench_json_codecs.py --years 2 --trips-per-month 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from bench_month_pruning import best_of, generate_dataset
+
+from car_log_core import json_codec, storage
+from car_log_core.tools import list_trips
+
+
+def rewrite_dataset(data_path: Path) -> int:
+    """Re-encode every trip file with the current codec/style; return total bytes"""
+    total = 0
+    for month_folder in storage.iter_month_folders(data_path / "trips"):
+        items = [
+            (trip_file, storage.read_json(trip_file))
+            for trip_file in storage.list_json_files(month_folder)
+        ]
+        storage.atomic_write_json_batch(items)
+        total += sum(trip_file.stat().st_size for trip_file, _ in items)
+    storage.rebuild_index()
+    return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs")
+    parser.add_argument("--years", type=int, default=1, help="Years of data (default: 1)")
+    parser.add_argument(
+        "--trips-per-month", type=int, default=100, help="Trips per month (default: 100)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args(argv)
+
+    codecs = [name for name in ("json", "orjson", "ujson") if name in json_codec._CODECS]
+    os.environ[storage.READ_CACHE_SIZE_ENV] = "0"
+
+    print(f"{'style':<10}{'codec':<10}{'size':>10}{'list_trips':>14}{'limit=500':>12}")
+    for style in json_codec.JSON_STYLES:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp)
+            os.environ["DATA_PATH"] = str(data_path)
+            os.environ[json_codec.JSON_STYLE_ENV] = style
+            os.environ[json_codec.JSON_CODEC_ENV] = "json"
+
+            generate_dataset(data_path, args.years, args.trips_per_month)
+            size = rewrite_dataset(data_path)
+
+            for codec in codecs:
+                os.environ[json_codec.JSON_CODEC_ENV] = codec
+                default_ms = best_of(lambda: asyncio.run(list_trips.execute({})), args.repeat)
+                full_ms = best_of(
+                    lambda: asyncio.run(list_trips.execute({"limit": 500})), args.repeat
+                )
+                print(
+                    f"{style:<10}{codec:<10}{size / 1024:>8.0f}kB"
+                    f"{default_ms:>12.1f}ms{full_ms:>10.1f}ms"
+                )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Benchmark: month-folder pruning for date-range queries.
+
+Generates a synthetic multi-year dataset (one folder per month) and times the
+three date-range readers against a full scan of every month folder:
+
+- car_log_core list_trips (start_date/end_date)
+- report_generator generate_csv.load_trips_in_range
+- validation validate_checkpoint_pair.list_trips_between
+
+Usage:
+    python benchmarks/bench_month_pruning.py
+    python benchmarks/bench_month_pruning.py --years 5 --trips-per-month 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+VEHICLE_ID = "00000000-0000-4000-8000-000000000001"
+
+
+def generate_dataset(data_path: Path, years: int, trips_per_month: int) -> int:
+    """Write synthetic trips (one folder per month) and return the trip count"""
+    rng = random.Random(42)
+    trips_dir = data_path / "trips"
+    start = datetime(2025 - years + 1, 1, 1)
+    count = 0
+
+    for month_index in range(years * 12):
+        month_start = datetime(start.year + month_index // 12, month_index % 12 + 1, 1)
+        month_folder = trips_dir / month_start.strftime("%Y-%m")
+        month_folder.mkdir(parents=True, exist_ok=True)
+
+        for _ in range(trips_per_month):
+            trip_start = month_start + timedelta(
+                days=rng.randint(0, 27), hours=rng.randint(6, 18)
+            )
+            distance = rng.randint(5, 450)
+            trip_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            trip = {
+                "trip_id": trip_id,
+                "vehicle_id": VEHICLE_ID,
+                "driver_name": "Ján Novák",
+                "trip_start_datetime": trip_start.isoformat(),
+                "trip_end_datetime": (trip_start + timedelta(hours=2)).isoformat(),
+                "trip_start_location": "Bratislava",
+                "trip_end_location": "Košice",
+                "distance_km": distance,
+                "purpose": rng.choice(["Business", "Personal"]),
+                "business_description": "Client meeting",
+            }
+            with open(month_folder / f"{trip_id}.json", "w", encoding="utf-8") as f:
+                json.dump(trip, f, indent=2, ensure_ascii=False)
+            count += 1
+
+    return count
+
+
+def full_scan_trips(trips_dir: Path, start: datetime, end: datetime) -> list:
+    """Pre-pruning behaviour: open every trip file in every month folder"""
+    from car_log_core.storage import list_json_files
+
+    trips = []
+    for month_folder in trips_dir.iterdir():
+        if not month_folder.is_dir():
+            continue
+        for trip_file in list_json_files(month_folder):
+            with open(trip_file, "r", encoding="utf-8") as f:
+                trip = json.load(f)
+            trip_dt = datetime.fromisoformat(trip["trip_start_datetime"])
+            if start <= trip_dt <= end:
+                trips.append(trip)
+    return trips
+
+
+def full_scan_manifests(start: datetime, end: datetime) -> list:
+    """Pre-pruning list_trips: read every month manifest"""
+    from car_log_core.storage import iter_manifest_rows
+
+    return [
+        row for row in iter_manifest_rows("trips")
+        if start <= datetime.fromisoformat(row["datetime"]) <= end
+    ]
+
+
+def best_of(func, repeat: int) -> float:
+    """Best wall-clock time of func() in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark month-folder pruning")
+    parser.add_argument("--years", type=int, default=5, help="Years of data (default: 5)")
+    parser.add_argument(
+        "--trips-per-month", type=int, default=100, help="Trips per month (default: 100)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        os.environ["DATA_PATH"] = str(data_path)
+
+        from car_log_core.storage import rebuild_index
+        from car_log_core.tools import list_trips
+        from report_generator.tools.generate_csv import load_trips_in_range
+        from validation.tools.validate_checkpoint_pair import list_trips_between
+
+        count = generate_dataset(data_path, args.years, args.trips_per_month)
+        rebuild_index()
+        print(f"[DATA] {count} trips in {args.years * 12} month folders")
+
+        # Query the most recent month only
+        start = datetime(2025, 11, 1)
+        end = datetime(2025, 11, 30, 23, 59, 59)
+        trips_dir = data_path / "trips"
+
+        cases = [
+            (
+                "list_trips",
+                lambda: full_scan_manifests(start, end),
+                lambda: asyncio.run(list_trips.execute({
+                    "start_date": "2025-11-01",
+                    "end_date": "2025-11-30",
+                    "limit": 500,
+                })),
+            ),
+            (
+                "load_trips_in_range",
+                lambda: full_scan_trips(trips_dir, start, end),
+                lambda: load_trips_in_range("2025-11-01", "2025-11-30"),
+            ),
+            (
+                "list_trips_between",
+                lambda: full_scan_trips(trips_dir, start, end),
+                lambda: list_trips_between(
+                    VEHICLE_ID, "2025-11-01T00:00:00", "2025-11-30T23:59:59"
+                ),
+            ),
+        ]
+
+        print(f"{'reader':<22}{'full scan':>12}{'pruned':>12}{'speedup':>10}")
+        for name, baseline, pruned in cases:
+            full_ms = best_of(baseline, args.repeat)
+            pruned_ms = best_of(pruned, args.repeat)
+            print(
+                f"{name:<22}{full_ms:>10.1f}ms{pruned_ms:>10.1f}ms"
+                f"{full_ms / pruned_ms:>9.1f}x"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
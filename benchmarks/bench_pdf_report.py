@@ -0,0 +1,100 @@
+"""
+Benchmark: PDF report render time and peak memory.
+
+Generates a synthetic year of trips (10,000 by default) and times
+report_generator generate_pdf for growing date ranges, with the tracemalloc
+peak of each range (measured in a separate run, since tracing slows
+rendering down). Trips are never held in memory; the remaining growth is
+the compressed page content reportlab keeps until the file is saved.
+Requires reportlab.
+
+Usage:
+    python benchmarks/bench_pdf_report.py
+    python benchmarks/bench_pdf_report.py --trips-per-month 2000
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from bench_month_pruning import VEHICLE_ID, generate_dataset
+
+# Annual report budget
+MAX_SECONDS = 10.0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF report rendering")
+    parser.add_argument(
+        "--trips-per-month", type=int, default=834, help="Trips per month (default: 834)"
+    )
+    args = parser.parse_args(argv)
+
+    from report_generator.tools import generate_pdf
+
+    if generate_pdf.canvas is None:
+        print("reportlab not installed (pip install reportlab)")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        os.environ["DATA_PATH"] = str(data_path)
+
+        from car_log_core.storage import atomic_write_json, rebuild_index
+
+        count = generate_dataset(data_path, 1, args.trips_per_month)
+        atomic_write_json(data_path / "vehicles" / f"{VEHICLE_ID}.json", {
+            "vehicle_id": VEHICLE_ID,
+            "vin": "WBAXX01234ABC5678",
+            "license_plate": "BA-456CD",
+        })
+        rebuild_index()
+        print(f"[DATA] {count} trips in 12 month folders")
+
+        # Fonts and page template are loaded on first use, once per process
+        start = time.perf_counter()
+        generate_pdf.get_page_template()
+        print(f"[SETUP] fonts and page template: {time.perf_counter() - start:.3f}s")
+
+        print(f"{'months':>8}{'trips':>8}{'pages':>8}{'seconds':>10}{'peak':>12}")
+        elapsed = 0.0
+        for months in (1, 3, 6, 12):
+            arguments = {
+                "start_date": "2025-01-01",
+                "end_date": f"2025-{months:02d}-28",
+                "business_only": False,
+                "output_filename": "bench.pdf",
+            }
+            start = time.perf_counter()
+            result = asyncio.run(generate_pdf.execute(arguments))
+            elapsed = time.perf_counter() - start
+
+            # Tracing slows rendering down, so memory is a separate run
+            gc.collect()
+            tracemalloc.start()
+            try:
+                asyncio.run(generate_pdf.execute(arguments))
+                peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            finally:
+                tracemalloc.stop()
+            print(
+                f"{months:>8}{result['trip_count']:>8}{result['page_count']:>8}"
+                f"{elapsed:>9.2f}s{peak_kb:>10.0f}KB"
+            )
+
+    if elapsed > MAX_SECONDS:
+        print(f"annual report took longer than {MAX_SECONDS:.0f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
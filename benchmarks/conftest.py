@@ -0,0 +1,170 @@
+"""
+pytest configuration for the benchmark suite.
+
+Latency tests use the pytest-benchmark `benchmark` fixture; without the plugin
+they are skipped and the memory checks still run. Peak memory (tracemalloc)
+is machine-independent and always compared with the committed baselines in
+baselines/memory.json.
+
+Latency depends on the machine, so its gate is opt-in: with --latency-gate
+each run is compared with the latency baseline of its variant in
+baselines/latency (one folder per platform/Python, as pytest-benchmark names
+them) and fails when a mean is more than 25% slower. Use it on a pinned
+runner whose baselines are committed; explicit --benchmark-storage and
+--benchmark-compare options take precedence.
+
+Baselines are grouped by variant: "numpy", or "python" when NumPy is missing
+or hidden with --without-numpy. --update-baseline rewrites the memory
+baselines of the variant from the current run, and with --latency-gate the
+latency baseline of this machine too:
+
+    python -m pytest benchmarks --update-baseline
+    python -m pytest benchmarks --update-baseline --without-numpy
+    python -m pytest benchmarks --latency-gate --update-baseline   # pinned runner
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+MEMORY_BASELINE_FILE = BASELINE_DIR / "memory.json"
+LATENCY_BASELINE_DIR = BASELINE_DIR / "latency"
+
+# Allowed growth over a memory baseline: relative, plus a fixed slack for tiny peaks
+DEFAULT_MEMORY_TOLERANCE = 0.25
+DEFAULT_MEMORY_SLACK_KB = 64
+
+# Allowed slowdown over a latency baseline (pytest-benchmark compare expression)
+DEFAULT_LATENCY_FAIL = "mean:25%"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baseline",
+        action="store_true",
+        help="Rewrite the memory (and with --latency-gate, latency) baselines of this variant",
+    )
+    parser.addoption(
+        "--latency-gate",
+        action="store_true",
+        help="Fail on means more than 25%% slower than benchmarks/baselines/latency "
+        "(for pinned runners)",
+    )
+    parser.addoption(
+        "--without-numpy",
+        action="store_true",
+        help="Hide NumPy to benchmark the pure-Python fallback (\"python\" variant)",
+    )
+
+
+try:
+    import pytest_benchmark  # noqa: F401
+    from pytest_benchmark.utils import get_machine_id, parse_compare_fail
+except ImportError:
+    pytest_benchmark = None
+
+    @pytest.fixture
+    def benchmark():
+        pytest.skip("pytest-benchmark not installed (pip install pytest-benchmark)")
+
+
+def benchmark_variant() -> str:
+    """Baseline variant of this run: "numpy" or "python"."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return "python"
+    return "numpy"
+
+
+def pytest_configure(config):
+    if config.getoption("--without-numpy"):
+        # Set before the benchmark modules are imported
+        sys.modules["numpy"] = None
+
+    # Runs before pytest-benchmark's own pytest_configure (trylast)
+    if pytest_benchmark is None or not config.getoption("--latency-gate"):
+        return
+    option = config.option
+    if option.benchmark_storage != "file://./.benchmarks":
+        return
+    option.benchmark_storage = f"file://{LATENCY_BASELINE_DIR}"
+    variant = benchmark_variant()
+
+    if config.getoption("--update-baseline"):
+        if not option.benchmark_save:
+            # Replace this platform's previous baseline of the variant
+            for old in LATENCY_BASELINE_DIR.glob(f"{get_machine_id()}/*_{variant}.json"):
+                old.unlink()
+            option.benchmark_save = variant
+    elif not option.benchmark_compare:
+        option.benchmark_compare = f"*_{variant}"
+        if not option.benchmark_compare_fail:
+            option.benchmark_compare_fail = [parse_compare_fail(DEFAULT_LATENCY_FAIL)]
+
+
+def peak_memory_kb(func) -> float:
+    """Peak traced allocation (KB) while running func once"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+@pytest.fixture(scope="session")
+def memory_baseline(request):
+    """Committed memory baselines; written back at the end with --update-baseline"""
+    if MEMORY_BASELINE_FILE.exists():
+        baseline = json.loads(MEMORY_BASELINE_FILE.read_text(encoding="utf-8"))
+    else:
+        baseline = {
+            "tolerance": DEFAULT_MEMORY_TOLERANCE,
+            "slack_kb": DEFAULT_MEMORY_SLACK_KB,
+            "peak_kb": {},
+        }
+    yield baseline
+
+    if request.config.getoption("--update-baseline"):
+        MEMORY_BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        MEMORY_BASELINE_FILE.write_text(
+            json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+
+
+@pytest.fixture
+def check_memory(request, memory_baseline):
+    """
+    Measure a call's peak memory and fail if it grew past its baseline.
+
+    Baselines are grouped by variant (e.g. "numpy" / "python" for the
+    optional batch path), since optional dependencies change allocations.
+    """
+    update = request.config.getoption("--update-baseline")
+
+    def check(variant: str, name: str, func) -> float:
+        peak_kb = peak_memory_kb(func)
+        peaks = memory_baseline["peak_kb"].setdefault(variant, {})
+        if update:
+            peaks[name] = round(peak_kb, 1)
+            return peak_kb
+
+        limit = peaks.get(name)
+        if limit is None:
+            pytest.skip(f"No {variant} memory baseline for {name} (run with --update-baseline)")
+        allowed = limit * (1 + memory_baseline["tolerance"]) + memory_baseline["slack_kb"]
+        assert peak_kb <= allowed, (
+            f"{name}: peak {peak_kb:.0f} KB exceeds baseline {limit:.0f} KB "
+            f"(+{memory_baseline['tolerance']:.0%}, +{memory_baseline['slack_kb']} KB)"
+        )
+        return peak_kb
+
+    return check
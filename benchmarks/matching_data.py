@@ -0,0 +1,153 @@
+"""
+Synthetic Slovak templates and gaps for the matching benchmarks.
+
+Templates connect real Slovak towns: endpoints are jittered a few km around
+the town centre, addresses carry diacritics, and distances are the straight
+line times a road factor. Half of the gaps start and end near the endpoints
+of one template (so it matches); the rest run between random towns.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from trip_reconstructor.matching import haversine_distance
+
+# (town, lat, lng)
+TOWNS = [
+    ("Bratislava", 48.1486, 17.1077),
+    ("Košice", 48.7164, 21.2611),
+    ("Prešov", 48.9985, 21.2339),
+    ("Žilina", 49.2231, 18.7394),
+    ("Nitra", 48.3069, 18.0864),
+    ("Banská Bystrica", 48.7363, 19.1462),
+    ("Trnava", 48.3774, 17.5872),
+    ("Trenčín", 48.8945, 18.0444),
+    ("Martin", 49.0636, 18.9214),
+    ("Poprad", 49.0614, 20.2980),
+    ("Prievidza", 48.7745, 18.6274),
+    ("Zvolen", 48.5762, 19.1371),
+    ("Považská Bystrica", 49.1214, 18.4206),
+    ("Michalovce", 48.7543, 21.9195),
+    ("Nové Zámky", 47.9859, 18.1620),
+    ("Komárno", 47.7631, 18.1203),
+]
+
+STREETS = [
+    "Hlavná", "Štúrova", "Námestie SNP", "Mlynská", "Železničná",
+    "Priemyselná", "Kpt. Nálepku", "Hviezdoslavova", "Škultétyho", "Dlhá",
+]
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Road distance per straight-line km
+ROAD_FACTOR = 1.25
+
+# Endpoint jitter around a town centre (degrees, ~3 km)
+TOWN_SPREAD_DEG = 0.03
+
+
+def _place(rng: random.Random, town: Tuple[str, float, float]) -> Tuple[float, float, str]:
+    """Random (lat, lng, address) in a town"""
+    name, lat, lng = town
+    return (
+        round(lat + rng.uniform(-TOWN_SPREAD_DEG, TOWN_SPREAD_DEG), 6),
+        round(lng + rng.uniform(-TOWN_SPREAD_DEG, TOWN_SPREAD_DEG), 6),
+        f"{rng.choice(STREETS)} {rng.randint(1, 120)}, {name}",
+    )
+
+
+def _road_km(start: Tuple[float, float, str], end: Tuple[float, float, str]) -> float:
+    """Approximate road distance between two places"""
+    return haversine_distance(start[0], start[1], end[0], end[1]) / 1000 * ROAD_FACTOR
+
+
+def generate_templates(count: int, seed: int = 42) -> List[Dict]:
+    """Templates between random town pairs (some without addresses or days)"""
+    rng = random.Random(seed)
+    templates = []
+    for i in range(count):
+        origin, destination = rng.sample(TOWNS, 2)
+        start, end = _place(rng, origin), _place(rng, destination)
+        template = {
+            "template_id": f"tmpl-{i:05d}",
+            "name": f"{origin[0]} - {destination[0]} ({i})",
+            "from_coords": {"lat": start[0], "lng": start[1]},
+            "from_address": start[2],
+            "to_coords": {"lat": end[0], "lng": end[1]},
+            "to_address": end[2],
+            "distance_km": round(_road_km(start, end), 1),
+            "is_round_trip": rng.random() < 0.3,
+            "typical_days": sorted(rng.sample(DAYS, rng.randint(1, 5)), key=DAYS.index),
+            "purpose": "business",
+        }
+        if rng.random() < 0.1:
+            del template["from_address"], template["to_address"]
+        if rng.random() < 0.2:
+            del template["typical_days"]
+        templates.append(template)
+    return templates
+
+
+def _checkpoint(when: datetime, place: Tuple[float, float, Optional[str]]) -> Dict:
+    """Gap checkpoint with GPS and address"""
+    return {
+        "datetime": when.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "location": {
+            "coords": {"latitude": place[0], "longitude": place[1]},
+            "address": place[2],
+        },
+    }
+
+
+def generate_gaps(count: int, templates: List[Dict], seed: int = 7) -> List[Dict]:
+    """gap_data as detect_gap builds it: half near a template, half between random towns"""
+    rng = random.Random(seed)
+    gaps = []
+    for _ in range(count):
+        if templates and rng.random() < 0.5:
+            template = rng.choice(templates)
+            start = (
+                template["from_coords"]["lat"] + rng.uniform(-0.002, 0.002),
+                template["from_coords"]["lng"] + rng.uniform(-0.002, 0.002),
+                template.get("from_address"),
+            )
+            end = (
+                template["to_coords"]["lat"] + rng.uniform(-0.002, 0.002),
+                template["to_coords"]["lng"] + rng.uniform(-0.002, 0.002),
+                template.get("to_address"),
+            )
+            trip_km = template["distance_km"] * (2 if template["is_round_trip"] else 1)
+            distance_km = trip_km * rng.randint(1, 4) * rng.uniform(0.95, 1.05)
+        else:
+            origin, destination = rng.sample(TOWNS, 2)
+            start, end = _place(rng, origin), _place(rng, destination)
+            distance_km = _road_km(start, end) * rng.randint(1, 6)
+
+        when = datetime(2025, 11, 3, 7) + timedelta(days=rng.randint(0, 27), hours=rng.randint(0, 10))
+        gaps.append({
+            "distance_km": round(distance_km, 1),
+            "start_checkpoint": _checkpoint(when, start),
+            "end_checkpoint": _checkpoint(when + timedelta(days=rng.randint(1, 7)), end),
+        })
+    return gaps
+
+
+def generate_matches(templates: List[Dict], seed: int = 3) -> List[Dict]:
+    """Matched-template entries (sorted by confidence) as match_templates builds them"""
+    rng = random.Random(seed)
+    matches = [
+        {
+            "template_id": template["template_id"],
+            "template_name": template["name"],
+            "confidence_score": round(rng.uniform(70, 100), 2),
+            "template": template,
+        }
+        for template in templates
+    ]
+    matches.sort(key=lambda m: m["confidence_score"], reverse=True)
+    return matches
@@ -0,0 +1,153 @@
+"""
+Benchmark suite: template matching latency and memory.
+
+Synthetic Slovak template sets (10 to 10,000 templates) and gaps from
+matching_data drive match_templates, calculate_hybrid_score and
+generate_reconstruction_proposal. Latency needs pytest-benchmark
+(pip install pytest-benchmark); with --latency-gate it fails on means more
+than 25% slower than baselines/latency. Peak memory is checked against
+baselines/memory.json on every run (see conftest).
+
+Usage:
+    python -m pytest benchmarks/test_matching_benchmarks.py
+    python -m pytest benchmarks/test_matching_benchmarks.py --without-numpy
+    python -m pytest benchmarks/test_matching_benchmarks.py --latency-gate
+
+    # Accept an intended memory change (per variant)
+    python -m pytest benchmarks/test_matching_benchmarks.py --update-baseline
+    python -m pytest benchmarks/test_matching_benchmarks.py --update-baseline --without-numpy
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from matching_data import generate_gaps, generate_matches, generate_templates
+
+from trip_reconstructor import matching, template_cache
+from trip_reconstructor.matching import batch_scoring_available, calculate_hybrid_score
+from trip_reconstructor.tools import match_templates
+from trip_reconstructor.tools.match_templates import (
+    generate_reconstruction_proposal,
+    get_day_of_week,
+)
+
+TEMPLATE_COUNTS = [10, 100, 1000, 10000]
+MATCHED_COUNTS = [10, 100, 1000]
+GAPS_PER_RUN = 20
+HYBRID_PAIRS = 1000
+
+# Memory baselines differ with the optional NumPy batch path
+VARIANT = "numpy" if batch_scoring_available() else "python"
+
+
+@pytest.fixture(scope="module")
+def template_sets():
+    return {count: generate_templates(count) for count in TEMPLATE_COUNTS}
+
+
+def clear_caches():
+    """Start cold: no compiled template sets, no memoized addresses"""
+    template_cache.clear_template_sets()
+    matching._address_components.cache_clear()
+
+
+def run_match_templates(templates, gaps):
+    """match_templates over every gap, as an MCP client would call it"""
+    async def run():
+        return [
+            await match_templates.execute({"gap_data": gap, "templates": templates})
+            for gap in gaps
+        ]
+    return asyncio.run(run())
+
+
+def hybrid_pairs(templates, gaps):
+    """(gap, template) argument pairs for calculate_hybrid_score"""
+    pairs = []
+    for i in range(HYBRID_PAIRS):
+        gap = gaps[i % len(gaps)]
+        template = templates[i % len(templates)]
+        location = gap["start_checkpoint"]["location"]
+        pairs.append({
+            "gap_coords": (location["coords"]["latitude"], location["coords"]["longitude"]),
+            "template_coords": (template["from_coords"]["lat"], template["from_coords"]["lng"]),
+            "gap_address": location["address"],
+            "template_address": template.get("from_address"),
+            "template_distance_km": template["distance_km"],
+            "gap_distance_km": gap["distance_km"],
+            "gap_day_of_week": get_day_of_week(gap["start_checkpoint"]["datetime"]),
+            "template_typical_days": template.get("typical_days"),
+        })
+    return pairs
+
+
+def run_hybrid_scores(pairs):
+    return [calculate_hybrid_score(**pair) for pair in pairs]
+
+
+def run_proposals(gaps, matches):
+    return [generate_reconstruction_proposal(gap, matches) for gap in gaps]
+
+
+@pytest.mark.parametrize("count", TEMPLATE_COUNTS)
+def test_match_templates_latency(benchmark, template_sets, count):
+    templates = template_sets[count]
+    gaps = generate_gaps(GAPS_PER_RUN, templates)
+    clear_caches()
+
+    results = benchmark(run_match_templates, templates, gaps)
+
+    assert all(result["success"] for result in results)
+    assert any(result["templates_matched"] for result in results)
+
+
+@pytest.mark.parametrize("count", TEMPLATE_COUNTS)
+def test_match_templates_memory(check_memory, template_sets, count):
+    templates = template_sets[count]
+    gaps = generate_gaps(GAPS_PER_RUN, templates)
+    clear_caches()
+
+    check_memory(VARIANT, f"match_templates[{count}]", lambda: run_match_templates(templates, gaps))
+
+
+def test_calculate_hybrid_score_latency(benchmark, template_sets):
+    templates = template_sets[1000]
+    pairs = hybrid_pairs(templates, generate_gaps(GAPS_PER_RUN, templates))
+
+    scores = benchmark(run_hybrid_scores, pairs)
+
+    assert len(scores) == HYBRID_PAIRS
+
+
+def test_calculate_hybrid_score_memory(check_memory, template_sets):
+    templates = template_sets[1000]
+    pairs = hybrid_pairs(templates, generate_gaps(GAPS_PER_RUN, templates))
+    clear_caches()
+
+    check_memory(VARIANT, "calculate_hybrid_score", lambda: run_hybrid_scores(pairs))
+
+
+@pytest.mark.parametrize("count", MATCHED_COUNTS)
+def test_generate_reconstruction_proposal_latency(benchmark, template_sets, count):
+    matches = generate_matches(template_sets[1000][:count])
+    gaps = generate_gaps(GAPS_PER_RUN, template_sets[1000])
+
+    proposals = benchmark(run_proposals, gaps, matches)
+
+    assert len(proposals) == GAPS_PER_RUN
+    assert any(proposal["has_proposal"] for proposal in proposals)
+
+
+@pytest.mark.parametrize("count", MATCHED_COUNTS)
+def test_generate_reconstruction_proposal_memory(check_memory, template_sets, count):
+    matches = generate_matches(template_sets[1000][:count])
+    gaps = generate_gaps(GAPS_PER_RUN, template_sets[1000])
+
+    check_memory(
+        VARIANT, f"generate_reconstruction_proposal[{count}]", lambda: run_proposals(gaps, matches)
+    )
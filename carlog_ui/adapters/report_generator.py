@@ -10,7 +10,10 @@ from .base import PythonMCPAdapter
 
 # Import tools from report-generator
 from mcp_servers.report_generator.tools import (
+    export_parquet,
     generate_csv,
+    generate_batch,
+    generate_pdf,
 )
 
 
@@ -20,10 +23,16 @@ class ReportGeneratorAdapter(PythonMCPAdapter):
 
     Provides:
     - generate_csv: Generate Slovak tax-compliant CSV report
+    - generate_reports_batch: One CSV per vehicle and month in one call
+    - generate_pdf: Generate PDF mileage log (summary page + trip table)
+    - export_parquet: Typed Parquet export for analytics
     """
 
     TOOLS: Dict[str, Any] = {
         "generate_csv": generate_csv,
+        "generate_reports_batch": generate_batch,
+        "generate_pdf": generate_pdf,
+        "export_parquet": export_parquet,
     }
 
     def __init__(self):
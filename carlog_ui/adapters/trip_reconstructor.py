@@ -12,6 +12,7 @@ from .base import PythonMCPAdapter
 from mcp_servers.trip_reconstructor.tools import (
     match_templates,
     calculate_template_completeness,
+    reconstruct_gaps,
 )
 
 
@@ -22,11 +23,13 @@ class TripReconstructorAdapter(PythonMCPAdapter):
     Provides:
     - match_templates: Match gap data against templates
     - calculate_template_completeness: Check template coverage
+    - reconstruct_gaps: Match every checkpoint gap of a vehicle in one call
     """
 
     TOOLS: Dict[str, Any] = {
         "match_templates": match_templates,
         "calculate_template_completeness": calculate_template_completeness,
+        "reconstruct_gaps": reconstruct_gaps,
     }
 
     def __init__(self):
@@ -178,9 +178,9 @@ class CodeExecutor:
                 "trip": ["create_trip", "create_trips_batch", "get_trip", "list_trips", "update_trip", "delete_trip"],
                 "template": ["create_template", "get_template", "list_templates", "update_template", "delete_template"],
                 "gap": ["detect_gap"],
-                "matching": ["match_templates", "calculate_template_completeness"],
+                "matching": ["match_templates", "calculate_template_completeness", "reconstruct_gaps"],
                 "validation": ["validate_checkpoint_pair", "validate_trip", "check_efficiency", "check_deviation_from_average"],
-                "report": ["generate_csv", "generate_pdf"],
+                "report": ["generate_csv", "generate_reports_batch", "generate_pdf", "export_parquet"],
                 "receipt": ["scan_qr_code", "fetch_receipt_data"],
                 "geo": ["geocode_address", "reverse_geocode", "calculate_route"],
             }
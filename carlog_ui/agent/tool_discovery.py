@@ -95,8 +95,8 @@ class ToolDiscovery:
                 name="matching",
                 description="GPS-first template matching algorithm (70% GPS, 30% address)",
                 server="trip-reconstructor",
-                tool_count=2,
-                tools=["match_templates", "calculate_template_completeness"],
+                tool_count=3,
+                tools=["match_templates", "calculate_template_completeness", "reconstruct_gaps"],
             ),
             "validation": ToolCategory(
                 name="validation",
@@ -109,8 +109,8 @@ class ToolDiscovery:
                 name="report",
                 description="CSV/PDF report generation with compliance fields",
                 server="report-generator",
-                tool_count=2,
-                tools=["generate_csv", "generate_pdf"],
+                tool_count=4,
+                tools=["generate_csv", "generate_reports_batch", "generate_pdf", "export_parquet"],
             ),
             "receipt": ToolCategory(
                 name="receipt",
@@ -277,6 +277,7 @@ class ToolDiscovery:
                     "start_date": {"type": "string", "format": "date"},
                     "end_date": {"type": "string", "format": "date"},
                     "limit": {"type": "integer", "default": 50},
+                    "after": {"type": "object", "description": "next_cursor of the previous page"},
                 },
             },
             returns={
@@ -285,6 +286,7 @@ class ToolDiscovery:
                     "success": {"type": "boolean"},
                     "checkpoints": {"type": "array"},
                     "count": {"type": "integer"},
+                    "next_cursor": {"type": "object"},
                 },
             },
             examples=[],
@@ -393,6 +395,7 @@ class ToolDiscovery:
                     "end_date": {"type": "string", "format": "date"},
                     "purpose": {"type": "string", "enum": ["Business", "Personal"]},
                     "limit": {"type": "integer", "default": 100},
+                    "after": {"type": "object", "description": "next_cursor of the previous page"},
                 },
             },
             returns={
@@ -400,6 +403,7 @@ class ToolDiscovery:
                 "properties": {
                     "success": {"type": "boolean"},
                     "trips": {"type": "array"},
+                    "next_cursor": {"type": "object"},
                     "summary": {
                         "type": "object",
                         "properties": {
@@ -475,17 +479,29 @@ class ToolDiscovery:
             server="trip-reconstructor",
             parameters={
                 "type": "object",
-                "required": ["gap_data", "templates"],
+                "required": ["gap_data"],
                 "properties": {
                     "gap_data": {"type": "object", "description": "Gap data from detect_gap"},
                     "templates": {"type": "array", "description": "Available templates"},
+                    "template_set": {
+                        "type": "string",
+                        "description": "Handle from an earlier response, instead of templates",
+                    },
                     "confidence_threshold": {"type": "number", "default": 70},
+                    "solver": {"type": "string", "enum": ["optimal", "greedy"], "default": "optimal"},
+                    "tolerance_km": {"type": "number", "default": 50},
+                    "prefilter": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["distance", "day"]},
+                        "default": [],
+                    },
                 },
             },
             returns={
                 "type": "object",
                 "properties": {
                     "success": {"type": "boolean"},
+                    "templates_pruned": {"type": "integer"},
                     "matches": {
                         "type": "array",
                         "items": {
@@ -501,6 +517,38 @@ class ToolDiscovery:
                     },
                     "proposals": {"type": "array"},
                     "coverage_percent": {"type": "number"},
+                    "template_set": {"type": "string"},
+                },
+            },
+            examples=[],
+        )
+
+        self._tools["reconstruct_gaps"] = ToolSchema(
+            name="reconstruct_gaps",
+            description="Match all checkpoint gaps of a vehicle in a date range in one call",
+            category="matching",
+            server="trip-reconstructor",
+            parameters={
+                "type": "object",
+                "required": ["vehicle_id"],
+                "properties": {
+                    "vehicle_id": {"type": "string", "format": "uuid"},
+                    "start_date": {"type": "string", "format": "date"},
+                    "end_date": {"type": "string", "format": "date"},
+                    "templates": {"type": "array", "description": "Default: all templates"},
+                    "confidence_threshold": {"type": "number", "default": 70},
+                    "solver": {"type": "string", "enum": ["optimal", "greedy"], "default": "optimal"},
+                    "prefilter": {"type": "array", "items": {"type": "string"}, "default": []},
+                    "workers": {"type": "integer", "minimum": 1},
+                },
+            },
+            returns={
+                "type": "object",
+                "properties": {
+                    "success": {"type": "boolean"},
+                    "gaps_found": {"type": "integer"},
+                    "gaps": {"type": "array"},
+                    "summary": {"type": "object"},
                 },
             },
             examples=[],
@@ -664,6 +712,88 @@ class ToolDiscovery:
             examples=[],
         )
 
+        self._tools["generate_pdf"] = ToolSchema(
+            name="generate_pdf",
+            description="Generate PDF report: summary page and paginated trip table (needs reportlab)",
+            category="report",
+            server="report-generator",
+            parameters={
+                "type": "object",
+                "required": ["start_date", "end_date"],
+                "properties": {
+                    "start_date": {"type": "string", "format": "date"},
+                    "end_date": {"type": "string", "format": "date"},
+                    "vehicle_id": {"type": "string"},
+                    "business_only": {"type": "boolean", "default": True},
+                    "output_filename": {"type": "string"},
+                },
+            },
+            returns={
+                "type": "object",
+                "properties": {
+                    "success": {"type": "boolean"},
+                    "output_file": {"type": "string"},
+                    "summary": {"type": "object"},
+                    "page_count": {"type": "integer"},
+                },
+            },
+            examples=[],
+        )
+
+        self._tools["export_parquet"] = ToolSchema(
+            name="export_parquet",
+            description="Export trips and checkpoints to typed Parquet, partitioned by vehicle and month (needs pyarrow)",
+            category="report",
+            server="report-generator",
+            parameters={
+                "type": "object",
+                "required": ["start_date", "end_date"],
+                "properties": {
+                    "start_date": {"type": "string", "format": "date"},
+                    "end_date": {"type": "string", "format": "date"},
+                    "vehicle_id": {"type": "string"},
+                    "business_only": {"type": "boolean", "default": False},
+                    "collections": {"type": "array", "items": {"type": "string", "enum": ["trips", "checkpoints"]}},
+                },
+            },
+            returns={
+                "type": "object",
+                "properties": {
+                    "success": {"type": "boolean"},
+                    "output_dir": {"type": "string"},
+                    "files": {"type": "array"},
+                    "row_counts": {"type": "object"},
+                },
+            },
+            examples=[],
+        )
+
+        self._tools["generate_reports_batch"] = ToolSchema(
+            name="generate_reports_batch",
+            description="Generate one CSV report per vehicle and month in one call",
+            category="report",
+            server="report-generator",
+            parameters={
+                "type": "object",
+                "required": ["vehicle_ids", "periods"],
+                "properties": {
+                    "vehicle_ids": {"type": "array", "items": {"type": "string"}},
+                    "periods": {"type": "array", "items": {"type": "string"}, "description": "YYYY-MM"},
+                    "business_only": {"type": "boolean", "default": True},
+                    "workers": {"type": "integer", "minimum": 1},
+                },
+            },
+            returns={
+                "type": "object",
+                "properties": {
+                    "success": {"type": "boolean"},
+                    "reports": {"type": "array"},
+                    "summary": {"type": "object"},
+                },
+            },
+            examples=[],
+        )
+
         # Photo tools
         self._tools["extract_metadata"] = ToolSchema(
             name="extract_metadata",
@@ -74,37 +74,20 @@ class DashboardView:
                     if dates:
                         stats.last_checkpoint_date = max(dates)[:10]
 
-            # Fetch trips
-            trip_params = {"limit": 1000}
+            # Fetch trip totals (list_trips summary comes from monthly rollups)
+            trip_params = {"limit": 1}
             if vehicle_id:
                 trip_params["vehicle_id"] = vehicle_id
             trips_result = await self.car_log_core.call_tool("list_trips", trip_params)
             if trips_result.success:
-                trips = trips_result.data.get("trips", [])
-                stats.trip_count = len(trips)
-
-                # Calculate totals
-                total_km = 0
-                efficiencies = []
-                business_count = 0
-
-                for trip in trips:
-                    distance = trip.get("distance_km", 0)
-                    if isinstance(distance, (int, float)):
-                        total_km += distance
-
-                    eff = trip.get("fuel_efficiency_l_per_100km")
-                    if isinstance(eff, (int, float)) and eff > 0:
-                        efficiencies.append(eff)
-
-                    if trip.get("purpose") == "Business":
-                        business_count += 1
-
-                stats.total_distance_km = total_km
-                if efficiencies:
-                    stats.avg_efficiency = sum(efficiencies) / len(efficiencies)
+                summary = trips_result.data.get("summary", {})
+                stats.trip_count = summary.get("total_trips", 0)
+                stats.total_distance_km = summary.get("total_distance_km", 0)
+                stats.avg_efficiency = summary.get("average_efficiency_l_per_100km", 0)
                 if stats.trip_count > 0:
-                    stats.business_trip_pct = (business_count / stats.trip_count) * 100
+                    stats.business_trip_pct = (
+                        summary.get("business_trips", 0) / stats.trip_count
+                    ) * 100
 
         except Exception as e:
             print(f"Error fetching dashboard stats: {e}")
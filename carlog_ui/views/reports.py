@@ -9,6 +9,8 @@ from pathlib import Path
 import os
 import gradio as gr
 
+from mcp_servers.report_generator.tools.generate_csv import is_report_stale
+
 
 class ReportsView:
     """
@@ -30,10 +32,12 @@ class ReportsView:
 
     def list_reports(self) -> List[Dict[str, Any]]:
         """
-        List available report files.
+        List available report files (including monthly subfolders).
 
         Returns:
-            List of report info dicts with name, date, size, path
+            List of report info dicts with name, date, size, path, and stale
+            (True if its trips changed since it was generated, None if it
+            could not be checked)
         """
         reports = []
         reports_path = Path(self.reports_dir)
@@ -42,13 +46,21 @@ class ReportsView:
             return reports
 
         try:
-            for file in reports_path.glob("*.csv"):
+            # Reports of the same period share one fingerprint computation
+            fingerprints = {}
+            for file in reports_path.rglob("*.csv"):
                 stat = file.stat()
+                try:
+                    stale = is_report_stale(file, fingerprints)
+                except Exception as e:
+                    print(f"Error checking report {file.name}: {e}")
+                    stale = None
                 reports.append({
                     "name": file.name,
                     "date": stat.st_mtime,
                     "size_kb": stat.st_size / 1024,
                     "path": str(file),
+                    "stale": stale,
                 })
 
             # Sort by date descending (newest first)
@@ -75,7 +87,8 @@ Generate your first report using the chat:
             from datetime import datetime
             date_str = datetime.fromtimestamp(report["date"]).strftime("%Y-%m-%d %H:%M")
             size_str = f"{report['size_kb']:.1f} KB"
-            lines.append(f"- **{report['name']}** - {date_str} ({size_str})")
+            stale_str = " - *outdated, regenerate*" if report.get("stale") else ""
+            lines.append(f"- **{report['name']}** - {date_str} ({size_str}){stale_str}")
 
         if len(reports) > 10:
             lines.append(f"\n*...and {len(reports) - 10} more reports*")
@@ -24,6 +24,8 @@ class TripsView:
             adapters: Dictionary of MCP adapters (needs "car-log-core")
         """
         self.car_log_core = adapters.get("car-log-core")
+        # Cursor for the page after the last fetch (None = no more trips)
+        self.next_cursor: Optional[Dict[str, str]] = None
 
     async def fetch_data(
         self,
@@ -32,6 +34,7 @@ class TripsView:
         date_to: Optional[str] = None,
         purpose: Optional[str] = None,
         limit: int = 50,
+        after: Optional[Dict[str, str]] = None,
     ) -> pd.DataFrame:
         """
         Fetch trips and convert to DataFrame.
@@ -42,6 +45,7 @@ class TripsView:
             date_to: End date filter ISO format (optional)
             purpose: "Business" or "Personal" (optional)
             limit: Max rows to return
+            after: Page cursor (self.next_cursor of the previous fetch)
 
         Returns:
             pandas DataFrame for gr.Dataframe component
@@ -59,6 +63,8 @@ class TripsView:
             params["end_date"] = date_to
         if purpose:
             params["purpose"] = purpose
+        if after:
+            params["after"] = after
 
         try:
             result = await self.car_log_core.call_tool("list_trips", params)
@@ -67,6 +73,7 @@ class TripsView:
                 return self._empty_dataframe()
 
             trips = result.data.get("trips", [])
+            self.next_cursor = result.data.get("next_cursor")
             return self._to_dataframe(trips)
 
         except Exception as e:
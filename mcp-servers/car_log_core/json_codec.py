@@ -0,0 +1,144 @@
+"""
+JSON codec selection for car-log-core storage.
+
+Two deployment settings (environment variables next to DATA_PATH):
+
+- CAR_LOG_JSON_CODEC: auto (default), orjson, ujson or json. "auto" uses
+  orjson when installed, then ujson, then the standard library.
+- CAR_LOG_JSON_STYLE: pretty (default, 2-space indent, easy to read and
+  diff by hand) or compact (no whitespace, smaller and faster).
+
+Files written by any codec/style are readable by every other one, so both
+settings can be changed at any time.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Tuple
+
+JSON_CODEC_ENV = "CAR_LOG_JSON_CODEC"
+JSON_STYLE_ENV = "CAR_LOG_JSON_STYLE"
+
+JSON_CODECS = ("auto", "orjson", "ujson", "json")
+JSON_STYLES = ("pretty", "compact")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# Codec: (dumps pretty, dumps compact, loads); dumps return UTF-8 bytes
+Codec = Tuple[Callable[[Any], bytes], Callable[[Any], bytes], Callable[[Any], Any]]
+
+
+def _ujson_loads(raw: Any) -> Any:
+    """ujson.loads raising the stdlib exception type callers already handle."""
+    try:
+        return ujson.loads(raw)
+    except ValueError as e:
+        raise json.JSONDecodeError(str(e), raw if isinstance(raw, str) else "", 0) from e
+
+
+_CODECS: Dict[str, Codec] = {
+    "json": (
+        lambda data: json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"),
+        lambda data: json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        json.loads,
+    ),
+}
+
+if orjson is not None:
+    _CODECS["orjson"] = (
+        lambda data: orjson.dumps(data, option=orjson.OPT_INDENT_2),
+        orjson.dumps,
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        orjson.loads,
+    )
+
+if ujson is not None:
+    _CODECS["ujson"] = (
+        lambda data: ujson.dumps(
+            data, indent=2, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8"),
+        lambda data: ujson.dumps(
+            data, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8"),
+        _ujson_loads,
+    )
+
+
+def get_codec_name() -> str:
+    """
+    Get the JSON codec in use.
+
+    Returns:
+        "orjson", "ujson" or "json"
+
+    Raises:
+        ValueError: If CAR_LOG_JSON_CODEC is unknown or names a codec that
+            is not installed
+    """
+    requested = os.getenv(JSON_CODEC_ENV, "auto").strip().lower() or "auto"
+    if requested not in JSON_CODECS:
+        raise ValueError(
+            f"Unknown JSON codec: {requested} "
+            f"({JSON_CODEC_ENV} must be one of {', '.join(JSON_CODECS)})"
+        )
+
+    if requested == "auto":
+        for name in ("orjson", "ujson", "json"):
+            if name in _CODECS:
+                return name
+
+    if requested not in _CODECS:
+        raise ValueError(f"JSON codec {requested} is not installed (pip install {requested})")
+    return requested
+
+
+def is_pretty() -> bool:
+    """
+    True when files are written indented (CAR_LOG_JSON_STYLE=pretty).
+
+    Raises:
+        ValueError: If CAR_LOG_JSON_STYLE is unknown
+    """
+    style = os.getenv(JSON_STYLE_ENV, "pretty").strip().lower() or "pretty"
+    if style not in JSON_STYLES:
+        raise ValueError(
+            f"Unknown JSON style: {style} "
+            f"({JSON_STYLE_ENV} must be one of {', '.join(JSON_STYLES)})"
+        )
+    return style == "pretty"
+
+
+def dumps(data: Any, pretty: Optional[bool] = None) -> bytes:
+    """
+    Encode data as UTF-8 JSON (non-ASCII characters kept as-is).
+
+    Args:
+        data: JSON-serializable data
+        pretty: Override CAR_LOG_JSON_STYLE (None = use setting)
+
+    Returns:
+        Encoded bytes
+    """
+    if pretty is None:
+        pretty = is_pretty()
+    dumps_pretty, dumps_compact, _ = _CODECS[get_codec_name()]
+    return dumps_pretty(data) if pretty else dumps_compact(data)
+
+
+def loads(raw: Any) -> Any:
+    """
+    Decode JSON from bytes or str.
+
+    Raises:
+        json.JSONDecodeError: If input is not valid JSON
+    """
+    return _CODECS[get_codec_name()][2](raw)
@@ -0,0 +1,199 @@
+"""
+Migrate car-log-core data between the JSON folder layout and SQLite.
+
+Neither direction deletes the source, so switching back is always possible.
+The target mirrors the source: records and documents missing from the
+source (e.g. deleted while the other backend was active) are removed from
+the target, so they do not come back after switching:
+
+    cd mcp-servers
+    python -m car_log_core.migrate --to sqlite   # folders -> DATA_PATH/car-log.db
+    python -m car_log_core.migrate --to json     # car-log.db -> folders
+
+Then set CAR_LOG_STORAGE_BACKEND=sqlite (or json) for the MCP servers.
+"""
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+from .storage import (
+    FLAT_COLLECTIONS,
+    INDEX_DIR_NAME,
+    MANIFEST_FILE_NAME,
+    RECORD_COLLECTIONS,
+    STORAGE_BACKEND_ENV,
+    _record_file,
+    _scan_record_files,
+    atomic_write_json,
+    delete_json_batch,
+    get_data_path,
+    get_sqlite_store,
+    read_json,
+    rebuild_index,
+)
+
+
+@contextmanager
+def _json_backend() -> Iterator[None]:
+    """Run storage calls against the JSON folder layout."""
+    previous = os.environ.get(STORAGE_BACKEND_ENV)
+    os.environ[STORAGE_BACKEND_ENV] = "json"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[STORAGE_BACKEND_ENV]
+        else:
+            os.environ[STORAGE_BACKEND_ENV] = previous
+
+
+def _document_files(data_path: Path) -> Iterator[Path]:
+    """JSON files in DATA_PATH that are not records or derived data."""
+    for file_path in sorted(data_path.rglob("*.json")):
+        parts = file_path.relative_to(data_path).parts
+        if parts[0] == INDEX_DIR_NAME or parts[0] in RECORD_COLLECTIONS:
+            continue
+        if file_path.name == MANIFEST_FILE_NAME:
+            continue
+        yield file_path
+
+
+def import_to_sqlite() -> Dict[str, int]:
+    """
+    Copy all records and documents from the folder layout into SQLite.
+
+    Database records and documents without a file are deleted.
+
+    Returns:
+        Number of copied records per collection, plus "documents" and
+        "removed" (deleted database records and documents)
+    """
+    data_path = get_data_path()
+    store = get_sqlite_store(data_path)
+    counts = {"removed": 0}
+
+    with _json_backend(), store.transaction():
+        on_disk = _scan_record_files(data_path)
+        for collection in RECORD_COLLECTIONS:
+            for record_id in store.ids(collection):
+                if record_id not in on_disk[collection]:
+                    store.delete(collection, record_id)
+                    counts["removed"] += 1
+
+            counts[collection] = 0
+            for record_id, folder in sorted(on_disk[collection].items()):
+                record = read_json(_record_file(data_path, collection, folder, record_id))
+                if record is None:
+                    continue
+                store.put(collection, folder, record_id, record)
+                counts[collection] += 1
+
+        documents = {
+            file_path.relative_to(data_path).as_posix(): file_path
+            for file_path in _document_files(data_path)
+        }
+        for path in store.document_paths():
+            if path not in documents:
+                store.delete_document(path)
+                counts["removed"] += 1
+
+        counts["documents"] = 0
+        for path, file_path in documents.items():
+            document = read_json(file_path)
+            if document is None:
+                continue
+            store.put_document(path, document)
+            counts["documents"] += 1
+
+    return counts
+
+
+def export_to_json() -> Dict[str, int]:
+    """
+    Write all SQLite records and documents into the folder layout.
+
+    Existing files with the same path are overwritten, and record files
+    without a database record (or in another folder than the database
+    record) and document files without a database document are deleted;
+    the ID index and month manifests are rebuilt afterwards.
+
+    Returns:
+        Number of written records per collection, plus "documents" and
+        "removed" (deleted record and document files)
+    """
+    data_path = get_data_path()
+    store = get_sqlite_store(data_path)
+    counts = {}
+
+    with _json_backend():
+        on_disk = _scan_record_files(data_path)
+        extra = []
+        for collection in RECORD_COLLECTIONS:
+            counts[collection] = 0
+            written = {}
+            for folder, record_id, record in store.iter_records(collection):
+                if collection in FLAT_COLLECTIONS:
+                    folder = ""
+                atomic_write_json(_record_file(data_path, collection, folder, record_id), record)
+                written[record_id] = folder
+                counts[collection] += 1
+
+            extra.extend(
+                _record_file(data_path, collection, folder, record_id)
+                for record_id, folder in on_disk[collection].items()
+                if written.get(record_id) != folder
+            )
+
+        counts["documents"] = 0
+        document_paths = set(store.document_paths())
+        for path in sorted(document_paths):
+            atomic_write_json(data_path / path, store.get_document(path))
+            counts["documents"] += 1
+        extra.extend(
+            file_path for file_path in _document_files(data_path)
+            if file_path.relative_to(data_path).as_posix() not in document_paths
+        )
+
+        counts["removed"] = delete_json_batch(extra)
+
+        rebuild_index()
+
+    return counts
+
+
+def main(argv=None) -> int:
+    """Run migrate command."""
+    parser = argparse.ArgumentParser(description="Migrate car-log-core storage backend")
+    parser.add_argument(
+        "--to",
+        choices=["sqlite", "json"],
+        required=True,
+        help="Target layout: sqlite (import folders) or json (export database)",
+    )
+    parser.add_argument(
+        "--data-path",
+        help="Data directory (default: DATA_PATH environment variable)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.data_path:
+        os.environ["DATA_PATH"] = args.data_path
+
+    print(f"[DATA] Data path: {get_data_path()}")
+
+    counts = import_to_sqlite() if args.to == "sqlite" else export_to_json()
+    removed = counts.pop("removed")
+    for name, count in counts.items():
+        print(f"{name}: copied {count}")
+    print(f"removed: {removed} records and documents missing from the source")
+
+    print(f"[OK] Migrated to {args.to} - set {STORAGE_BACKEND_ENV}={args.to}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
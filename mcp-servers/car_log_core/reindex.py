@@ -0,0 +1,58 @@
+"""
+Rebuild or verify car-log-core storage indexes.
+
+Run after editing record files by hand:
+
+    cd mcp-servers
+    python -m car_log_core.reindex            # rebuild
+    python -m car_log_core.reindex --verify   # report only, exit 1 if stale
+"""
+
+import argparse
+import os
+import sys
+
+from .storage import get_data_path, rebuild_index, verify_index
+
+
+def main(argv=None) -> int:
+    """Run reindex command."""
+    parser = argparse.ArgumentParser(description="Rebuild or verify car-log-core indexes")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Only compare index with record files (no changes)",
+    )
+    parser.add_argument(
+        "--data-path",
+        help="Data directory (default: DATA_PATH environment variable)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.data_path:
+        os.environ["DATA_PATH"] = args.data_path
+
+    print(f"[DATA] Data path: {get_data_path()}")
+
+    if args.verify:
+        report = verify_index()
+        for collection, info in report["collections"].items():
+            print(
+                f"{collection}: {info['records']} records, {info['indexed']} indexed, "
+                f"{len(info['missing'])} missing, {len(info['stale'])} stale"
+            )
+        if report["ok"]:
+            print("[OK] Index is up to date")
+            return 0
+        print("[WARN] Index is out of date - run without --verify to rebuild")
+        return 1
+
+    counts = rebuild_index()
+    for collection, count in counts.items():
+        print(f"{collection}: indexed {count} records")
+    print("[OK] Index rebuilt")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
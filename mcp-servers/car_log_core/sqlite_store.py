@@ -0,0 +1,337 @@
+"""
+SQLite storage backend for car-log-core.
+
+Selected with CAR_LOG_STORAGE_BACKEND=sqlite (see storage.py). All records
+live in one database file inside DATA_PATH:
+
+- records: one row per vehicle/checkpoint/trip, keyed by (collection, id),
+  with the month folder and indexed vehicle_id/datetime/purpose columns
+  next to the full JSON document
+- documents: any other JSON file (e.g. typical-destinations.json), keyed by
+  its path relative to DATA_PATH
+
+The database runs in WAL mode so readers never block the writer. The
+store's single connection is shared by all threads (asyncio executors, UI
+callbacks) and guarded by a reentrant lock: a transaction holds it until it
+commits, so other threads never interleave statements with it.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import json_codec
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    vehicle_id TEXT,
+    datetime TEXT,
+    purpose TEXT,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE INDEX IF NOT EXISTS idx_records_folder ON records (collection, folder);
+CREATE INDEX IF NOT EXISTS idx_records_vehicle ON records (collection, vehicle_id, datetime);
+CREATE INDEX IF NOT EXISTS idx_records_datetime ON records (collection, datetime);
+CREATE INDEX IF NOT EXISTS idx_records_purpose ON records (collection, purpose);
+
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+"""
+
+# Rows fetched per lock acquisition by iter_records
+ITER_BATCH_ROWS = 500
+
+
+def _encode(data: Dict[str, Any]) -> str:
+    """Compact JSON text for the doc columns."""
+    return json_codec.dumps(data, pretty=False).decode("utf-8")
+
+
+class SQLiteStore:
+    """Record and document storage in a single SQLite database"""
+
+    def __init__(self, db_path: Path, columns: Dict[str, Dict[str, str]]):
+        """
+        Open (and create if needed) the database.
+
+        Args:
+            db_path: Database file path
+            columns: Indexed/manifest columns per collection: column -> record field
+        """
+        self.db_path = Path(db_path)
+        self.columns = columns
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._depth = 0
+        self._lock = threading.RLock()
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group several writes into one commit (rolled back on error).
+
+        The connection lock is held for the whole transaction, so statements
+        of other threads run before or after it, never inside it.
+        """
+        with self._lock:
+            if self._depth:
+                # Nested: the outermost transaction commits
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+
+            self._depth = 1
+            try:
+                with self.conn:
+                    yield
+            finally:
+                self._depth = 0
+
+    def _fetchall(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        """Run a query under the connection lock and fetch all rows."""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _fetchone(self, sql: str, params: Tuple[Any, ...] = ()) -> Optional[Tuple[Any, ...]]:
+        """Run a query under the connection lock and fetch one row."""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    # -- records -----------------------------------------------------------
+
+    def _field(self, collection: str, column: str, data: Dict[str, Any]) -> Any:
+        """Value of an indexed column taken from a record."""
+        field = self.columns.get(collection, {}).get(column)
+        return data.get(field) if field else None
+
+    def put(self, collection: str, folder: str, record_id: str, data: Dict[str, Any]) -> None:
+        """Insert or replace a record."""
+        with self.transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO records "
+                "(collection, id, folder, vehicle_id, datetime, purpose, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    collection,
+                    record_id,
+                    folder,
+                    self._field(collection, "vehicle_id", data),
+                    self._field(collection, "datetime", data),
+                    self._field(collection, "purpose", data),
+                    _encode(data),
+                ),
+            )
+
+    def get(self, collection: str, record_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Get a record.
+
+        Returns:
+            (folder, data) or None if not found
+        """
+        row = self._fetchone(
+            "SELECT folder, doc FROM records WHERE collection = ? AND id = ?",
+            (collection, record_id),
+        )
+        if row is None:
+            return None
+        return row[0], json_codec.loads(row[1])
+
+    def delete(self, collection: str, record_id: str) -> bool:
+        """Delete a record; True if it existed."""
+        with self.transaction():
+            cursor = self.conn.execute(
+                "DELETE FROM records WHERE collection = ? AND id = ?",
+                (collection, record_id),
+            )
+        return cursor.rowcount > 0
+
+    def folders(self, collection: str) -> List[str]:
+        """Distinct month folders of a collection in ascending order."""
+        rows = self._fetchall(
+            "SELECT DISTINCT folder FROM records WHERE collection = ? ORDER BY folder",
+            (collection,),
+        )
+        return [row[0] for row in rows]
+
+    def ids(self, collection: str, folder: Optional[str] = None) -> List[str]:
+        """Record IDs of a collection, optionally limited to one folder."""
+        if folder is None:
+            rows = self._fetchall(
+                "SELECT id FROM records WHERE collection = ? ORDER BY id",
+                (collection,),
+            )
+        else:
+            rows = self._fetchall(
+                "SELECT id FROM records WHERE collection = ? AND folder = ? ORDER BY id",
+                (collection, folder),
+            )
+        return [row[0] for row in rows]
+
+    def count(self, collection: str) -> int:
+        """Number of records in a collection."""
+        return self._fetchone(
+            "SELECT COUNT(*) FROM records WHERE collection = ?", (collection,)
+        )[0]
+
+    def _select_rows(
+        self, collection: str, where: str, params: Tuple[Any, ...], order: str
+    ) -> List[Dict[str, Any]]:
+        """Manifest-style rows matching a WHERE clause (no full document decoding)."""
+        names = list(self.columns.get(collection, {}))
+        selects = []
+        for name in names:
+            if name in ("vehicle_id", "datetime", "purpose"):
+                selects.append(name)
+            else:
+                selects.append(f"json_extract(doc, '$.{self.columns[collection][name]}')")
+
+        sql = "SELECT id, folder"
+        if selects:
+            sql += ", " + ", ".join(selects)
+        sql += f" FROM records WHERE collection = ? AND {where} ORDER BY {order}"
+
+        result = []
+        for row in self._fetchall(sql, (collection, *params)):
+            entry = {"id": row[0], "folder": row[1]}
+            entry.update({
+                name: value for name, value in zip(names, row[2:]) if value is not None
+            })
+            result.append(entry)
+        return result
+
+    def rows(self, collection: str, folder: str) -> List[Dict[str, Any]]:
+        """
+        Manifest-style rows of one folder (no full document decoding).
+
+        Returns:
+            List of {"id", "folder", <column>: value} with None values omitted
+        """
+        return self._select_rows(collection, "folder = ?", (folder,), "id")
+
+    def vehicle_rows(self, collection: str, vehicle_id: str) -> List[Dict[str, Any]]:
+        """
+        Manifest-style rows of one vehicle across all folders (indexed lookup).
+
+        Returns:
+            List of {"id", "folder", <column>: value} ordered by datetime
+        """
+        return self._select_rows(collection, "vehicle_id = ?", (vehicle_id,), "datetime, id")
+
+    def referencing_ids(self, collection: str, fields: Tuple[str, ...], value: str) -> List[str]:
+        """IDs of records whose given fields (any of them) equal a value."""
+        conditions = [
+            "vehicle_id = ?" if field == "vehicle_id" else f"json_extract(doc, '$.{field}') = ?"
+            for field in fields
+        ]
+        rows = self._fetchall(
+            f"SELECT id FROM records WHERE collection = ? AND ({' OR '.join(conditions)}) "
+            "ORDER BY id",
+            (collection, *([value] * len(fields))),
+        )
+        return [row[0] for row in rows]
+
+    def trip_rollups(self) -> List[Dict[str, Any]]:
+        """
+        Per-(month, vehicle, purpose) trip totals computed by one GROUP BY.
+
+        Returns:
+            Rollup rows in the same shape as the JSON backend's rollup files
+        """
+        columns = self.columns["trips"]
+        distance = f"json_extract(doc, '$.{columns['distance_km']}')"
+        fuel = f"json_extract(doc, '$.{columns['fuel_liters']}')"
+        efficiency = f"json_extract(doc, '$.{columns['efficiency']}')"
+        known = f"({efficiency} AND {distance})"
+
+        rows = self._fetchall(
+            f"SELECT folder, vehicle_id, purpose, COUNT(*), TOTAL({distance}), TOTAL({fuel}), "
+            f"TOTAL(CASE WHEN {known} THEN {distance} END), "
+            f"TOTAL(CASE WHEN {known} THEN {efficiency} * {distance} END) "
+            "FROM records WHERE collection = 'trips' "
+            "GROUP BY folder, vehicle_id, purpose ORDER BY folder, vehicle_id, purpose"
+        )
+        return [
+            {
+                "month": row[0],
+                "vehicle_id": row[1],
+                "purpose": row[2],
+                "trips": row[3],
+                "distance_km": row[4],
+                "fuel_liters": row[5],
+                "efficiency_km": row[6],
+                "efficiency_weighted": row[7],
+            }
+            for row in rows
+        ]
+
+    def iter_records(self, collection: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Iterate (folder, id, data) of every record in a collection."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT folder, id, doc FROM records WHERE collection = ? ORDER BY folder, id",
+                (collection,),
+            )
+        while True:
+            # The lock is never held across a yield
+            with self._lock:
+                batch = cursor.fetchmany(ITER_BATCH_ROWS)
+            if not batch:
+                return
+            for folder, record_id, doc in batch:
+                yield folder, record_id, json_codec.loads(doc)
+
+    # -- documents ---------------------------------------------------------
+
+    def put_document(self, path: str, data: Dict[str, Any]) -> None:
+        """Insert or replace a document."""
+        with self.transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO documents (path, doc) VALUES (?, ?)",
+                (path, _encode(data)),
+            )
+
+    def get_document(self, path: str) -> Optional[Dict[str, Any]]:
+        """Get a document or None."""
+        row = self._fetchone(
+            "SELECT doc FROM documents WHERE path = ?", (path,)
+        )
+        return json_codec.loads(row[0]) if row else None
+
+    def delete_document(self, path: str) -> bool:
+        """Delete a document; True if it existed."""
+        with self.transaction():
+            cursor = self.conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+        return cursor.rowcount > 0
+
+    def document_paths(self, prefix: str = "") -> List[str]:
+        """Document paths, optionally below a directory prefix."""
+        if prefix:
+            rows = self._fetchall(
+                "SELECT path FROM documents WHERE substr(path, 1, ?) = ? ORDER BY path",
+                (len(prefix) + 1, prefix + "/"),
+            )
+        else:
+            rows = self._fetchall("SELECT path FROM documents ORDER BY path")
+        return [row[0] for row in rows]
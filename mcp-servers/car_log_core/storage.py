@@ -2,14 +2,141 @@
 Atomic file storage module for car-log-core.
 
 CRITICAL: Always use atomic write pattern to prevent file corruption.
+
+Record files are the source of truth. Two kinds of derived data speed up
+reads and are maintained by ``atomic_write_json`` / ``delete_json``:
+
+- ID index (``DATA_PATH/.index/ids``): record ID -> month folder, so lookups
+  do not have to walk every ``YYYY-MM`` folder.
+- Month manifests (``{YYYY-MM}/index.json``): filterable columns of every
+  record in the month, so listings do not have to parse every file.
+
+Both are hints only: stale entries fall back to the record files and are
+repaired on the fly (manifest rows carry the record file's mtime/size, so
+edits made outside the storage API are picked up too), and
+``python -m car_log_core.reindex`` rebuilds them after manual edits. Their
+read-modify-write is serialized by a lock file (``.index/lock``), since the
+MCP servers and the UI may share one DATA_PATH.
+
+With ``CAR_LOG_STORAGE_BACKEND=sqlite`` the same functions keep working on
+the same paths, but records and documents are stored in a SQLite database
+inside DATA_PATH instead (see sqlite_store.py). Paths then only name the
+record; use ``path_exists`` rather than ``Path.exists`` for data files.
+``python -m car_log_core.migrate`` converts between the two layouts.
 """
 
-import json
+import bisect
+import hashlib
+import heapq
+import logging
 import os
+import re
+import shutil
 import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
-from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timezone
+
+from . import json_codec
+from .sqlite_store import SQLiteStore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger("car-log-core")
+
+# Collections stored one file per record
+MONTHLY_COLLECTIONS = ("checkpoints", "trips")
+FLAT_COLLECTIONS = ("vehicles",)
+RECORD_COLLECTIONS = FLAT_COLLECTIONS + MONTHLY_COLLECTIONS
+
+# Derived data lives here; safe to delete, rebuilt by reindex
+INDEX_DIR_NAME = ".index"
+
+# Per-vehicle checkpoint timelines inside INDEX_DIR_NAME
+TIMELINE_DIR_NAME = "timelines"
+
+# Per-month trip rollups inside INDEX_DIR_NAME: one row per (vehicle, purpose)
+ROLLUP_DIR_NAME = "rollups"
+
+# Reverse references inside INDEX_DIR_NAME, one file per parent record:
+# (parent collection, child collection) -> child fields holding the parent ID
+REFERENCES_DIR_NAME = "refs"
+REFERENCES = {
+    ("vehicles", "checkpoints"): ("vehicle_id",),
+    ("vehicles", "trips"): ("vehicle_id",),
+    ("checkpoints", "trips"): ("start_checkpoint_id", "end_checkpoint_id"),
+}
+REFERENCING_COLLECTIONS = ("checkpoints", "trips")
+
+# Lock file inside INDEX_DIR_NAME serializing derived data updates
+LOCK_FILE_NAME = "lock"
+
+# Template set revision inside INDEX_DIR_NAME (SQLite: a document): a fresh
+# token on every template create/update/delete, so other servers can drop
+# compiled templates
+TEMPLATES_REVISION_FILE_NAME = "templates-revision.json"
+
+# Month folder naming (YYYY-MM); string order == chronological order
+MONTH_FOLDER_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+# Per-month manifest file (reserved name inside month folders)
+MANIFEST_FILE_NAME = "index.json"
+
+# Filterable columns kept in month manifests: column -> record field
+MANIFEST_COLUMNS = {
+    "trips": {
+        "vehicle_id": "vehicle_id",
+        "datetime": "trip_start_datetime",
+        "purpose": "purpose",
+        "distance_km": "distance_km",
+        "fuel_liters": "fuel_consumption_liters",
+        "efficiency": "fuel_efficiency_l_per_100km",
+    },
+    "checkpoints": {
+        "vehicle_id": "vehicle_id",
+        "datetime": "datetime",
+        "checkpoint_type": "checkpoint_type",
+        "odometer_km": "odometer_km",
+    },
+}
+
+# Storage backend selection (set next to DATA_PATH)
+STORAGE_BACKEND_ENV = "CAR_LOG_STORAGE_BACKEND"
+STORAGE_BACKENDS = ("json", "sqlite")
+
+# SQLite database file inside DATA_PATH (sqlite backend)
+SQLITE_DB_NAME = "car-log.db"
+
+# Columns stored next to each document in the SQLite records table
+SQLITE_COLUMNS = {
+    "vehicles": {"vehicle_id": "vehicle_id"},
+    **MANIFEST_COLUMNS,
+}
+
+_sqlite_stores: Dict[Path, SQLiteStore] = {}
+
+# read_json LRU cache size in documents (0 disables the cache)
+READ_CACHE_SIZE_ENV = "CAR_LOG_READ_CACHE_SIZE"
+DEFAULT_READ_CACHE_SIZE = 512
+
+# path -> (mtime_ns, size, data); data is never handed out directly
+_read_cache: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+_read_cache_lock = threading.Lock()
+_read_cache_stats = {"hits": 0, "misses": 0}
+
+# Derived data lock: reentrant within a thread, the lock file is held by the
+# outermost acquisition only
+_derived_lock = threading.RLock()
+_derived_lock_depth = 0
+_derived_lock_file = None
 
 
 def get_data_path() -> Path:
@@ -18,6 +145,81 @@ def get_data_path() -> Path:
     return Path(data_path).expanduser()
 
 
+def get_storage_backend() -> str:
+    """
+    Get the configured storage backend.
+
+    Returns:
+        "json" (default, one file per record) or "sqlite"
+
+    Raises:
+        ValueError: If CAR_LOG_STORAGE_BACKEND names an unknown backend
+    """
+    backend = os.getenv(STORAGE_BACKEND_ENV, "json").strip().lower() or "json"
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(
+            f"Unknown storage backend: {backend} "
+            f"({STORAGE_BACKEND_ENV} must be one of {', '.join(STORAGE_BACKENDS)})"
+        )
+    return backend
+
+
+def get_sqlite_store(data_path: Optional[Path] = None) -> SQLiteStore:
+    """
+    Get the SQLite store of a data directory (opened once per process).
+
+    Args:
+        data_path: Data directory (default: DATA_PATH)
+
+    Returns:
+        SQLiteStore instance
+    """
+    db_path = (data_path or get_data_path()) / SQLITE_DB_NAME
+    store = _sqlite_stores.get(db_path)
+    if store is None:
+        store = SQLiteStore(db_path, SQLITE_COLUMNS)
+        _sqlite_stores[db_path] = store
+    return store
+
+
+def _sqlite_enabled() -> bool:
+    """True when the sqlite backend is selected."""
+    return get_storage_backend() == "sqlite"
+
+
+def _relative_to_data_path(file_path: Path) -> Optional[Path]:
+    """Path relative to DATA_PATH, or None if outside it."""
+    data_path = get_data_path()
+    try:
+        # Fast path: paths built from get_data_path() (no filesystem access)
+        relative = Path(file_path).relative_to(data_path)
+        if ".." not in relative.parts:
+            return relative
+    except ValueError:
+        pass
+
+    try:
+        return Path(file_path).resolve().relative_to(data_path.resolve())
+    except ValueError:
+        return None
+
+
+def _data_relative_path(file_path: Path) -> Optional[str]:
+    """
+    Path relative to DATA_PATH as used for SQLite document keys.
+
+    Returns:
+        POSIX relative path, or None for paths outside DATA_PATH or inside
+        the derived-data directory
+    """
+    relative = _relative_to_data_path(file_path)
+    if relative is None:
+        return None
+    if relative.parts and relative.parts[0] == INDEX_DIR_NAME:
+        return None
+    return relative.as_posix()
+
+
 def atomic_write_json(file_path: Path, data: Dict[str, Any]) -> bool:
     """
     Write JSON file atomically (crash-safe).
@@ -35,6 +237,63 @@ def atomic_write_json(file_path: Path, data: Dict[str, Any]) -> bool:
     Raises:
         Exception: If write fails
     """
+    if _sqlite_enabled() and _sqlite_write(file_path, data):
+        return True
+
+    # Derived data that depends on the replaced content needs the old record
+    previous = _previous_records([file_path])
+
+    _replace_file(file_path, data)
+
+    # Keep the derived data in step with record files
+    record_key = parse_record_path(file_path)
+    if record_key is not None:
+        _update_derived([(record_key, file_path, data)], previous)
+
+    return True
+
+
+def move_json(old_path: Path, new_path: Path, data: Dict[str, Any]) -> bool:
+    """
+    Write a record under a new path and remove its old file.
+
+    Used when a record changes month folder (e.g., a trip's start date is
+    edited). The new file is in place before the old one is removed, so a
+    crash leaves a duplicate rather than losing the record; derived data is
+    updated once for both paths.
+
+    Args:
+        old_path: Current record file
+        new_path: New record file
+        data: Record data to write
+
+    Returns:
+        True if successful
+    """
+    if _sqlite_enabled() and _sqlite_write(new_path, data):
+        # Records are keyed by ID: the write replaced the old folder's row
+        return True
+
+    previous = _previous_records([old_path])
+
+    _replace_file(new_path, data)
+    os.remove(old_path)
+    _invalidate_read_cache(old_path)
+
+    changes = []
+    old_key = parse_record_path(old_path)
+    if old_key is not None:
+        changes.append((old_key, old_path, None))
+    new_key = parse_record_path(new_path)
+    if new_key is not None:
+        changes.append((new_key, new_path, data))
+    _update_derived(changes, previous)
+
+    return True
+
+
+def _replace_file(file_path: Path, data: Dict[str, Any]) -> None:
+    """Write data to a temp file and rename it over file_path."""
     # Ensure directory exists
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -44,13 +303,12 @@ def atomic_write_json(file_path: Path, data: Dict[str, Any]) -> bool:
 
     try:
         # Write to temp file
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json_codec.dumps(data))
 
         # Atomic rename (POSIX guarantees atomicity)
         os.replace(temp_path, file_path)
-
-        return True
+        _invalidate_read_cache(file_path)
     except Exception as e:
         # Clean up temp file on error
         if os.path.exists(temp_path):
@@ -58,10 +316,203 @@ def atomic_write_json(file_path: Path, data: Dict[str, Any]) -> bool:
         raise e
 
 
+def atomic_write_json_batch(items: List[Tuple[Path, Dict[str, Any]]]) -> int:
+    """
+    Write several JSON files as one crash-safe batch.
+
+    All files are staged as temp files first, then renamed into place; if a
+    rename fails, files already renamed are restored (or removed if new), so
+    the batch lands completely or not at all. Each touched directory is
+    flushed once after the renames, and index/manifest updates are grouped
+    per shard and month instead of one rewrite per file.
+
+    Args:
+        items: (file_path, data) pairs
+
+    Returns:
+        Number of written files
+
+    Raises:
+        Exception: If staging or renaming fails (nothing is left changed)
+    """
+    if not items:
+        return 0
+
+    if _sqlite_enabled():
+        store = get_sqlite_store()
+        with store.transaction():
+            remaining = [
+                (file_path, data) for file_path, data in items
+                if not _sqlite_write(file_path, data)
+            ]
+        if not remaining:
+            return len(items)
+        items = remaining
+
+    previous = _previous_records([file_path for file_path, _ in items])
+
+    # Stage: write every temp file before touching any target
+    staged: List[Tuple[str, Path]] = []
+    try:
+        for file_path, data in items:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=file_path.parent, suffix='.tmp')
+            staged.append((temp_path, file_path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json_codec.dumps(data))
+    except Exception:
+        for temp_path, _ in staged:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+
+    # Commit: rename all, keeping backups of overwritten files for rollback
+    committed: List[Tuple[Path, Optional[str]]] = []
+    try:
+        for temp_path, file_path in staged:
+            backup_path = None
+            if file_path.exists():
+                backup_path = temp_path + '.bak'
+                try:
+                    os.link(file_path, backup_path)
+                except OSError:
+                    shutil.copy2(file_path, backup_path)
+            os.replace(temp_path, file_path)
+            _invalidate_read_cache(file_path)
+            committed.append((file_path, backup_path))
+    except Exception:
+        for file_path, backup_path in reversed(committed):
+            _invalidate_read_cache(file_path)
+            if backup_path is not None:
+                os.replace(backup_path, file_path)
+            elif file_path.exists():
+                os.remove(file_path)
+        for temp_path, _ in staged:
+            for leftover in (temp_path, temp_path + '.bak'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        raise
+
+    for _, backup_path in committed:
+        if backup_path is not None:
+            os.remove(backup_path)
+
+    for dir_path in {file_path.parent for _, file_path in staged}:
+        _fsync_directory(dir_path)
+
+    # Keep the derived data in step, one rewrite per shard/month/vehicle
+    changes = []
+    for file_path, data in items:
+        record_key = parse_record_path(file_path)
+        if record_key is not None:
+            changes.append((record_key, file_path, data))
+    _update_derived(changes, previous)
+
+    return len(items)
+
+
+def _fsync_directory(dir_path: Path) -> None:
+    """Flush directory entries (renames) to disk where the OS supports it."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def delete_json(file_path: Path) -> bool:
+    """
+    Delete a JSON file and drop it from the derived data.
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        True if the file existed and was removed
+    """
+    if _sqlite_enabled():
+        removed = _sqlite_delete(file_path)
+        if removed is not None:
+            return removed
+
+    if not file_path.exists():
+        return False
+
+    previous = _previous_records([file_path])
+
+    os.remove(file_path)
+    _invalidate_read_cache(file_path)
+
+    record_key = parse_record_path(file_path)
+    if record_key is not None:
+        _update_derived([(record_key, file_path, None)], previous)
+
+    return True
+
+
+def delete_json_batch(file_paths: List[Path]) -> int:
+    """
+    Delete several JSON files with one derived-data update.
+
+    Used by cascade deletes: index shards, manifests, timelines and
+    references are rewritten once per batch instead of once per file.
+
+    Args:
+        file_paths: Paths to files (missing files are skipped)
+
+    Returns:
+        Number of removed files
+    """
+    if _sqlite_enabled():
+        store = get_sqlite_store()
+        with store.transaction():
+            remaining = []
+            removed = 0
+            for file_path in file_paths:
+                result = _sqlite_delete(file_path)
+                if result is None:
+                    remaining.append(file_path)
+                else:
+                    removed += int(result)
+        if not remaining:
+            return removed
+        return removed + _delete_json_files(remaining)
+
+    return _delete_json_files(file_paths)
+
+
+def _delete_json_files(file_paths: List[Path]) -> int:
+    """Remove files from disk and update derived data once (JSON layout)."""
+    existing = [file_path for file_path in file_paths if file_path.exists()]
+    previous = _previous_records(existing)
+
+    changes = []
+    for file_path in existing:
+        os.remove(file_path)
+        _invalidate_read_cache(file_path)
+        record_key = parse_record_path(file_path)
+        if record_key is not None:
+            changes.append((record_key, file_path, None))
+
+    _update_derived(changes, previous)
+    return len(existing)
+
+
 def read_json(file_path: Path) -> Optional[Dict[str, Any]]:
     """
     Read JSON file safely.
 
+    Parsed files are kept in a bounded LRU cache keyed on path and
+    (mtime_ns, size), so edits by other processes are picked up and our own
+    writes invalidate the entry. Every call returns a fresh copy.
+
     Args:
         file_path: Path to file
 
@@ -71,16 +522,120 @@ def read_json(file_path: Path) -> Optional[Dict[str, Any]]:
     Raises:
         json.JSONDecodeError: If file is corrupted
     """
-    if not file_path.exists():
+    if _sqlite_enabled():
+        handled, data = _sqlite_read(file_path)
+        if handled:
+            return data
+
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+    max_size = _read_cache_max_size()
+    if max_size <= 0:
+        with open(file_path, 'rb') as f:
+            return json_codec.loads(f.read())
+
+    key = os.fspath(file_path)
+    with _read_cache_lock:
+        cached = _read_cache.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            _read_cache.move_to_end(key)
+            _read_cache_stats["hits"] += 1
+            return _copy_json(cached[2])
+        _read_cache_stats["misses"] += 1
+
+    with open(file_path, 'rb') as f:
+        data = json_codec.loads(f.read())
+
+    with _read_cache_lock:
+        _read_cache[key] = (stat.st_mtime_ns, stat.st_size, data)
+        _read_cache.move_to_end(key)
+        while len(_read_cache) > max_size:
+            _read_cache.popitem(last=False)
+
+    return _copy_json(data)
+
+
+def record_version(file_path: Path) -> Optional[str]:
+    """
+    Cheap change token of a stored JSON file.
+
+    Files are not parsed: the token is the file's (mtime_ns, size). With
+    the SQLite backend it is a content hash of the stored data.
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        Token that changes whenever the file does, or None if it doesn't exist
+    """
+    if _sqlite_enabled():
+        handled, data = _sqlite_read(file_path)
+        if handled:
+            if data is None:
+                return None
+            return hashlib.sha1(json_codec.dumps(data)).hexdigest()
+
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
         return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _copy_json(value: Any) -> Any:
+    """Copy parsed JSON (dicts/lists of scalars), faster than copy.deepcopy."""
+    value_type = type(value)
+    if value_type is dict:
+        return {key: _copy_json(item) for key, item in value.items()}
+    if value_type is list:
+        return [_copy_json(item) for item in value]
+    return value
+
+
+def _read_cache_max_size() -> int:
+    """Configured read cache size (CAR_LOG_READ_CACHE_SIZE)."""
+    try:
+        return int(os.getenv(READ_CACHE_SIZE_ENV, DEFAULT_READ_CACHE_SIZE))
+    except ValueError:
+        return DEFAULT_READ_CACHE_SIZE
+
+
+def _invalidate_read_cache(file_path: Path) -> None:
+    """Drop a file from the read cache after we change it."""
+    with _read_cache_lock:
+        _read_cache.pop(os.fspath(file_path), None)
+
+
+def read_cache_stats() -> Dict[str, int]:
+    """
+    Get read_json cache counters.
+
+    Returns:
+        hits, misses, current size and max_size of the cache
+    """
+    with _read_cache_lock:
+        return {
+            "hits": _read_cache_stats["hits"],
+            "misses": _read_cache_stats["misses"],
+            "size": len(_read_cache),
+            "max_size": _read_cache_max_size(),
+        }
+
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def clear_read_cache() -> None:
+    """Empty the read cache and reset its counters."""
+    with _read_cache_lock:
+        _read_cache.clear()
+        _read_cache_stats["hits"] = 0
+        _read_cache_stats["misses"] = 0
 
 
 def list_json_files(directory: Path) -> list[Path]:
     """
-    List all JSON files in directory (excluding temp files).
+    List all JSON files in directory (excluding temp and manifest files).
 
     Args:
         directory: Directory to search
@@ -88,10 +643,24 @@ def list_json_files(directory: Path) -> list[Path]:
     Returns:
         List of JSON file paths
     """
-    if not directory.exists():
-        return []
+    if _sqlite_enabled():
+        files = _sqlite_list(directory)
+        if files is not None:
+            return files
+
+    return [directory / f"{record_id}.json" for record_id in _list_json_stems(directory)]
 
-    return [f for f in directory.glob('*.json') if not f.name.endswith('.tmp')]
+
+def _list_json_stems(directory: Path) -> list[str]:
+    """File stems of JSON files in directory (no Path objects, one scandir)."""
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry.name[:-5] for entry in entries
+                if entry.name.endswith('.json') and entry.name != MANIFEST_FILE_NAME
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
 
 
 def get_month_folder(date: datetime) -> str:
@@ -120,5 +689,1704 @@ def ensure_month_folder(base_path: Path, date: datetime) -> Path:
     """
     month_folder = get_month_folder(date)
     folder_path = base_path / month_folder
-    folder_path.mkdir(parents=True, exist_ok=True)
+    if not _sqlite_enabled():
+        folder_path.mkdir(parents=True, exist_ok=True)
     return folder_path
+
+
+def path_exists(file_path: Path) -> bool:
+    """
+    Check whether a data file or directory exists in the active backend.
+
+    With the sqlite backend a collection or month folder "exists" when it
+    holds at least one record.
+
+    Args:
+        file_path: Record/document file or collection/month directory
+
+    Returns:
+        True if present
+    """
+    if _sqlite_enabled():
+        exists = _sqlite_exists(file_path)
+        if exists is not None:
+            return exists
+    return Path(file_path).exists()
+
+
+def iter_month_folders(
+    base_path: Path,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[Path]:
+    """
+    Iterate month folders of a monthly collection (e.g., data/trips).
+
+    With a date range, folders whose YYYY-MM name lies outside it are pruned
+    by name, so their files are never listed or parsed. Folders that do not
+    follow the YYYY-MM naming are always yielded.
+
+    Args:
+        base_path: Collection base path
+        start: First date of interest (inclusive, optional)
+        end: Last date of interest (inclusive, optional)
+
+    Yields:
+        Month folder paths in ascending month order
+    """
+    first_month = get_month_folder(start) if start else None
+    last_month = get_month_folder(end) if end else None
+
+    if _sqlite_enabled():
+        collection = _sqlite_collection_dir(base_path)
+        if collection in MONTHLY_COLLECTIONS:
+            for folder in get_sqlite_store().folders(collection):
+                if _month_in_range(folder, first_month, last_month):
+                    yield base_path / folder
+            return
+
+    if not base_path.exists():
+        return
+
+    for month_folder in sorted(base_path.iterdir()):
+        if month_folder.is_dir() and _month_in_range(month_folder.name, first_month, last_month):
+            yield month_folder
+
+
+def _month_in_range(name: str, first_month: Optional[str], last_month: Optional[str]) -> bool:
+    """True unless a YYYY-MM folder name lies outside [first_month, last_month]."""
+    if not MONTH_FOLDER_PATTERN.match(name):
+        return True
+    if first_month and name < first_month:
+        return False
+    if last_month and name > last_month:
+        return False
+    return True
+
+
+def _previous_records(file_paths: List[Path]) -> Dict[Path, Dict[str, Any]]:
+    """
+    Current content of record files whose derived data depends on it
+    (checkpoint timelines, references), read before they are replaced.
+    """
+    previous = {}
+    for file_path in file_paths:
+        record_key = parse_record_path(file_path)
+        if record_key is None or record_key[0] not in REFERENCING_COLLECTIONS:
+            continue
+        try:
+            record = read_json(file_path)
+        except ValueError:
+            record = None
+        if record is not None:
+            previous[file_path] = record
+    return previous
+
+
+@contextmanager
+def derived_data_lock() -> Iterator[None]:
+    """
+    Serialize read-modify-write of derived data (index shards, manifests,
+    rollups, timelines, references).
+
+    Holds a thread lock plus an exclusive lock on ``.index/lock``, so other
+    processes sharing DATA_PATH (MCP servers, UI) never drop each other's
+    entries. Reentrant within a thread. The SQLite backend only takes the
+    thread lock: its derived data lives in the database.
+    """
+    global _derived_lock_depth, _derived_lock_file
+
+    with _derived_lock:
+        if _derived_lock_depth == 0 and not _sqlite_enabled():
+            index_dir = get_data_path() / INDEX_DIR_NAME
+            index_dir.mkdir(parents=True, exist_ok=True)
+            lock_file = open(index_dir / LOCK_FILE_NAME, "a+b")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            except OSError:
+                lock_file.close()
+                raise
+            _derived_lock_file = lock_file
+
+        _derived_lock_depth += 1
+        try:
+            yield
+        finally:
+            _derived_lock_depth -= 1
+            if _derived_lock_depth == 0 and _derived_lock_file is not None:
+                lock_file, _derived_lock_file = _derived_lock_file, None
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                finally:
+                    lock_file.close()
+
+
+def _update_derived(
+    changes: List[Tuple[Tuple[str, str, str], Path, Optional[Dict[str, Any]]]],
+    previous: Optional[Dict[Path, Dict[str, Any]]] = None,
+) -> None:
+    """
+    Bring ID index, month manifests, checkpoint timelines and references in
+    step with written or deleted record files. Failures are logged, never raised.
+
+    Args:
+        changes: (record_key, file_path, data) per record; data None if deleted
+        previous: File path -> record content before the change
+    """
+    try:
+        with derived_data_lock():
+            _apply_derived(changes, previous)
+    except OSError as e:
+        logger.warning(f"Derived data lock failed: {e}")
+
+
+def _apply_derived(
+    changes: List[Tuple[Tuple[str, str, str], Path, Optional[Dict[str, Any]]]],
+    previous: Optional[Dict[Path, Dict[str, Any]]] = None,
+) -> None:
+    """Derived data update of _update_derived (caller holds the lock)."""
+    previous = previous or {}
+    index_updates = []
+    manifest_updates: Dict[Tuple[str, Path], Dict[str, Optional[Dict[str, Any]]]] = {}
+    timeline_updates: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {}
+    reference_changes = []
+
+    for (collection, folder, record_id), file_path, data in changes:
+        index_updates.append((collection, folder if data is not None else None, record_id))
+        if folder:
+            manifest_updates.setdefault((collection, file_path.parent), {})[record_id] = data
+
+        old = previous.get(file_path)
+        if collection == "checkpoints":
+            old_vehicle = (old or {}).get("vehicle_id")
+            new_vehicle = (data or {}).get("vehicle_id")
+            if old_vehicle and old_vehicle != new_vehicle:
+                timeline_updates.setdefault(old_vehicle, {})[record_id] = None
+            if new_vehicle:
+                timeline_updates.setdefault(new_vehicle, {})[record_id] = data
+
+        if collection in REFERENCING_COLLECTIONS:
+            reference_changes.append((collection, record_id, old, data))
+
+    _safe_index_update_many(index_updates)
+    for (collection, month_folder), records in manifest_updates.items():
+        _safe_manifest_update_many(collection, month_folder, records)
+    for vehicle_id, records in timeline_updates.items():
+        _safe_timeline_update(vehicle_id, records)
+    _safe_reference_update(reference_changes)
+
+
+# ---------------------------------------------------------------------------
+# ID index
+# ---------------------------------------------------------------------------
+
+def parse_record_path(file_path: Path) -> Optional[Tuple[str, str, str]]:
+    """
+    Map a record file path to its index key.
+
+    Args:
+        file_path: Path to a record file
+
+    Returns:
+        (collection, folder, record_id) or None if path is not a record file.
+        Folder is the month folder name, or "" for flat collections.
+    """
+    if file_path.suffix != ".json":
+        return None
+
+    relative = _relative_to_data_path(file_path)
+    if relative is None:
+        return None
+
+    parts = relative.parts
+    if len(parts) == 2 and parts[0] in FLAT_COLLECTIONS:
+        return parts[0], "", file_path.stem
+    if len(parts) == 3 and parts[0] in MONTHLY_COLLECTIONS and parts[2] != MANIFEST_FILE_NAME:
+        return parts[0], parts[1], file_path.stem
+
+    return None
+
+
+def _index_shard_path(data_path: Path, collection: str, record_id: str) -> Path:
+    """Get index shard file holding a record ID."""
+    shard = hashlib.sha1(record_id.encode("utf-8")).hexdigest()[:2]
+    return data_path / INDEX_DIR_NAME / "ids" / collection / f"{shard}.json"
+
+
+def _record_file(data_path: Path, collection: str, folder: str, record_id: str) -> Path:
+    """Build record file path from index key."""
+    if folder:
+        return data_path / collection / folder / f"{record_id}.json"
+    return data_path / collection / f"{record_id}.json"
+
+
+def _update_index(collection: str, folder: Optional[str], record_id: str) -> None:
+    """Set (folder given) or remove (folder None) one ID index entry."""
+    _update_index_many([(collection, folder, record_id)])
+
+
+def _update_index_many(updates: List[Tuple[str, Optional[str], str]]) -> None:
+    """Apply (collection, folder, record_id) index updates, one write per shard."""
+    data_path = get_data_path()
+    by_shard: Dict[Path, List[Tuple[Optional[str], str]]] = {}
+    for collection, folder, record_id in updates:
+        shard_path = _index_shard_path(data_path, collection, record_id)
+        by_shard.setdefault(shard_path, []).append((folder, record_id))
+
+    changed_shards = []
+    for shard_path, shard_updates in by_shard.items():
+        entries = read_json(shard_path) or {}
+        changed = False
+
+        for folder, record_id in shard_updates:
+            if folder is None:
+                if record_id in entries:
+                    del entries[record_id]
+                    changed = True
+            elif entries.get(record_id) != folder:
+                entries[record_id] = folder
+                changed = True
+
+        if changed:
+            changed_shards.append((shard_path, entries))
+
+    if len(changed_shards) == 1:
+        atomic_write_json(*changed_shards[0])
+    elif changed_shards:
+        atomic_write_json_batch(changed_shards)
+
+
+def _safe_index_update(collection: str, folder: Optional[str], record_id: str) -> None:
+    """Update ID index without failing the record write (index is only a hint)."""
+    _safe_index_update_many([(collection, folder, record_id)])
+
+
+def _safe_index_update_many(updates: List[Tuple[str, Optional[str], str]]) -> None:
+    """Update several ID index entries without failing the record writes."""
+    try:
+        _update_index_many(updates)
+    except Exception as e:
+        record_ids = ", ".join(f"{c}/{r}" for c, _, r in updates[:3])
+        logger.warning(f"ID index update failed for {record_ids}: {e}")
+
+
+def find_record_file(collection: str, record_id: str) -> Optional[Path]:
+    """
+    Find record file by ID using the ID index.
+
+    Falls back to scanning month folders when the index is missing or stale,
+    and repairs the index entry.
+
+    Args:
+        collection: vehicles, checkpoints or trips
+        record_id: Record ID
+
+    Returns:
+        Path to record file or None if not found
+    """
+    if not record_id:
+        return None
+
+    data_path = get_data_path()
+
+    if _sqlite_enabled():
+        found = get_sqlite_store().get(collection, record_id)
+        if found is None:
+            return None
+        return _record_file(data_path, collection, found[0], record_id)
+
+    # O(1) lookup
+    try:
+        entries = read_json(_index_shard_path(data_path, collection, record_id)) or {}
+    except (OSError, ValueError):
+        entries = {}
+
+    folder = entries.get(record_id)
+    if folder is not None:
+        record_file = _record_file(data_path, collection, folder, record_id)
+        if record_file.exists():
+            return record_file
+
+    # Index miss or stale entry - fall back to scanning
+    if collection in MONTHLY_COLLECTIONS:
+        for month_folder in iter_month_folders(data_path / collection):
+            record_file = month_folder / f"{record_id}.json"
+            if record_file.exists():
+                _safe_index_update(collection, month_folder.name, record_id)
+                return record_file
+    else:
+        record_file = _record_file(data_path, collection, "", record_id)
+        if record_file.exists():
+            _safe_index_update(collection, "", record_id)
+            return record_file
+
+    if folder is not None:
+        _safe_index_update(collection, None, record_id)
+
+    return None
+
+
+def read_record(collection: str, record_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read record by ID.
+
+    Args:
+        collection: vehicles, checkpoints or trips
+        record_id: Record ID
+
+    Returns:
+        Record data or None if not found
+    """
+    if _sqlite_enabled():
+        found = get_sqlite_store().get(collection, record_id) if record_id else None
+        return found[1] if found else None
+
+    record_file = find_record_file(collection, record_id)
+    if record_file is None:
+        return None
+    return read_json(record_file)
+
+
+def _scan_record_files(data_path: Path) -> Dict[str, Dict[str, str]]:
+    """Scan record files on disk: {collection: {record_id: folder}}."""
+    found = {collection: {} for collection in RECORD_COLLECTIONS}
+
+    for collection in FLAT_COLLECTIONS:
+        for record_file in list_json_files(data_path / collection):
+            found[collection][record_file.stem] = ""
+
+    for collection in MONTHLY_COLLECTIONS:
+        for month_folder in iter_month_folders(data_path / collection):
+            for record_file in list_json_files(month_folder):
+                found[collection][record_file.stem] = month_folder.name
+
+    return found
+
+
+def _load_index(data_path: Path) -> Dict[str, Dict[str, str]]:
+    """Load all ID index shards: {collection: {record_id: folder}}."""
+    loaded = {collection: {} for collection in RECORD_COLLECTIONS}
+
+    for collection in RECORD_COLLECTIONS:
+        for shard_file in list_json_files(data_path / INDEX_DIR_NAME / "ids" / collection):
+            try:
+                loaded[collection].update(read_json(shard_file) or {})
+            except ValueError:
+                # Corrupted shard - verify reports its records as missing
+                continue
+
+    return loaded
+
+
+def verify_index() -> Dict[str, Any]:
+    """
+    Compare the ID index, month manifests, checkpoint timelines, trip
+    rollups and reverse references with record files on disk.
+
+    Returns:
+        Report with per-collection counts, lists of missing (on disk, not
+        indexed) and stale (indexed, wrong or gone) IDs, stale manifests,
+        stale timelines (vehicle IDs), stale rollups (months) and stale
+        references (relation/parent)
+    """
+    if _sqlite_enabled():
+        # Records are indexed by the database itself
+        store = get_sqlite_store()
+        counts = {collection: store.count(collection) for collection in RECORD_COLLECTIONS}
+        return {
+            "ok": True,
+            "collections": {
+                collection: {"records": count, "indexed": count, "missing": [], "stale": []}
+                for collection, count in counts.items()
+            },
+            "stale_manifests": [],
+            "stale_timelines": [],
+            "stale_rollups": [],
+            "stale_references": [],
+        }
+
+    data_path = get_data_path()
+    on_disk = _scan_record_files(data_path)
+    indexed = _load_index(data_path)
+
+    report = {"ok": True, "collections": {}}
+    for collection in RECORD_COLLECTIONS:
+        missing = sorted(set(on_disk[collection]) - set(indexed[collection]))
+        stale = sorted(
+            record_id
+            for record_id, folder in indexed[collection].items()
+            if on_disk[collection].get(record_id) != folder
+        )
+        report["collections"][collection] = {
+            "records": len(on_disk[collection]),
+            "indexed": len(indexed[collection]),
+            "missing": missing,
+            "stale": stale,
+        }
+        if missing or stale:
+            report["ok"] = False
+
+    # Month manifests must match record contents
+    stale_manifests = []
+    for collection in MONTHLY_COLLECTIONS:
+        for month_folder in iter_month_folders(data_path / collection):
+            expected = _build_manifest_rows(collection, month_folder)
+            if _read_manifest_file(month_folder) != expected:
+                stale_manifests.append(f"{collection}/{month_folder.name}")
+    report["stale_manifests"] = stale_manifests
+    if stale_manifests:
+        report["ok"] = False
+
+    # Checkpoint timelines must match checkpoint records (missing ones are
+    # built on first use, so only existing files are checked)
+    expected_timelines = _scan_timelines(data_path)
+    stale_timelines = []
+    for timeline_file in list_json_files(data_path / INDEX_DIR_NAME / TIMELINE_DIR_NAME):
+        vehicle_id = timeline_file.stem
+        try:
+            timeline = read_json(timeline_file) or {}
+        except ValueError:
+            timeline = {}
+        if timeline.get("entries") != expected_timelines.get(vehicle_id, []):
+            stale_timelines.append(vehicle_id)
+    report["stale_timelines"] = stale_timelines
+    if stale_timelines:
+        report["ok"] = False
+
+    # Trip rollups must match trip records (missing ones are built on use)
+    stale_rollups = []
+    for month_folder in iter_month_folders(data_path / "trips"):
+        try:
+            stored = read_json(_rollup_path(data_path, month_folder.name))
+        except ValueError:
+            stored = {}
+        if stored is None:
+            continue
+        rows = _build_manifest_rows("trips", month_folder)
+        if stored.get("rollups") != _build_rollups(month_folder.name, rows):
+            stale_rollups.append(month_folder.name)
+    report["stale_rollups"] = stale_rollups
+    if stale_rollups:
+        report["ok"] = False
+
+    # Reverse references must match child records (checked once built)
+    stale_references = []
+    if _references_root(data_path).exists():
+        expected_references = _scan_references(data_path)
+        for relation, parents in expected_references.items():
+            relation_dir = _references_dir(data_path, relation)
+            stored = {}
+            for reference_file in list_json_files(relation_dir):
+                try:
+                    stored[reference_file.stem] = (read_json(reference_file) or {}).get("dependents")
+                except ValueError:
+                    stored[reference_file.stem] = None
+            for parent_id in sorted(set(stored) | set(parents)):
+                if stored.get(parent_id) != parents.get(parent_id):
+                    stale_references.append(f"{relation_dir.name}/{parent_id}")
+    report["stale_references"] = stale_references
+    if stale_references:
+        report["ok"] = False
+
+    return report
+
+
+def rebuild_index() -> Dict[str, int]:
+    """
+    Rebuild the ID index, month manifests, trip rollups, checkpoint
+    timelines and reverse references from record files on disk.
+
+    Returns:
+        Number of indexed records per collection
+    """
+    if _sqlite_enabled():
+        # Nothing derived to rebuild
+        store = get_sqlite_store()
+        return {collection: store.count(collection) for collection in RECORD_COLLECTIONS}
+
+    with derived_data_lock():
+        return _rebuild_derived(get_data_path())
+
+
+def _rebuild_derived(data_path: Path) -> Dict[str, int]:
+    """Rebuild of rebuild_index (caller holds the derived data lock)."""
+    on_disk = _scan_record_files(data_path)
+
+    counts = {}
+    for collection in RECORD_COLLECTIONS:
+        shards: Dict[Path, Dict[str, str]] = {}
+        for record_id, folder in on_disk[collection].items():
+            shard_path = _index_shard_path(data_path, collection, record_id)
+            shards.setdefault(shard_path, {})[record_id] = folder
+
+        index_dir = data_path / INDEX_DIR_NAME / "ids" / collection
+        for shard_file in list_json_files(index_dir):
+            if shard_file not in shards:
+                os.remove(shard_file)
+
+        for shard_path, entries in shards.items():
+            atomic_write_json(shard_path, entries)
+
+        counts[collection] = len(on_disk[collection])
+
+    # Writing trip manifests also rewrites their rollups
+    for collection in MONTHLY_COLLECTIONS:
+        for month_folder in iter_month_folders(data_path / collection):
+            _write_manifest(month_folder, _build_manifest_rows(collection, month_folder))
+
+    months = {month_folder.name for month_folder in iter_month_folders(data_path / "trips")}
+    for rollup_file in list_json_files(data_path / INDEX_DIR_NAME / ROLLUP_DIR_NAME):
+        if rollup_file.stem not in months:
+            os.remove(rollup_file)
+
+    timelines = _scan_timelines(data_path)
+    timeline_dir = data_path / INDEX_DIR_NAME / TIMELINE_DIR_NAME
+    for timeline_file in list_json_files(timeline_dir):
+        if timeline_file.stem not in timelines:
+            os.remove(timeline_file)
+    for vehicle_id, entries in timelines.items():
+        atomic_write_json(
+            _timeline_path(data_path, vehicle_id),
+            {"vehicle_id": vehicle_id, "entries": entries},
+        )
+
+    _write_references(data_path, _scan_references(data_path))
+
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Month manifests
+# ---------------------------------------------------------------------------
+
+def _manifest_row(
+    collection: str,
+    record: Dict[str, Any],
+    version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Extract manifest columns from a record, plus its file version."""
+    row = {
+        column: record.get(field)
+        for column, field in MANIFEST_COLUMNS[collection].items()
+    }
+    row["version"] = version
+    return row
+
+
+def _file_versions(directory: Path) -> Dict[str, str]:
+    """Record file stem -> record_version token, one scandir (no parsing)."""
+    versions = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or entry.name == MANIFEST_FILE_NAME:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                versions[entry.name[:-5]] = f"{stat.st_mtime_ns}-{stat.st_size}"
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return versions
+
+
+def _read_manifest_file(month_folder: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Read month manifest as {record_id: row}.
+
+    Returns:
+        Rows or None if the manifest is missing or not in manifest format
+    """
+    try:
+        manifest = read_json(month_folder / MANIFEST_FILE_NAME)
+    except ValueError:
+        return None
+
+    if not manifest or "columns" not in manifest:
+        return None
+
+    # Manifests from before a column was added are rebuilt
+    columns = manifest["columns"]
+    expected = MANIFEST_COLUMNS.get(month_folder.parent.name)
+    if expected is not None and set(columns) != {"id", "version", *expected}:
+        return None
+
+    ids = columns.get("id", [])
+    names = [name for name in columns if name != "id"]
+
+    return {
+        record_id: {name: columns[name][i] for name in names}
+        for i, record_id in enumerate(ids)
+    }
+
+
+def _write_manifest(month_folder: Path, rows: Dict[str, Dict[str, Any]]) -> None:
+    """Write month manifest in columnar form."""
+    collection = month_folder.parent.name
+    names = list(MANIFEST_COLUMNS[collection]) + ["version"]
+    ids = sorted(rows)
+
+    columns = {"id": ids}
+    for name in names:
+        columns[name] = [rows[record_id].get(name) for record_id in ids]
+
+    atomic_write_json(month_folder / MANIFEST_FILE_NAME, {
+        "month": month_folder.name,
+        "count": len(ids),
+        "columns": columns,
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+    })
+
+    # Rollups are derived from the same rows, so they change together
+    if collection == "trips":
+        _write_rollups(month_folder.name, rows)
+
+
+def _build_manifest_rows(collection: str, month_folder: Path) -> Dict[str, Dict[str, Any]]:
+    """Build manifest rows by parsing every record file in a month folder."""
+    rows = {}
+    for record_id, version in _file_versions(month_folder).items():
+        try:
+            record = read_json(month_folder / f"{record_id}.json")
+        except ValueError:
+            continue
+        if record is not None:
+            rows[record_id] = _manifest_row(collection, record, version)
+    return rows
+
+
+def _safe_manifest_update(
+    collection: str,
+    month_folder: Path,
+    record_id: str,
+    record: Optional[Dict[str, Any]],
+) -> None:
+    """Set (record given) or remove (record None) one manifest row."""
+    _safe_manifest_update_many(collection, month_folder, {record_id: record})
+
+
+def _safe_manifest_update_many(
+    collection: str,
+    month_folder: Path,
+    records: Dict[str, Optional[Dict[str, Any]]],
+) -> None:
+    """Set or remove (record None) several rows of one manifest, one write."""
+    try:
+        rows = _read_manifest_file(month_folder) or {}
+        changed = False
+        for record_id, record in records.items():
+            if record is None:
+                if record_id in rows:
+                    del rows[record_id]
+                    changed = True
+            else:
+                version = record_version(month_folder / f"{record_id}.json")
+                row = _manifest_row(collection, record, version)
+                if rows.get(record_id) != row:
+                    rows[record_id] = row
+                    changed = True
+        if changed:
+            _write_manifest(month_folder, rows)
+    except Exception as e:
+        logger.warning(f"Manifest update failed for {collection}/{month_folder.name}: {e}")
+
+
+def read_manifest(collection: str, month_folder: Path) -> list[Dict[str, Any]]:
+    """
+    Read filterable columns for all records in a month folder.
+
+    The manifest is reconciled against the folder listing and file stats
+    (cheap, no parsing): records added, removed or edited outside the
+    storage API are picked up, and the manifest is rewritten.
+
+    Args:
+        collection: checkpoints or trips
+        month_folder: Month folder path
+
+    Returns:
+        List of rows: {"id", "folder", <manifest columns>}; None values omitted
+    """
+    if _sqlite_enabled():
+        return get_sqlite_store().rows(collection, month_folder.name)
+
+    result = []
+    for record_id, row in _current_manifest(collection, month_folder).items():
+        entry = {"id": record_id, "folder": month_folder.name}
+        entry.update({
+            name: value for name, value in row.items()
+            if value is not None and name != "version"
+        })
+        result.append(entry)
+
+    return result
+
+
+def _current_manifest(collection: str, month_folder: Path) -> Dict[str, Dict[str, Any]]:
+    """Manifest rows {record_id: row} (with versions), reconciled with the folder."""
+    rows = _read_manifest_file(month_folder)
+    if _manifest_drifted(rows, _file_versions(month_folder)):
+        try:
+            with derived_data_lock():
+                # Re-read under the lock: another writer may have fixed it
+                rows = _read_manifest_file(month_folder)
+                versions = _file_versions(month_folder)
+                if _manifest_drifted(rows, versions):
+                    rows = _reconcile_manifest(collection, month_folder, rows, versions)
+                    _write_manifest(month_folder, rows)
+        except OSError as e:
+            logger.warning(f"Manifest write failed for {collection}/{month_folder.name}: {e}")
+    return rows
+
+
+def _manifest_drifted(
+    rows: Optional[Dict[str, Dict[str, Any]]],
+    versions: Dict[str, str],
+) -> bool:
+    """True if manifest rows are missing or don't match the record file versions."""
+    if rows is None or len(rows) != len(versions):
+        return True
+    return any(rows.get(record_id, {}).get("version") != v for record_id, v in versions.items())
+
+
+def _reconcile_manifest(
+    collection: str,
+    month_folder: Path,
+    rows: Optional[Dict[str, Dict[str, Any]]],
+    versions: Dict[str, str],
+) -> Dict[str, Dict[str, Any]]:
+    """Keep rows whose file version still matches, re-parse the rest."""
+    reconciled = {}
+    for record_id, version in versions.items():
+        row = (rows or {}).get(record_id)
+        if row is not None and row.get("version") == version:
+            reconciled[record_id] = row
+            continue
+        try:
+            record = read_json(month_folder / f"{record_id}.json")
+        except ValueError:
+            continue
+        if record is not None:
+            reconciled[record_id] = _manifest_row(collection, record, version)
+    return reconciled
+
+
+def iter_manifest_rows(
+    collection: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate manifest rows of the month folders of a collection.
+
+    Args:
+        collection: checkpoints or trips
+        start: Skip months before this date (optional)
+        end: Skip months after this date (optional)
+        reverse: Newest month first (folders not named YYYY-MM come first)
+
+    Yields:
+        Manifest rows (see read_manifest)
+    """
+    month_folders = iter_month_folders(get_data_path() / collection, start, end)
+    if reverse:
+        month_folders = list(month_folders)
+        month_folders = (
+            [f for f in month_folders if not MONTH_FOLDER_PATTERN.match(f.name)]
+            + [f for f in reversed(month_folders) if MONTH_FOLDER_PATTERN.match(f.name)]
+        )
+
+    for month_folder in month_folders:
+        yield from read_manifest(collection, month_folder)
+
+
+def read_manifest_record(collection: str, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Load the full record behind a manifest row.
+
+    Args:
+        collection: checkpoints or trips
+        row: Manifest row
+
+    Returns:
+        Record data or None if the file is gone
+    """
+    return read_json(get_data_path() / collection / row["folder"] / f"{row['id']}.json")
+
+
+# ---------------------------------------------------------------------------
+# Trip rollups
+# ---------------------------------------------------------------------------
+
+def _rollup_path(data_path: Path, month: str) -> Path:
+    """Get rollup file of a trips month folder."""
+    return data_path / INDEX_DIR_NAME / ROLLUP_DIR_NAME / f"{month}.json"
+
+
+def add_to_rollups(
+    rollups: Dict[Tuple[str, str, str], Dict[str, Any]],
+    row: Dict[str, Any],
+    month: Optional[str] = None,
+) -> None:
+    """
+    Add one trip manifest row to its (month, vehicle, purpose) rollup.
+
+    Args:
+        rollups: Rollups being accumulated, keyed by (month, vehicle_id, purpose)
+        row: Trip manifest row
+        month: Month folder (default: the row's folder)
+    """
+    month = month or row.get("folder")
+    key = (month, row.get("vehicle_id"), row.get("purpose"))
+    rollup = rollups.get(key)
+    if rollup is None:
+        rollup = rollups[key] = {
+            "month": month,
+            "vehicle_id": row.get("vehicle_id"),
+            "purpose": row.get("purpose"),
+            "trips": 0,
+            "distance_km": 0,
+            "fuel_liters": 0,
+            # Distance of trips with a known efficiency, and efficiency * distance
+            "efficiency_km": 0,
+            "efficiency_weighted": 0,
+        }
+
+    distance = row.get("distance_km") or 0
+    rollup["trips"] += 1
+    rollup["distance_km"] += distance
+    rollup["fuel_liters"] += row.get("fuel_liters") or 0
+
+    efficiency = row.get("efficiency")
+    if efficiency and distance:
+        rollup["efficiency_km"] += distance
+        rollup["efficiency_weighted"] += efficiency * distance
+
+
+def _build_rollups(month: str, rows: Dict[str, Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """Rollups of one month from its manifest rows."""
+    rollups: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for row in rows.values():
+        add_to_rollups(rollups, row, month)
+    return sorted(
+        rollups.values(),
+        key=lambda r: (r["vehicle_id"] or "", r["purpose"] or ""),
+    )
+
+
+def _rows_digest(rows: Dict[str, Dict[str, Any]]) -> str:
+    """Digest of manifest rows' record IDs and file versions."""
+    digest = hashlib.sha256()
+    for record_id in sorted(rows):
+        digest.update(f"{record_id}:{rows[record_id].get('version')}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _write_rollups(month: str, rows: Dict[str, Dict[str, Any]]) -> None:
+    """Write rollup file of one month (called with every trip manifest write)."""
+    atomic_write_json(_rollup_path(get_data_path(), month), {
+        "month": month,
+        "records": len(rows),
+        "digest": _rows_digest(rows),
+        "rollups": _build_rollups(month, rows),
+    })
+
+
+def _load_rollups(month_folder: Path) -> list[Dict[str, Any]]:
+    """
+    Read rollups of a trips month folder.
+
+    The manifest is reconciled first (which rewrites the rollups along with
+    it); a missing file or one whose digest of record versions still doesn't
+    match the manifest (e.g. its write failed) is rebuilt from the manifest.
+    """
+    rows = _current_manifest("trips", month_folder)
+
+    data_path = get_data_path()
+    try:
+        stored = read_json(_rollup_path(data_path, month_folder.name))
+    except ValueError:
+        stored = None
+
+    if stored is not None and stored.get("digest") == _rows_digest(rows):
+        return stored.get("rollups", [])
+
+    try:
+        with derived_data_lock():
+            _write_rollups(month_folder.name, rows)
+    except OSError as e:
+        logger.warning(f"Rollup write failed for {month_folder.name}: {e}")
+    return _build_rollups(month_folder.name, rows)
+
+
+def iter_rollups(
+    vehicle_id: Optional[str] = None,
+    purpose: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate per-(vehicle, month, purpose) trip rollups without reading trips.
+
+    Args:
+        vehicle_id: Only this vehicle (optional)
+        purpose: Only this purpose (optional)
+        start: First month (date in it; optional)
+        end: Last month (date in it; optional)
+
+    Yields:
+        {"month", "vehicle_id", "purpose", "trips", "distance_km",
+        "fuel_liters", "efficiency_km", "efficiency_weighted"} in month order
+    """
+    if _sqlite_enabled():
+        first_month = get_month_folder(start) if start else None
+        last_month = get_month_folder(end) if end else None
+        rollups = (
+            rollup for rollup in get_sqlite_store().trip_rollups()
+            if _month_in_range(rollup["month"], first_month, last_month)
+        )
+    else:
+        rollups = (
+            rollup
+            for month_folder in iter_month_folders(get_data_path() / "trips", start, end)
+            for rollup in _load_rollups(month_folder)
+        )
+
+    for rollup in rollups:
+        if vehicle_id and rollup["vehicle_id"] != vehicle_id:
+            continue
+        if purpose and rollup["purpose"] != purpose:
+            continue
+        yield rollup
+
+
+def summarize_rollups(rollups: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine rollups into trip summary totals.
+
+    Returns:
+        {"total_trips", "total_distance_km", "business_trips",
+        "personal_trips", "business_distance_km", "personal_distance_km",
+        "total_fuel_liters", "average_efficiency_l_per_100km"}; efficiency is
+        weighted by distance
+    """
+    totals = {"trips": 0, "distance_km": 0, "fuel_liters": 0, "efficiency_km": 0,
+              "efficiency_weighted": 0}
+    by_purpose = {"Business": [0, 0], "Personal": [0, 0]}
+
+    for rollup in rollups:
+        for name in totals:
+            totals[name] += rollup[name]
+        if rollup["purpose"] in by_purpose:
+            by_purpose[rollup["purpose"]][0] += rollup["trips"]
+            by_purpose[rollup["purpose"]][1] += rollup["distance_km"]
+
+    efficiency = (
+        totals["efficiency_weighted"] / totals["efficiency_km"]
+        if totals["efficiency_km"] > 0
+        else 0.0
+    )
+    return {
+        "total_trips": totals["trips"],
+        "total_distance_km": round(totals["distance_km"], 2),
+        "business_trips": by_purpose["Business"][0],
+        "personal_trips": by_purpose["Personal"][0],
+        "business_distance_km": round(by_purpose["Business"][1], 2),
+        "personal_distance_km": round(by_purpose["Personal"][1], 2),
+        "total_fuel_liters": round(totals["fuel_liters"], 2),
+        "average_efficiency_l_per_100km": round(efficiency, 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Streaming record iterators
+# ---------------------------------------------------------------------------
+
+def _day(value: Optional[date]) -> Optional[str]:
+    """YYYY-MM-DD of a date/datetime bound (None passes through)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def _iter_rows(
+    collection: str,
+    columns: Dict[str, Any],
+    start: Optional[date],
+    end: Optional[date],
+    reverse: bool,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield filtered manifest rows of a monthly collection in datetime order.
+
+    Folders are named after the record's own (wall-clock) datetime, so
+    sorting one month's manifest rows at a time gives a globally ordered
+    stream; only one month of rows is held in memory.
+    """
+    first_day, last_day = _day(start), _day(end)
+    month_folders = list(iter_month_folders(get_data_path() / collection, start, end))
+    if reverse:
+        month_folders.reverse()
+
+    for month_folder in month_folders:
+        rows = []
+        for row in read_manifest(collection, month_folder):
+            if any(value and row.get(column) != value for column, value in columns.items()):
+                continue
+            if first_day or last_day:
+                day = (row.get("datetime") or "")[:10]
+                if not day or (first_day and day < first_day) or (last_day and day > last_day):
+                    continue
+            rows.append(row)
+
+        rows.sort(key=lambda r: (r.get("datetime") or "", r["id"]), reverse=reverse)
+        yield from rows
+
+
+def _iter_records(
+    collection: str,
+    columns: Dict[str, Any],
+    start: Optional[date],
+    end: Optional[date],
+    reverse: bool,
+) -> Iterator[Dict[str, Any]]:
+    """Yield full records of a monthly collection in datetime order (see _iter_rows)."""
+    for row in _iter_rows(collection, columns, start, end, reverse):
+        try:
+            record = read_manifest_record(collection, row)
+        except ValueError as e:
+            logger.warning(f"Skipping unreadable {collection}/{row['folder']}/{row['id']}: {e}")
+            continue
+        if record is not None:
+            yield record
+
+
+def iter_trips(
+    vehicle_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    purpose: Optional[str] = None,
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate trips in trip_start_datetime order.
+
+    Filters run on month manifests; full trip JSON is parsed only for
+    yielded trips, one at a time.
+
+    Args:
+        vehicle_id: Only this vehicle (optional)
+        start: First day, inclusive (date or datetime; optional)
+        end: Last day, inclusive (date or datetime; optional)
+        purpose: "Business" or "Personal" (optional)
+        reverse: Newest first
+
+    Yields:
+        Trip records
+    """
+    return _iter_records(
+        "trips", {"vehicle_id": vehicle_id, "purpose": purpose}, start, end, reverse
+    )
+
+
+def iter_trip_rows(
+    vehicle_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    purpose: Optional[str] = None,
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Manifest rows of the trips iter_trips would yield, without reading them.
+
+    Args:
+        Same as iter_trips
+
+    Yields:
+        Manifest rows (see read_manifest) in trip_start_datetime order
+    """
+    return _iter_rows(
+        "trips", {"vehicle_id": vehicle_id, "purpose": purpose}, start, end, reverse
+    )
+
+
+def iter_checkpoints(
+    vehicle_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    checkpoint_type: Optional[str] = None,
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily iterate checkpoints in datetime order.
+
+    Args:
+        vehicle_id: Only this vehicle (optional)
+        start: First day, inclusive (date or datetime; optional)
+        end: Last day, inclusive (date or datetime; optional)
+        checkpoint_type: "refuel" or "manual" (optional)
+        reverse: Newest first
+
+    Yields:
+        Checkpoint records
+    """
+    return _iter_records(
+        "checkpoints",
+        {"vehicle_id": vehicle_id, "checkpoint_type": checkpoint_type},
+        start,
+        end,
+        reverse,
+    )
+
+
+def _row_key(row: Dict[str, Any]) -> Tuple[str, str]:
+    """Listing order of a manifest row: (datetime, id)."""
+    return (row.get("datetime") or "", row["id"])
+
+
+def validate_cursor(after: Any) -> bool:
+    """True if a page cursor is {"datetime": str, "id": str}."""
+    return (
+        isinstance(after, dict)
+        and isinstance(after.get("datetime"), str)
+        and isinstance(after.get("id"), str)
+    )
+
+
+def select_newest(
+    rows: Iterable[Dict[str, Any]],
+    limit: int,
+    after: Optional[Dict[str, str]] = None,
+    newest_months_first: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, str]]]:
+    """
+    Keep the newest rows of a stream with a bounded heap (no full sort).
+
+    Args:
+        rows: Manifest rows (consumed once)
+        limit: Page size
+        after: Cursor {"datetime", "id"} of the last row of the previous
+            page; only older rows are kept
+        newest_months_first: Rows come from iter_manifest_rows(reverse=True);
+            stop reading once a full page is newer than the month of the
+            current row's own datetime (not its folder name)
+
+    Returns:
+        (rows newest first, cursor for the next page or None if no more rows)
+    """
+    if limit < 1:
+        return [], None
+
+    cursor = (after.get("datetime") or "", after.get("id") or "") if after else None
+    heap: List[Tuple[Tuple[str, str], Dict[str, Any]]] = []
+
+    for row in rows:
+        key = _row_key(row)
+        if (
+            newest_months_first
+            and len(heap) > limit
+            and MONTH_FOLDER_PATTERN.match(row["folder"])
+            and key[0]
+            and key[0][:7] < heap[0][0][0][:7]
+        ):
+            # This and every following month is older than the whole page
+            break
+        if cursor is not None and key >= cursor:
+            continue
+        # One extra row tells whether another page exists; keys are unique
+        if len(heap) <= limit:
+            heapq.heappush(heap, (key, row))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, row))
+
+    selected = [row for _, row in sorted(heap, key=lambda item: item[0], reverse=True)]
+    if len(selected) <= limit:
+        return selected, None
+
+    last = selected[limit - 1]
+    return selected[:limit], {"datetime": last.get("datetime") or "", "id": last["id"]}
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint timelines
+# ---------------------------------------------------------------------------
+
+def _timeline_key(datetime_str: Any) -> Optional[float]:
+    """Chronological sort key (UTC timestamp) of an ISO datetime; naive = UTC."""
+    try:
+        dt = datetime.fromisoformat(datetime_str.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _timeline_entry(checkpoint_id: str, row: Dict[str, Any]) -> Optional[list]:
+    """Timeline entry [key, checkpoint_id, datetime, odometer_km] from a record/row."""
+    key = _timeline_key(row.get("datetime"))
+    if key is None:
+        return None
+    return [key, checkpoint_id, row.get("datetime"), row.get("odometer_km")]
+
+
+def _timeline_path(data_path: Path, vehicle_id: str) -> Path:
+    """Get timeline file of a vehicle."""
+    return data_path / INDEX_DIR_NAME / TIMELINE_DIR_NAME / f"{vehicle_id}.json"
+
+
+def _timelines_from_rows(
+    rows: Iterator[Dict[str, Any]],
+    vehicle_id: Optional[str] = None,
+) -> Dict[str, list]:
+    """Group checkpoint manifest rows into sorted timelines per vehicle."""
+    timelines: Dict[str, list] = {}
+    for row in rows:
+        row_vehicle = row.get("vehicle_id")
+        if not row_vehicle or (vehicle_id is not None and row_vehicle != vehicle_id):
+            continue
+        entry = _timeline_entry(row["id"], row)
+        if entry is not None:
+            timelines.setdefault(row_vehicle, []).append(entry)
+
+    for entries in timelines.values():
+        entries.sort(key=lambda e: (e[0], e[1]))
+    return timelines
+
+
+def _build_timelines(vehicle_id: Optional[str] = None) -> Dict[str, list]:
+    """Build sorted timelines from checkpoint manifests (all or one vehicle)."""
+    if _sqlite_enabled() and vehicle_id is not None:
+        rows = get_sqlite_store().vehicle_rows("checkpoints", vehicle_id)
+    else:
+        rows = iter_manifest_rows("checkpoints")
+    return _timelines_from_rows(rows, vehicle_id)
+
+
+def _scan_timelines(data_path: Path) -> Dict[str, list]:
+    """Build all timelines from checkpoint record files (ignores manifests)."""
+    rows = []
+    for month_folder in iter_month_folders(data_path / "checkpoints"):
+        for record_id, row in _build_manifest_rows("checkpoints", month_folder).items():
+            rows.append({"id": record_id, **row})
+    return _timelines_from_rows(rows)
+
+
+def _load_timeline(vehicle_id: str) -> list:
+    """
+    Load a vehicle's sorted timeline entries.
+
+    JSON backend: read from .index/timelines, built from manifests on first
+    use. SQLite backend: one indexed query per call.
+    """
+    if _sqlite_enabled():
+        return _build_timelines(vehicle_id).get(vehicle_id, [])
+
+    timeline_file = _timeline_path(get_data_path(), vehicle_id)
+    try:
+        timeline = read_json(timeline_file)
+    except ValueError:
+        timeline = None
+
+    if timeline is None:
+        entries = _build_timelines(vehicle_id).get(vehicle_id, [])
+        try:
+            with derived_data_lock():
+                atomic_write_json(timeline_file, {"vehicle_id": vehicle_id, "entries": entries})
+        except OSError as e:
+            logger.warning(f"Timeline write failed for {vehicle_id}: {e}")
+        return entries
+
+    return timeline.get("entries", [])
+
+
+def _safe_timeline_update(vehicle_id: str, records: Dict[str, Optional[Dict[str, Any]]]) -> None:
+    """Insert/replace (record given) or remove (record None) timeline entries."""
+    if _sqlite_enabled():
+        return
+
+    try:
+        timeline_file = _timeline_path(get_data_path(), vehicle_id)
+        if not timeline_file.exists():
+            # First use builds from manifests, which already include this write
+            _load_timeline(vehicle_id)
+            return
+
+        entries = [e for e in _load_timeline(vehicle_id) if e[1] not in records]
+        for checkpoint_id, record in records.items():
+            entry = _timeline_entry(checkpoint_id, record) if record is not None else None
+            if entry is not None:
+                bisect.insort(entries, entry, key=lambda e: (e[0], e[1]))
+        atomic_write_json(timeline_file, {"vehicle_id": vehicle_id, "entries": entries})
+    except Exception as e:
+        logger.warning(f"Timeline update failed for {vehicle_id}: {e}")
+
+
+def _timeline_result(entry: list) -> Dict[str, Any]:
+    """Public form of a timeline entry."""
+    return {"checkpoint_id": entry[1], "datetime": entry[2], "odometer_km": entry[3]}
+
+
+def get_checkpoint_timeline(vehicle_id: str) -> list[Dict[str, Any]]:
+    """
+    Get a vehicle's checkpoints in chronological order (no record parsing).
+
+    Args:
+        vehicle_id: Vehicle ID
+
+    Returns:
+        List of {"checkpoint_id", "datetime", "odometer_km"}
+    """
+    return [_timeline_result(entry) for entry in _load_timeline(vehicle_id)]
+
+
+def find_checkpoint_before(
+    vehicle_id: str,
+    when: datetime,
+    exclude_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Find the vehicle's latest checkpoint strictly before a moment (binary search).
+
+    Args:
+        vehicle_id: Vehicle ID
+        when: Moment (naive datetimes are treated as UTC)
+        exclude_id: Checkpoint ID to skip (e.g. the one being edited)
+
+    Returns:
+        {"checkpoint_id", "datetime", "odometer_km"} or None
+    """
+    entries = _load_timeline(vehicle_id)
+    key = _timeline_key(when.isoformat())
+    index = bisect.bisect_left(entries, key, key=lambda e: e[0])
+    for entry in reversed(entries[:index]):
+        if entry[1] != exclude_id:
+            return _timeline_result(entry)
+    return None
+
+
+def find_checkpoint_after(
+    vehicle_id: str,
+    when: datetime,
+    exclude_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Find the vehicle's earliest checkpoint strictly after a moment (binary search).
+
+    Args:
+        vehicle_id: Vehicle ID
+        when: Moment (naive datetimes are treated as UTC)
+        exclude_id: Checkpoint ID to skip
+
+    Returns:
+        {"checkpoint_id", "datetime", "odometer_km"} or None
+    """
+    entries = _load_timeline(vehicle_id)
+    key = _timeline_key(when.isoformat())
+    index = bisect.bisect_right(entries, key, key=lambda e: e[0])
+    for entry in entries[index:]:
+        if entry[1] != exclude_id:
+            return _timeline_result(entry)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Template revision
+# ---------------------------------------------------------------------------
+
+def _templates_revision_key() -> str:
+    """Revision location relative to DATA_PATH (SQLite: a document key)."""
+    return f"{INDEX_DIR_NAME}/{TEMPLATES_REVISION_FILE_NAME}"
+
+
+def get_templates_revision() -> Optional[str]:
+    """
+    Get the current template set revision.
+
+    Returns:
+        Revision token, or None if templates were never changed through
+        the template tools (or the index was deleted)
+    """
+    if _sqlite_enabled():
+        data = get_sqlite_store().get_document(_templates_revision_key())
+    else:
+        data = read_json(get_data_path() / _templates_revision_key())
+    return data.get("revision") if data else None
+
+
+def bump_templates_revision() -> str:
+    """
+    Mark the template set as changed (call after any template write).
+
+    Returns:
+        New revision token
+    """
+    revision = uuid.uuid4().hex
+    if _sqlite_enabled():
+        get_sqlite_store().put_document(_templates_revision_key(), {"revision": revision})
+    else:
+        atomic_write_json(get_data_path() / _templates_revision_key(), {"revision": revision})
+    return revision
+
+
+# ---------------------------------------------------------------------------
+# Reverse references
+# ---------------------------------------------------------------------------
+
+def _references_root(data_path: Path) -> Path:
+    """Get directory holding all reverse references."""
+    return data_path / INDEX_DIR_NAME / REFERENCES_DIR_NAME
+
+
+def _references_dir(data_path: Path, relation: Tuple[str, str]) -> Path:
+    """Get directory of one relation (e.g. .index/refs/vehicles-trips)."""
+    parent, child = relation
+    return _references_root(data_path) / f"{parent}-{child}"
+
+
+def _references_path(data_path: Path, relation: Tuple[str, str], parent_id: str) -> Path:
+    """Get reference file listing the children of one parent record."""
+    return _references_dir(data_path, relation) / f"{parent_id}.json"
+
+
+def _record_parents(child: str, record: Optional[Dict[str, Any]]) -> Dict[Tuple[str, str], set]:
+    """Parent IDs a child record points to, per relation."""
+    parents = {}
+    for relation, fields in REFERENCES.items():
+        if relation[1] != child:
+            continue
+        parents[relation] = {
+            record.get(field) for field in fields if record and record.get(field)
+        }
+    return parents
+
+
+def _scan_references(data_path: Path) -> Dict[Tuple[str, str], Dict[str, list]]:
+    """Build all reverse references by parsing child record files."""
+    references = {relation: {} for relation in REFERENCES}
+    on_disk = _scan_record_files(data_path)
+    for child in REFERENCING_COLLECTIONS:
+        for record_id, folder in on_disk[child].items():
+            try:
+                record = read_json(_record_file(data_path, child, folder, record_id))
+            except ValueError:
+                continue
+            for relation, parent_ids in _record_parents(child, record).items():
+                for parent_id in parent_ids:
+                    references[relation].setdefault(parent_id, []).append(record_id)
+
+    for parents in references.values():
+        for children in parents.values():
+            children.sort()
+    return references
+
+
+def _write_references(data_path: Path, references: Dict[Tuple[str, str], Dict[str, list]]) -> None:
+    """Replace all reference files (orphaned files are removed)."""
+    for relation, parents in references.items():
+        relation_dir = _references_dir(data_path, relation)
+        relation_dir.mkdir(parents=True, exist_ok=True)
+        for reference_file in list_json_files(relation_dir):
+            if reference_file.stem not in parents:
+                os.remove(reference_file)
+        for parent_id, children in parents.items():
+            atomic_write_json(
+                _references_path(data_path, relation, parent_id),
+                {"id": parent_id, "dependents": children},
+            )
+
+
+def _safe_reference_update(
+    changes: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+) -> None:
+    """
+    Move children between parent reference files.
+
+    Args:
+        changes: (child collection, child ID, old record, new record); a
+            record is None if the file did not exist before / was deleted
+    """
+    if not changes or _sqlite_enabled():
+        return
+
+    try:
+        data_path = get_data_path()
+        if not _references_root(data_path).exists():
+            # First use builds from record files, which already include this change
+            _write_references(data_path, _scan_references(data_path))
+            return
+
+        # (relation, parent_id) -> {child_id: True (add) / False (remove)}
+        updates: Dict[Tuple[Tuple[str, str], str], Dict[str, bool]] = {}
+        for child, record_id, old, new in changes:
+            new_parents = _record_parents(child, new)
+            for relation, old_ids in _record_parents(child, old).items():
+                for parent_id in old_ids - new_parents[relation]:
+                    updates.setdefault((relation, parent_id), {})[record_id] = False
+            for relation, new_ids in new_parents.items():
+                for parent_id in new_ids:
+                    updates.setdefault((relation, parent_id), {})[record_id] = True
+
+        for (relation, parent_id), children in updates.items():
+            reference_file = _references_path(data_path, relation, parent_id)
+            current = set((read_json(reference_file) or {}).get("dependents", []))
+            updated = {c for c in current if children.get(c, True)}
+            updated.update(c for c, present in children.items() if present)
+            if updated == current:
+                continue
+            if updated:
+                atomic_write_json(
+                    reference_file, {"id": parent_id, "dependents": sorted(updated)}
+                )
+            elif reference_file.exists():
+                os.remove(reference_file)
+    except Exception as e:
+        logger.warning(f"Reference update failed: {e}")
+
+
+def find_dependents(parent_collection: str, parent_id: str, child_collection: str) -> List[str]:
+    """
+    Find records that reference a parent record, without scanning children.
+
+    Args:
+        parent_collection: "vehicles" or "checkpoints"
+        parent_id: Parent record ID
+        child_collection: "checkpoints" or "trips"
+
+    Returns:
+        Sorted child record IDs
+
+    Raises:
+        ValueError: If the collections are not a known relation
+    """
+    relation = (parent_collection, child_collection)
+    if relation not in REFERENCES:
+        raise ValueError(f"Unknown reference: {child_collection} -> {parent_collection}")
+
+    if _sqlite_enabled():
+        return get_sqlite_store().referencing_ids(
+            child_collection, REFERENCES[relation], parent_id
+        )
+
+    data_path = get_data_path()
+    if not _references_root(data_path).exists():
+        _write_references(data_path, _scan_references(data_path))
+
+    try:
+        references = read_json(_references_path(data_path, relation, parent_id))
+    except ValueError:
+        references = None
+    return list((references or {}).get("dependents", []))
+
+
+# ---------------------------------------------------------------------------
+# SQLite backend
+# ---------------------------------------------------------------------------
+
+def _sqlite_collection_dir(directory: Path) -> Optional[str]:
+    """Collection name if directory is a collection base directory."""
+    relative = _data_relative_path(directory)
+    if relative in RECORD_COLLECTIONS:
+        return relative
+    return None
+
+
+def _sqlite_write(file_path: Path, data: Dict[str, Any]) -> bool:
+    """Store a record or document; False if the path is not backend data."""
+    record_key = parse_record_path(file_path)
+    if record_key is not None:
+        collection, folder, record_id = record_key
+        get_sqlite_store().put(collection, folder, record_id, data)
+        return True
+
+    relative = _data_relative_path(file_path)
+    if relative is None or not relative.endswith(".json"):
+        return False
+    get_sqlite_store().put_document(relative, data)
+    return True
+
+
+def _sqlite_read(file_path: Path) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Load a record or document: (handled, data)."""
+    record_key = parse_record_path(file_path)
+    if record_key is not None:
+        collection, folder, record_id = record_key
+        found = get_sqlite_store().get(collection, record_id)
+        if found is None or found[0] != folder:
+            return True, None
+        return True, found[1]
+
+    relative = _data_relative_path(file_path)
+    if relative is None or not relative.endswith(".json"):
+        return False, None
+    return True, get_sqlite_store().get_document(relative)
+
+
+def _sqlite_delete(file_path: Path) -> Optional[bool]:
+    """Delete a record or document: removed flag, or None if not backend data."""
+    record_key = parse_record_path(file_path)
+    if record_key is not None:
+        collection, folder, record_id = record_key
+        found = get_sqlite_store().get(collection, record_id)
+        if found is None or found[0] != folder:
+            return False
+        return get_sqlite_store().delete(collection, record_id)
+
+    relative = _data_relative_path(file_path)
+    if relative is None or not relative.endswith(".json"):
+        return None
+    return get_sqlite_store().delete_document(relative)
+
+
+def _sqlite_list(directory: Path) -> Optional[list[Path]]:
+    """Virtual file paths of a collection/month directory, or None if not backend data."""
+    relative = _data_relative_path(directory)
+    if relative is None:
+        return None
+
+    store = get_sqlite_store()
+    parts = Path(relative).parts
+    if len(parts) == 1 and parts[0] in FLAT_COLLECTIONS:
+        return [directory / f"{record_id}.json" for record_id in store.ids(parts[0], "")]
+    if len(parts) == 2 and parts[0] in MONTHLY_COLLECTIONS:
+        return [directory / f"{record_id}.json" for record_id in store.ids(parts[0], parts[1])]
+
+    data_path = get_data_path()
+    return [
+        data_path / path for path in store.document_paths(relative if relative != "." else "")
+        if Path(path).parent == Path(relative)
+    ]
+
+
+def _sqlite_exists(file_path: Path) -> Optional[bool]:
+    """Existence of a record, document or directory, or None if not backend data."""
+    relative = _data_relative_path(file_path)
+    if relative is None:
+        return None
+
+    store = get_sqlite_store()
+    record_key = parse_record_path(file_path)
+    if record_key is not None:
+        collection, folder, record_id = record_key
+        found = store.get(collection, record_id)
+        return found is not None and found[0] == folder
+
+    parts = Path(relative).parts
+    if len(parts) == 1 and parts[0] in RECORD_COLLECTIONS:
+        return store.count(parts[0]) > 0
+    if len(parts) == 2 and parts[0] in MONTHLY_COLLECTIONS:
+        return bool(store.ids(parts[0], parts[1]))
+    if relative.endswith(".json"):
+        return store.get_document(relative) is not None
+    return bool(store.document_paths(relative))
@@ -13,7 +13,8 @@ from ..storage import (
     atomic_write_json,
     read_json,
     ensure_month_folder,
-    list_json_files,
+    read_record,
+    find_checkpoint_before,
 )
 
 INPUT_SCHEMA = {
@@ -98,37 +99,12 @@ def find_previous_checkpoint(vehicle_id: str, current_datetime: datetime, data_p
     Returns:
         (previous_checkpoint_id, previous_odometer, distance_since_previous)
     """
-    checkpoints_dir = data_path / "checkpoints"
-
-    if not checkpoints_dir.exists():
-        return None, None, None
-
-    # Search through all month folders
-    all_checkpoints = []
-    for month_folder in checkpoints_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        for checkpoint_file in list_json_files(month_folder):
-            checkpoint = read_json(checkpoint_file)
-            if checkpoint and checkpoint.get("vehicle_id") == vehicle_id:
-                try:
-                    cp_dt = datetime.fromisoformat(checkpoint["datetime"].replace("Z", "+00:00"))
-                    if cp_dt < current_datetime:
-                        all_checkpoints.append(checkpoint)
-                except (ValueError, KeyError, TypeError):
-                    continue
-
-    if not all_checkpoints:
+    # Binary search on the vehicle's checkpoint timeline (no file scan)
+    previous = find_checkpoint_before(vehicle_id, current_datetime)
+    if previous is None:
         return None, None, None
 
-    # Find most recent
-    all_checkpoints.sort(key=lambda cp: cp["datetime"], reverse=True)
-    previous = all_checkpoints[0]
-
-    previous_odometer = previous["odometer_km"]
-
-    return previous["checkpoint_id"], previous_odometer, None
+    return previous["checkpoint_id"], previous["odometer_km"], None
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -274,17 +250,9 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
                 # Calculate time gap
                 if prev_id:
-                    prev_checkpoint_file = None
-                    for month_folder in (data_path / "checkpoints").iterdir():
-                        if not month_folder.is_dir():
-                            continue
-                        test_file = month_folder / f"{prev_id}.json"
-                        if test_file.exists():
-                            prev_checkpoint_file = test_file
-                            break
-
-                    if prev_checkpoint_file:
-                        prev_checkpoint = read_json(prev_checkpoint_file)
+                    prev_checkpoint = read_record("checkpoints", prev_id)
+
+                    if prev_checkpoint:
                         prev_dt = datetime.fromisoformat(prev_checkpoint["datetime"].replace("Z", "+00:00"))
                         time_delta = checkpoint_dt - prev_dt
 
@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any
 
-from ..storage import get_data_path, read_json, atomic_write_json
+from ..storage import get_data_path, read_json, atomic_write_json, bump_templates_revision
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -201,6 +201,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
         # Save atomically
         atomic_write_json(templates_file, templates_data)
+        bump_templates_revision()
 
         return {
             "success": True,
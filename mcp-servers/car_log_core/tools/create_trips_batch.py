@@ -11,7 +11,7 @@ from typing import Dict, Any
 
 from ..storage import (
     get_data_path,
-    atomic_write_json,
+    atomic_write_json_batch,
     read_json,
     ensure_month_folder,
 )
@@ -219,10 +219,11 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                     },
                 }
 
-        # All validations passed, create trips
+        # All validations passed, build trips
         now = datetime.utcnow().isoformat() + "Z"
         created_trips = []
         created_trip_ids = []
+        trip_files = []
 
         for trip_data in trips_data:
             # Generate trip ID
@@ -272,11 +273,13 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
             month_folder = ensure_month_folder(trips_base, trip_start_dt)
             trip_file = month_folder / f"{trip_id}.json"
 
-            atomic_write_json(trip_file, trip)
-
+            trip_files.append((trip_file, trip))
             created_trips.append(trip)
             created_trip_ids.append(trip_id)
 
+        # Write all trips as one batch (all or nothing)
+        atomic_write_json_batch(trip_files)
+
         return {
             "success": True,
             "trip_ids": created_trip_ids,
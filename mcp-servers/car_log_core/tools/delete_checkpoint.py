@@ -6,14 +6,15 @@ Use case: Users must be able to remove bad data.
 Note: Warns if trips reference this checkpoint.
 """
 
-import os
 from typing import Dict, Any
 from pathlib import Path
 
 from ..storage import (
     get_data_path,
-    read_json,
-    list_json_files,
+    find_record_file,
+    find_dependents,
+    delete_json,
+    delete_json_batch,
 )
 
 INPUT_SCHEMA = {
@@ -36,7 +37,7 @@ INPUT_SCHEMA = {
 
 def find_checkpoint_file(checkpoint_id: str, data_path: Path) -> Path:
     """
-    Find checkpoint file across all month folders.
+    Find checkpoint file across all month folders (via ID index).
 
     Args:
         checkpoint_id: Checkpoint ID
@@ -45,26 +46,12 @@ def find_checkpoint_file(checkpoint_id: str, data_path: Path) -> Path:
     Returns:
         Path to checkpoint file or None if not found
     """
-    checkpoints_dir = data_path / "checkpoints"
-
-    if not checkpoints_dir.exists():
-        return None
-
-    # Search through all month folders
-    for month_folder in checkpoints_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        checkpoint_file = month_folder / f"{checkpoint_id}.json"
-        if checkpoint_file.exists():
-            return checkpoint_file
-
-    return None
+    return find_record_file("checkpoints", checkpoint_id)
 
 
 def find_dependent_trips(checkpoint_id: str, data_path: Path) -> list[str]:
     """
-    Find trips that reference this checkpoint.
+    Find trips that reference this checkpoint (via reverse references).
 
     Args:
         checkpoint_id: Checkpoint ID
@@ -73,27 +60,7 @@ def find_dependent_trips(checkpoint_id: str, data_path: Path) -> list[str]:
     Returns:
         List of trip IDs that reference this checkpoint
     """
-    trips_dir = data_path / "trips"
-
-    if not trips_dir.exists():
-        return []
-
-    dependent_trips = []
-
-    # Search through all month folders
-    for month_folder in trips_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        for trip_file in list_json_files(month_folder):
-            trip = read_json(trip_file)
-            if trip:
-                # Check if trip references this checkpoint
-                if (trip.get("start_checkpoint_id") == checkpoint_id or
-                    trip.get("end_checkpoint_id") == checkpoint_id):
-                    dependent_trips.append(trip["trip_id"])
-
-    return dependent_trips
+    return find_dependents("checkpoints", checkpoint_id, "trips")
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -151,20 +118,18 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 }
             else:
                 # Delete dependent trips
-                trips_dir = data_path / "trips"
-                for month_folder in trips_dir.iterdir():
-                    if not month_folder.is_dir():
-                        continue
-
-                    for trip_id in dependent_trips:
-                        trip_file = month_folder / f"{trip_id}.json"
-                        if trip_file.exists():
-                            os.remove(trip_file)
+                delete_json_batch([
+                    trip_file
+                    for trip_file in (
+                        find_record_file("trips", trip_id) for trip_id in dependent_trips
+                    )
+                    if trip_file is not None
+                ])
 
                 warnings.append(f"Cascade deleted {len(dependent_trips)} dependent trip(s)")
 
         # Delete checkpoint file
-        os.remove(checkpoint_file)
+        delete_json(checkpoint_file)
 
         return {
             "success": True,
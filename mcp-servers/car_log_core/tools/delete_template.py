@@ -6,7 +6,13 @@ Templates are stored in a single file: data/typical-destinations.json
 
 from typing import Dict, Any
 
-from ..storage import get_data_path, read_json, atomic_write_json
+from ..storage import (
+    get_data_path,
+    read_json,
+    atomic_write_json,
+    bump_templates_revision,
+    path_exists,
+)
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -37,7 +43,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
     templates_file = get_data_path() / "typical-destinations.json"
 
     # Read existing templates
-    if not templates_file.exists():
+    if not path_exists(templates_file):
         return {
             "success": False,
             "error": {
@@ -71,6 +77,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
     # Save updated templates
     data["templates"] = templates
     atomic_write_json(templates_file, data)
+    bump_templates_revision()
 
     return {
         "success": True,
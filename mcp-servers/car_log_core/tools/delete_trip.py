@@ -4,11 +4,9 @@ Delete trip by ID.
 Trips are stored in monthly folders: data/trips/YYYY-MM/{trip_id}.json
 """
 
-import os
-from datetime import datetime
 from typing import Dict, Any
 
-from ..storage import get_data_path, read_json
+from ..storage import get_data_path, read_json, find_record_file, delete_json, path_exists
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -35,10 +33,10 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
     """
     trip_id = arguments["trip_id"]
 
-    # Search through monthly folders to find the trip (use Path / operator)
+    # Trips live in monthly folders (use Path / operator)
     trips_base = get_data_path() / "trips"
 
-    if not trips_base.exists():
+    if not path_exists(trips_base):
         return {
             "success": False,
             "error": {
@@ -47,19 +45,8 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
             },
         }
 
-    # Search all monthly folders
-    trip_file = None
-    trip_data = None
-
-    for month_dir in trips_base.iterdir():
-        if not month_dir.is_dir():
-            continue
-
-        trip_path = month_dir / f"{trip_id}.json"
-        if trip_path.exists():
-            trip_file = trip_path
-            trip_data = read_json(trip_path)
-            break
+    # Indexed lookup across monthly folders
+    trip_file = find_record_file("trips", trip_id)
 
     if trip_file is None:
         return {
@@ -70,9 +57,11 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
             },
         }
 
+    trip_data = read_json(trip_file)
+
     # Delete the trip file
     try:
-        trip_file.unlink()  # Path.unlink() to delete file
+        delete_json(trip_file)
     except OSError as e:
         return {
             "success": False,
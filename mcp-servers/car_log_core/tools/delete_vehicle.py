@@ -6,14 +6,16 @@ Use case: Remove vehicles no longer in use.
 Note: Warns if checkpoints/trips exist for this vehicle.
 """
 
-import os
 from typing import Dict, Any
 from pathlib import Path
 
 from ..storage import (
     get_data_path,
-    read_json,
-    list_json_files,
+    find_record_file,
+    find_dependents,
+    delete_json,
+    delete_json_batch,
+    path_exists,
 )
 
 INPUT_SCHEMA = {
@@ -36,7 +38,7 @@ INPUT_SCHEMA = {
 
 def find_dependent_checkpoints(vehicle_id: str, data_path: Path) -> list[str]:
     """
-    Find checkpoints belonging to this vehicle.
+    Find checkpoints belonging to this vehicle (via reverse references).
 
     Args:
         vehicle_id: Vehicle ID
@@ -45,29 +47,12 @@ def find_dependent_checkpoints(vehicle_id: str, data_path: Path) -> list[str]:
     Returns:
         List of checkpoint IDs
     """
-    checkpoints_dir = data_path / "checkpoints"
-
-    if not checkpoints_dir.exists():
-        return []
-
-    dependent_checkpoints = []
-
-    # Search through all month folders
-    for month_folder in checkpoints_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        for checkpoint_file in list_json_files(month_folder):
-            checkpoint = read_json(checkpoint_file)
-            if checkpoint and checkpoint.get("vehicle_id") == vehicle_id:
-                dependent_checkpoints.append(checkpoint["checkpoint_id"])
-
-    return dependent_checkpoints
+    return find_dependents("vehicles", vehicle_id, "checkpoints")
 
 
 def find_dependent_trips(vehicle_id: str, data_path: Path) -> list[str]:
     """
-    Find trips belonging to this vehicle.
+    Find trips belonging to this vehicle (via reverse references).
 
     Args:
         vehicle_id: Vehicle ID
@@ -76,24 +61,7 @@ def find_dependent_trips(vehicle_id: str, data_path: Path) -> list[str]:
     Returns:
         List of trip IDs
     """
-    trips_dir = data_path / "trips"
-
-    if not trips_dir.exists():
-        return []
-
-    dependent_trips = []
-
-    # Search through all month folders
-    for month_folder in trips_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        for trip_file in list_json_files(month_folder):
-            trip = read_json(trip_file)
-            if trip and trip.get("vehicle_id") == vehicle_id:
-                dependent_trips.append(trip["trip_id"])
-
-    return dependent_trips
+    return find_dependents("vehicles", vehicle_id, "trips")
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -126,7 +94,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         data_path = get_data_path()
         vehicle_file = data_path / "vehicles" / f"{vehicle_id}.json"
 
-        if not vehicle_file.exists():
+        if not path_exists(vehicle_file):
             return {
                 "success": False,
                 "error": {
@@ -153,33 +121,30 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 }
             else:
                 # Delete dependent checkpoints
-                checkpoints_dir = data_path / "checkpoints"
-                for month_folder in checkpoints_dir.iterdir():
-                    if not month_folder.is_dir():
-                        continue
-
-                    for checkpoint_id in dependent_checkpoints:
-                        checkpoint_file = month_folder / f"{checkpoint_id}.json"
-                        if checkpoint_file.exists():
-                            os.remove(checkpoint_file)
+                delete_json_batch([
+                    checkpoint_file
+                    for checkpoint_file in (
+                        find_record_file("checkpoints", checkpoint_id)
+                        for checkpoint_id in dependent_checkpoints
+                    )
+                    if checkpoint_file is not None
+                ])
 
                 warnings.append(f"Cascade deleted {len(dependent_checkpoints)} checkpoint(s)")
 
                 # Delete dependent trips
-                trips_dir = data_path / "trips"
-                for month_folder in trips_dir.iterdir():
-                    if not month_folder.is_dir():
-                        continue
-
-                    for trip_id in dependent_trips:
-                        trip_file = month_folder / f"{trip_id}.json"
-                        if trip_file.exists():
-                            os.remove(trip_file)
+                delete_json_batch([
+                    trip_file
+                    for trip_file in (
+                        find_record_file("trips", trip_id) for trip_id in dependent_trips
+                    )
+                    if trip_file is not None
+                ])
 
                 warnings.append(f"Cascade deleted {len(dependent_trips)} trip(s)")
 
         # Delete vehicle file
-        os.remove(vehicle_file)
+        delete_json(vehicle_file)
 
         return {
             "success": True,
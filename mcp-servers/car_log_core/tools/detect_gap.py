@@ -5,7 +5,7 @@ Detect and analyze gap between two checkpoints.
 from datetime import datetime
 from typing import Dict, Any
 
-from ..storage import get_data_path, read_json
+from ..storage import get_data_path, read_record
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -27,7 +27,7 @@ INPUT_SCHEMA = {
 
 def find_checkpoint(checkpoint_id: str, data_path) -> dict:
     """
-    Find checkpoint by ID across all month folders.
+    Find checkpoint by ID across all month folders (via ID index).
 
     Args:
         checkpoint_id: Checkpoint ID to find
@@ -36,20 +36,108 @@ def find_checkpoint(checkpoint_id: str, data_path) -> dict:
     Returns:
         Checkpoint data or None
     """
-    checkpoints_dir = data_path / "checkpoints"
+    return read_record("checkpoints", checkpoint_id)
 
-    if not checkpoints_dir.exists():
-        return None
 
-    for month_folder in checkpoints_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
+def analyze_gap(start_checkpoint: Dict[str, Any], end_checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analyze gap between two checkpoint records.
+
+    Args:
+        start_checkpoint: Earlier checkpoint
+        end_checkpoint: Later checkpoint
+
+    Returns:
+        Success response with gap analysis (as detect_gap returns it)
+    """
+    # Verify they're for the same vehicle
+    if start_checkpoint.get("vehicle_id") != end_checkpoint.get("vehicle_id"):
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Checkpoints must be for the same vehicle",
+            },
+        }
+
+    # Calculate distance gap
+    start_odometer = start_checkpoint.get("odometer_km")
+    end_odometer = end_checkpoint.get("odometer_km")
+
+    if start_odometer is None or end_odometer is None:
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Both checkpoints must have odometer readings",
+            },
+        }
+
+    distance_km = end_odometer - start_odometer
+
+    if distance_km < 0:
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Start checkpoint must be before end checkpoint (odometer regression detected)",
+            },
+        }
+
+    # Calculate time gap
+    try:
+        start_dt = datetime.fromisoformat(start_checkpoint["datetime"].replace("Z", "+00:00"))
+        end_dt = datetime.fromisoformat(end_checkpoint["datetime"].replace("Z", "+00:00"))
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": f"Invalid datetime format: {e}",
+            },
+        }
+
+    time_delta = end_dt - start_dt
 
-        checkpoint_file = month_folder / f"{checkpoint_id}.json"
-        if checkpoint_file.exists():
-            return read_json(checkpoint_file)
+    if time_delta.total_seconds() < 0:
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Start checkpoint must be before end checkpoint (time regression detected)",
+            },
+        }
+
+    days = time_delta.total_seconds() / 86400
+    hours = time_delta.total_seconds() / 3600
 
-    return None
+    # Check if GPS coordinates are available
+    start_location = start_checkpoint.get("location", {})
+    end_location = end_checkpoint.get("location", {})
+
+    has_gps = (
+        start_location.get("coords") is not None
+        and end_location.get("coords") is not None
+    )
+
+    # Calculate average km per day
+    avg_km_per_day = distance_km / days if days > 0 else 0
+
+    # Determine if reconstruction is recommended
+    # Threshold: 100km+ distance or 7+ days
+    reconstruction_recommended = distance_km >= 100 or days >= 7
+
+    return {
+        "success": True,
+        "distance_km": distance_km,
+        "days": round(days, 2),
+        "hours": round(hours, 2),
+        "start_checkpoint": start_checkpoint,
+        "end_checkpoint": end_checkpoint,
+        "has_gps": has_gps,
+        "avg_km_per_day": round(avg_km_per_day, 2),
+        "reconstruction_recommended": reconstruction_recommended,
+    }
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -98,94 +186,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 },
             }
 
-        # Verify they're for the same vehicle
-        if start_checkpoint.get("vehicle_id") != end_checkpoint.get("vehicle_id"):
-            return {
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Checkpoints must be for the same vehicle",
-                },
-            }
-
-        # Calculate distance gap
-        start_odometer = start_checkpoint.get("odometer_km")
-        end_odometer = end_checkpoint.get("odometer_km")
-
-        if start_odometer is None or end_odometer is None:
-            return {
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Both checkpoints must have odometer readings",
-                },
-            }
-
-        distance_km = end_odometer - start_odometer
-
-        if distance_km < 0:
-            return {
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Start checkpoint must be before end checkpoint (odometer regression detected)",
-                },
-            }
-
-        # Calculate time gap
-        try:
-            start_dt = datetime.fromisoformat(start_checkpoint["datetime"].replace("Z", "+00:00"))
-            end_dt = datetime.fromisoformat(end_checkpoint["datetime"].replace("Z", "+00:00"))
-        except ValueError as e:
-            return {
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": f"Invalid datetime format: {e}",
-                },
-            }
-
-        time_delta = end_dt - start_dt
-
-        if time_delta.total_seconds() < 0:
-            return {
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Start checkpoint must be before end checkpoint (time regression detected)",
-                },
-            }
-
-        days = time_delta.total_seconds() / 86400
-        hours = time_delta.total_seconds() / 3600
-
-        # Check if GPS coordinates are available
-        start_location = start_checkpoint.get("location", {})
-        end_location = end_checkpoint.get("location", {})
-
-        has_gps = (
-            start_location.get("coords") is not None
-            and end_location.get("coords") is not None
-        )
-
-        # Calculate average km per day
-        avg_km_per_day = distance_km / days if days > 0 else 0
-
-        # Determine if reconstruction is recommended
-        # Threshold: 100km+ distance or 7+ days
-        reconstruction_recommended = distance_km >= 100 or days >= 7
-
-        return {
-            "success": True,
-            "distance_km": distance_km,
-            "days": round(days, 2),
-            "hours": round(hours, 2),
-            "start_checkpoint": start_checkpoint,
-            "end_checkpoint": end_checkpoint,
-            "has_gps": has_gps,
-            "avg_km_per_day": round(avg_km_per_day, 2),
-            "reconstruction_recommended": reconstruction_recommended,
-        }
+        return analyze_gap(start_checkpoint, end_checkpoint)
 
     except Exception as e:
         return {
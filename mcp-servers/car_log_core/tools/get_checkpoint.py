@@ -4,7 +4,7 @@ Get checkpoint by ID.
 
 from typing import Dict, Any
 
-from ..storage import get_data_path, read_json
+from ..storage import read_record
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -42,33 +42,14 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 },
             }
 
-        # Search through monthly folders
-        data_path = get_data_path()
-        checkpoints_dir = data_path / "checkpoints"
-
-        if not checkpoints_dir.exists():
+        # Indexed lookup across monthly folders
+        checkpoint = read_record("checkpoints", checkpoint_id)
+        if checkpoint:
             return {
-                "success": False,
-                "error": {
-                    "code": "NOT_FOUND",
-                    "message": f"Checkpoint not found: {checkpoint_id}",
-                },
+                "success": True,
+                "checkpoint": checkpoint,
             }
 
-        # Search all month folders
-        for month_folder in checkpoints_dir.iterdir():
-            if not month_folder.is_dir():
-                continue
-
-            checkpoint_file = month_folder / f"{checkpoint_id}.json"
-            if checkpoint_file.exists():
-                checkpoint = read_json(checkpoint_file)
-                if checkpoint:
-                    return {
-                        "success": True,
-                        "checkpoint": checkpoint,
-                    }
-
         return {
             "success": False,
             "error": {
@@ -11,6 +11,7 @@ from pathlib import Path
 from ..storage import (
     get_data_path,
     read_json,
+    path_exists,
 )
 
 INPUT_SCHEMA = {
@@ -55,7 +56,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         data_path = get_data_path()
         template_file = data_path / "templates" / f"{template_id}.json"
 
-        if not template_file.exists():
+        if not path_exists(template_file):
             return {
                 "success": False,
                 "error": {
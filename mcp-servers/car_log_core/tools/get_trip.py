@@ -6,7 +6,7 @@ Retrieves trip data including all Slovak compliance fields.
 
 from typing import Dict, Any
 
-from ..storage import get_data_path, read_json
+from ..storage import read_record
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -44,33 +44,14 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 },
             }
 
-        # Search through monthly folders
-        data_path = get_data_path()
-        trips_dir = data_path / "trips"
-
-        if not trips_dir.exists():
+        # Indexed lookup across monthly folders
+        trip = read_record("trips", trip_id)
+        if trip:
             return {
-                "success": False,
-                "error": {
-                    "code": "NOT_FOUND",
-                    "message": f"Trip not found: {trip_id}",
-                },
+                "success": True,
+                "trip": trip,
             }
 
-        # Search all month folders
-        for month_folder in trips_dir.iterdir():
-            if not month_folder.is_dir():
-                continue
-
-            trip_file = month_folder / f"{trip_id}.json"
-            if trip_file.exists():
-                trip = read_json(trip_file)
-                if trip:
-                    return {
-                        "success": True,
-                        "trip": trip,
-                    }
-
         return {
             "success": False,
             "error": {
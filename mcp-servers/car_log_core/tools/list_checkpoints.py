@@ -1,11 +1,21 @@
 """
 List checkpoints with filters (vehicle_id, date range, type).
+
+Returns checkpoints sorted by datetime descending; pages through history with
+the `after` cursor (see next_cursor).
 """
 
 from datetime import datetime
 from typing import Dict, Any
 
-from ..storage import get_data_path, list_json_files, read_json
+from ..storage import (
+    get_data_path,
+    iter_manifest_rows,
+    read_manifest_record,
+    path_exists,
+    select_newest,
+    validate_cursor,
+)
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -37,6 +47,15 @@ INPUT_SCHEMA = {
             "default": 50,
             "description": "Maximum number of results",
         },
+        "after": {
+            "type": "object",
+            "properties": {
+                "datetime": {"type": "string"},
+                "id": {"type": "string"},
+            },
+            "required": ["datetime", "id"],
+            "description": "Page cursor: next_cursor of the previous response (returns older checkpoints)",
+        },
     },
     "required": ["vehicle_id"],
 }
@@ -58,6 +77,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         end_date = arguments.get("end_date")
         checkpoint_type = arguments.get("checkpoint_type")
         limit = arguments.get("limit", 50)
+        after = arguments.get("after")
 
         if not vehicle_id:
             return {
@@ -69,6 +89,16 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 },
             }
 
+        if after is not None and not validate_cursor(after):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "Invalid cursor (use next_cursor from a previous response)",
+                    "field": "after",
+                },
+            }
+
         # Parse date filters
         start_dt = None
         end_dt = None
@@ -101,40 +131,33 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                     },
                 }
 
-        # Read all checkpoint files
+        # Filter on month manifests (no per-checkpoint JSON parsing)
         data_path = get_data_path()
         checkpoints_dir = data_path / "checkpoints"
-        checkpoints = []
 
-        if not checkpoints_dir.exists():
+        if not path_exists(checkpoints_dir):
             return {
                 "success": True,
                 "checkpoints": [],
                 "count": 0,
+                "next_cursor": None,
             }
 
-        # Search through all month folders
-        for month_folder in checkpoints_dir.iterdir():
-            if not month_folder.is_dir():
-                continue
-
-            for checkpoint_file in list_json_files(month_folder):
-                checkpoint = read_json(checkpoint_file)
-                if checkpoint is None:
-                    continue
-
+        def matching_rows():
+            """Rows passing the filters (streamed into the page heap)."""
+            for row in iter_manifest_rows("checkpoints"):
                 # Filter by vehicle_id
-                if checkpoint.get("vehicle_id") != vehicle_id:
+                if row.get("vehicle_id") != vehicle_id:
                     continue
 
                 # Filter by checkpoint_type
-                if checkpoint_type and checkpoint.get("checkpoint_type") != checkpoint_type:
+                if checkpoint_type and row.get("checkpoint_type") != checkpoint_type:
                     continue
 
                 # Filter by date range
                 if start_dt or end_dt:
                     try:
-                        cp_dt = datetime.fromisoformat(checkpoint["datetime"].replace("Z", "+00:00"))
+                        cp_dt = datetime.fromisoformat(row["datetime"].replace("Z", "+00:00"))
 
                         if start_dt and cp_dt < start_dt:
                             continue
@@ -144,18 +167,23 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                     except (ValueError, KeyError, TypeError):
                         continue
 
-                checkpoints.append(checkpoint)
+                yield row
 
-        # Sort by datetime (most recent first)
-        checkpoints.sort(key=lambda cp: cp.get("datetime", ""), reverse=True)
+        # Keep only the newest page (most recent first) in a bounded heap
+        rows, next_cursor = select_newest(matching_rows(), limit, after)
 
-        # Apply limit
-        checkpoints = checkpoints[:limit]
+        # Load full checkpoint JSON only for returned rows
+        checkpoints = []
+        for row in rows:
+            checkpoint = read_manifest_record("checkpoints", row)
+            if checkpoint is not None:
+                checkpoints.append(checkpoint)
 
         return {
             "success": True,
             "checkpoints": checkpoints,
             "count": len(checkpoints),
+            "next_cursor": next_cursor,
         }
 
     except Exception as e:
@@ -2,12 +2,23 @@
 List trips with filters (vehicle_id, date range, purpose).
 
 Returns trips sorted by datetime descending with summary statistics.
+Pages through history with the `after` cursor (see next_cursor).
 """
 
 from datetime import datetime
 from typing import Dict, Any
 
-from ..storage import get_data_path, list_json_files, read_json
+from ..storage import (
+    get_data_path,
+    iter_manifest_rows,
+    read_manifest_record,
+    path_exists,
+    select_newest,
+    validate_cursor,
+    add_to_rollups,
+    iter_rollups,
+    summarize_rollups,
+)
 
 INPUT_SCHEMA = {
     "type": "object",
@@ -39,6 +50,15 @@ INPUT_SCHEMA = {
             "default": 100,
             "description": "Maximum number of results",
         },
+        "after": {
+            "type": "object",
+            "properties": {
+                "datetime": {"type": "string"},
+                "id": {"type": "string"},
+            },
+            "required": ["datetime", "id"],
+            "description": "Page cursor: next_cursor of the previous response (returns older trips)",
+        },
     },
     "required": [],
 }
@@ -60,6 +80,17 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         end_date = arguments.get("end_date")
         purpose = arguments.get("purpose")
         limit = arguments.get("limit", 100)
+        after = arguments.get("after")
+
+        if after is not None and not validate_cursor(after):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "Invalid cursor (use next_cursor from a previous response)",
+                    "field": "after",
+                },
+            }
 
         # Parse date filters
         start_dt = None
@@ -93,48 +124,40 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                     },
                 }
 
-        # Read all trip files
+        # Filter on month manifests (no per-trip JSON parsing)
         data_path = get_data_path()
         trips_dir = data_path / "trips"
-        trips = []
 
-        if not trips_dir.exists():
+        if not path_exists(trips_dir):
             return {
                 "success": True,
                 "trips": [],
                 "count": 0,
-                "summary": {
-                    "total_distance_km": 0,
-                    "business_trips": 0,
-                    "personal_trips": 0,
-                    "business_distance_km": 0,
-                    "personal_distance_km": 0,
-                },
+                "summary": summarize_rollups([]),
+                "next_cursor": None,
             }
 
-        # Search through all month folders
-        for month_folder in trips_dir.iterdir():
-            if not month_folder.is_dir():
-                continue
-
-            for trip_file in list_json_files(month_folder):
-                trip = read_json(trip_file)
-                if trip is None:
-                    continue
+        date_filtered = bool(start_dt or end_dt)
+        rollups = {}
 
+        def matching_rows():
+            """Filtered rows; with a date range they also feed the summary."""
+            # Months outside the date range are pruned by folder name
+            source = iter_manifest_rows("trips", start_dt, end_dt, reverse=not date_filtered)
+            for row in source:
                 # Filter by vehicle_id
-                if vehicle_id and trip.get("vehicle_id") != vehicle_id:
+                if vehicle_id and row.get("vehicle_id") != vehicle_id:
                     continue
 
                 # Filter by purpose
-                if purpose and trip.get("purpose") != purpose:
+                if purpose and row.get("purpose") != purpose:
                     continue
 
                 # Filter by date range
-                if start_dt or end_dt:
+                if date_filtered:
                     try:
                         trip_dt = datetime.fromisoformat(
-                            trip["trip_start_datetime"].replace("Z", "+00:00")
+                            row.get("datetime").replace("Z", "+00:00")
                         )
 
                         if start_dt and trip_dt < start_dt:
@@ -145,34 +168,34 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                     except (ValueError, AttributeError, TypeError):
                         continue
 
-                trips.append(trip)
+                    add_to_rollups(rollups, row)
 
-        # Sort by datetime (most recent first)
-        trips.sort(key=lambda t: t.get("trip_start_datetime", ""), reverse=True)
-
-        # Calculate summary statistics (before limiting)
-        total_distance = sum(t.get("distance_km", 0) for t in trips)
-        business_trips = [t for t in trips if t.get("purpose") == "Business"]
-        personal_trips = [t for t in trips if t.get("purpose") == "Personal"]
-        business_distance = sum(t.get("distance_km", 0) for t in business_trips)
-        personal_distance = sum(t.get("distance_km", 0) for t in personal_trips)
-
-        summary = {
-            "total_distance_km": total_distance,
-            "business_trips": len(business_trips),
-            "personal_trips": len(personal_trips),
-            "business_distance_km": business_distance,
-            "personal_distance_km": personal_distance,
-        }
+                yield row
 
-        # Apply limit
-        trips = trips[:limit]
+        # Keep only the newest page (most recent first) in a bounded heap.
+        # Without a date range the summary comes from monthly rollups, so
+        # reading stops at the oldest month that can still reach the page.
+        rows, next_cursor = select_newest(
+            matching_rows(), limit, after, newest_months_first=not date_filtered
+        )
+        if date_filtered:
+            summary = summarize_rollups(rollups.values())
+        else:
+            summary = summarize_rollups(iter_rollups(vehicle_id=vehicle_id, purpose=purpose))
+
+        # Load full trip JSON only for returned rows
+        trips = []
+        for row in rows:
+            trip = read_manifest_record("trips", row)
+            if trip is not None:
+                trips.append(trip)
 
         return {
             "success": True,
             "trips": trips,
             "count": len(trips),
             "summary": summary,
+            "next_cursor": next_cursor,
         }
 
     except Exception as e:
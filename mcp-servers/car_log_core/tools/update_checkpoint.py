@@ -14,7 +14,8 @@ from ..storage import (
     get_data_path,
     atomic_write_json,
     read_json,
-    list_json_files,
+    find_record_file,
+    get_checkpoint_timeline,
 )
 
 INPUT_SCHEMA = {
@@ -77,7 +78,7 @@ INPUT_SCHEMA = {
 
 def find_checkpoint_file(checkpoint_id: str, data_path: Path) -> Path:
     """
-    Find checkpoint file across all month folders.
+    Find checkpoint file across all month folders (via ID index).
 
     Args:
         checkpoint_id: Checkpoint ID
@@ -86,21 +87,7 @@ def find_checkpoint_file(checkpoint_id: str, data_path: Path) -> Path:
     Returns:
         Path to checkpoint file or None if not found
     """
-    checkpoints_dir = data_path / "checkpoints"
-
-    if not checkpoints_dir.exists():
-        return None
-
-    # Search through all month folders
-    for month_folder in checkpoints_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        checkpoint_file = month_folder / f"{checkpoint_id}.json"
-        if checkpoint_file.exists():
-            return checkpoint_file
-
-    return None
+    return find_record_file("checkpoints", checkpoint_id)
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -253,23 +240,10 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
             if vehicle:
                 # Check if this is the most recent checkpoint for this vehicle
-                checkpoints_dir = data_path / "checkpoints"
-                all_checkpoints = []
-
-                for month_folder in checkpoints_dir.iterdir():
-                    if not month_folder.is_dir():
-                        continue
-
-                    for cp_file in list_json_files(month_folder):
-                        cp = read_json(cp_file)
-                        if cp and cp.get("vehicle_id") == vehicle_id:
-                            all_checkpoints.append(cp)
-
-                # Sort by datetime
-                all_checkpoints.sort(key=lambda cp: cp["datetime"], reverse=True)
+                timeline = get_checkpoint_timeline(vehicle_id)
 
                 # If this checkpoint is the most recent, update vehicle
-                if all_checkpoints and all_checkpoints[0]["checkpoint_id"] == checkpoint_id:
+                if timeline and timeline[-1]["checkpoint_id"] == checkpoint_id:
                     vehicle["current_odometer_km"] = checkpoint["odometer_km"]
                     vehicle["updated_at"] = now
                     atomic_write_json(vehicle_file, vehicle)
@@ -12,7 +12,9 @@ from pathlib import Path
 from ..storage import (
     get_data_path,
     atomic_write_json,
+    bump_templates_revision,
     read_json,
+    path_exists,
 )
 
 INPUT_SCHEMA = {
@@ -135,7 +137,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         data_path = get_data_path()
         template_file = data_path / "templates" / f"{template_id}.json"
 
-        if not template_file.exists():
+        if not path_exists(template_file):
             return {
                 "success": False,
                 "error": {
@@ -288,6 +290,7 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
         # Atomic write
         atomic_write_json(template_file, template)
+        bump_templates_revision()
 
         return {
             "success": True,
@@ -12,7 +12,10 @@ from pathlib import Path
 from ..storage import (
     get_data_path,
     atomic_write_json,
+    move_json,
     read_json,
+    find_record_file,
+    get_month_folder,
 )
 
 INPUT_SCHEMA = {
@@ -82,7 +85,7 @@ INPUT_SCHEMA = {
 
 def find_trip_file(trip_id: str, data_path: Path) -> Path:
     """
-    Find trip file across all month folders.
+    Find trip file across all month folders (via ID index).
 
     Args:
         trip_id: Trip ID
@@ -91,21 +94,7 @@ def find_trip_file(trip_id: str, data_path: Path) -> Path:
     Returns:
         Path to trip file or None if not found
     """
-    trips_dir = data_path / "trips"
-
-    if not trips_dir.exists():
-        return None
-
-    # Search through all month folders
-    for month_folder in trips_dir.iterdir():
-        if not month_folder.is_dir():
-            continue
-
-        trip_file = month_folder / f"{trip_id}.json"
-        if trip_file.exists():
-            return trip_file
-
-    return None
+    return find_record_file("trips", trip_id)
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -177,8 +166,25 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
             trip["driver_name"] = updates["driver_name"]
             updated_fields.append("driver_name")
 
+        # Month folder follows trip_start_datetime (month-pruned reads rely on it)
+        month_folder = trip_file.parent.name
+
         # Update trip timing
         if "trip_start_datetime" in updates:
+            try:
+                trip_start_dt = datetime.fromisoformat(
+                    str(updates["trip_start_datetime"]).replace("Z", "+00:00")
+                )
+            except ValueError:
+                return {
+                    "success": False,
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": "Invalid trip_start_datetime format (use ISO 8601)",
+                        "field": "trip_start_datetime",
+                    },
+                }
+            month_folder = get_month_folder(trip_start_dt)
             trip["trip_start_datetime"] = updates["trip_start_datetime"]
             updated_fields.append("trip_start_datetime")
 
@@ -249,8 +255,11 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         now = datetime.utcnow().isoformat() + "Z"
         trip["updated_at"] = now
 
-        # Atomic write
-        atomic_write_json(trip_file, trip)
+        # Atomic write; a new start month moves the file to its month folder
+        if month_folder != trip_file.parent.name:
+            move_json(trip_file, trip_file.parent.parent / month_folder / trip_file.name, trip)
+        else:
+            atomic_write_json(trip_file, trip)
 
         return {
             "success": True,
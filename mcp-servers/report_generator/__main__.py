@@ -5,9 +5,11 @@ Provides tools for generating mileage log reports in various formats.
 
 P0 Tools:
 - generate_csv: Generate CSV report with Slovak tax compliance
+- generate_reports_batch: One CSV per vehicle and month, rendered in parallel
 
 P1 Tools (optional):
-- generate_pdf: Generate PDF report with Slovak VAT template
+- generate_pdf: Generate PDF report with Slovak VAT template (needs reportlab)
+- export_parquet: Typed Parquet export of trips and checkpoints (needs pyarrow)
 """
 
 import asyncio
@@ -24,6 +26,9 @@ from mcp.types import Tool, TextContent
 
 # Import tool implementations
 from report_generator.tools.generate_csv import execute as generate_csv_execute, INPUT_SCHEMA as CSV_SCHEMA
+from report_generator.tools.generate_batch import execute as generate_batch_execute, INPUT_SCHEMA as BATCH_SCHEMA
+from report_generator.tools.generate_pdf import execute as generate_pdf_execute, INPUT_SCHEMA as PDF_SCHEMA
+from report_generator.tools.export_parquet import execute as export_parquet_execute, INPUT_SCHEMA as PARQUET_SCHEMA
 
 # Create MCP server instance
 app = Server("report-generator")
@@ -43,6 +48,34 @@ async def list_tools() -> list[Tool]:
             ),
             inputSchema=CSV_SCHEMA,
         ),
+        Tool(
+            name="generate_reports_batch",
+            description=(
+                "Generate one CSV mileage log per vehicle and month (month-end closing). "
+                "Reads each month once for all vehicles and renders the reports "
+                "in parallel worker processes (small batches inline). Returns a "
+                "manifest of output files and per-report summaries."
+            ),
+            inputSchema=BATCH_SCHEMA,
+        ),
+        Tool(
+            name="generate_pdf",
+            description=(
+                "Generate PDF mileage log report for Slovak tax compliance: a summary "
+                "page (vehicle, VIN, period, totals, L/100km) and a paginated trip table "
+                "with the same fields as the CSV report. Requires reportlab."
+            ),
+            inputSchema=PDF_SCHEMA,
+        ),
+        Tool(
+            name="export_parquet",
+            description=(
+                "Export trips and checkpoints of a date range to Parquet for analytics "
+                "(pandas, DuckDB). Typed columns (timestamps, distances, L/100km), "
+                "partitioned by vehicle and month. Requires pyarrow."
+            ),
+            inputSchema=PARQUET_SCHEMA,
+        ),
     ]
 
 
@@ -57,6 +90,27 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             text=str(result) if isinstance(result, dict) else result
         )]
 
+    if name == "generate_pdf":
+        result = await generate_pdf_execute(arguments)
+        return [TextContent(
+            type="text",
+            text=str(result) if isinstance(result, dict) else result
+        )]
+
+    if name == "export_parquet":
+        result = await export_parquet_execute(arguments)
+        return [TextContent(
+            type="text",
+            text=str(result) if isinstance(result, dict) else result
+        )]
+
+    if name == "generate_reports_batch":
+        result = await generate_batch_execute(arguments)
+        return [TextContent(
+            type="text",
+            text=str(result) if isinstance(result, dict) else result
+        )]
+
     raise ValueError(f"Unknown tool: {name}")
 
 
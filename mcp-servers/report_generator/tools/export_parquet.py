@@ -0,0 +1,395 @@
+"""
+Export trips and checkpoints to Parquet for analytics.
+
+Columns are typed (timestamps, dates, float distances and efficiencies), so
+pandas/Polars/DuckDB load them without parsing the CSV report again. Files
+are partitioned Hive-style by vehicle and month:
+
+    reports/parquet/<start>_<end>/trips/vehicle_id=<id>/month=<YYYY-MM>/part-0.parquet
+
+Records stream from the storage iterators in datetime order and are
+buffered per partition into Arrow record batches of BATCH_ROWS rows; a
+month's files are closed as soon as the stream moves past it. The trip
+columns are the CSV report's fields (FIELDNAMES) after trip_id.
+
+Datetimes are stored as wall-clock timestamps without time zone, matching
+the month folders they are partitioned by.
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import functools
+import os
+import shutil
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .generate_csv import FIELDNAMES, get_data_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Shared storage iterators from car-log-core
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from car_log_core.storage import iter_checkpoints, iter_trips, read_record
+
+COLLECTIONS = ("trips", "checkpoints")
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "start_date": {
+            "type": "string",
+            "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+            "description": "Start date (YYYY-MM-DD)",
+        },
+        "end_date": {
+            "type": "string",
+            "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+            "description": "End date (YYYY-MM-DD)",
+        },
+        "vehicle_id": {
+            "type": "string",
+            "description": "Filter by vehicle ID (optional)",
+        },
+        "business_only": {
+            "type": "boolean",
+            "default": False,
+            "description": "Export only business trips (default: false, purpose is a column)",
+        },
+        "collections": {
+            "type": "array",
+            "items": {"type": "string", "enum": list(COLLECTIONS)},
+            "description": "What to export (default: trips and checkpoints)",
+        },
+    },
+    "required": ["start_date", "end_date"],
+}
+
+# Rows per Arrow record batch (and Parquet row group append)
+BATCH_ROWS = 8192
+
+PARQUET_COMPRESSION = "snappy"
+
+# Column types by name: "string" unless listed
+TRIP_COLUMNS = ["trip_id"] + FIELDNAMES
+TRIP_TYPES = {
+    "trip_date": "date",
+    "trip_start_datetime": "timestamp",
+    "trip_end_datetime": "timestamp",
+    "distance_km": "float",
+    "fuel_consumption_liters": "float",
+    "fuel_efficiency_l_per_100km": "float",
+    "confidence_score": "float",
+}
+
+CHECKPOINT_COLUMNS = [
+    "checkpoint_id",
+    "checkpoint_type",
+    "datetime",
+    "odometer_km",
+    "odometer_source",
+    "odometer_confidence",
+    "location_address",
+    "latitude",
+    "longitude",
+    "receipt_id",
+    "fuel_liters",
+    "fuel_cost_eur",
+    "distance_since_previous_km",
+    "previous_checkpoint_id",
+]
+CHECKPOINT_TYPES = {
+    "datetime": "timestamp",
+    "odometer_km": "float",
+    "odometer_confidence": "float",
+    "latitude": "float",
+    "longitude": "float",
+    "fuel_liters": "float",
+    "fuel_cost_eur": "float",
+    "distance_since_previous_km": "float",
+}
+
+
+def _arrow_schema(columns: List[str], types: Dict[str, str]):
+    """Arrow schema from column names and type names."""
+    arrow_types = {
+        "string": pa.string(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us"),
+        "float": pa.float64(),
+    }
+    return pa.schema([(name, arrow_types[types.get(name, "string")]) for name in columns])
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema(collection: str):
+    """Arrow schema of an exported collection."""
+    if collection == "trips":
+        return _arrow_schema(TRIP_COLUMNS, TRIP_TYPES)
+    return _arrow_schema(CHECKPOINT_COLUMNS, CHECKPOINT_TYPES)
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Wall-clock datetime of an ISO 8601 string (offset dropped), or None."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _date(value: Any) -> Optional[date]:
+    """Date part of an ISO 8601 datetime string, or None."""
+    timestamp = _timestamp(value)
+    return timestamp.date() if timestamp else None
+
+
+def _float(value: Any) -> Optional[float]:
+    """Numeric value as float (None for missing or non-numeric)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def _string(value: Any) -> Optional[str]:
+    """Text value (None stays None)."""
+    return None if value is None else str(value)
+
+
+CONVERTERS = {"string": _string, "date": _date, "timestamp": _timestamp, "float": _float}
+
+# (column, converter) pairs of the trip schema
+TRIP_CONVERTERS = [(name, CONVERTERS[TRIP_TYPES.get(name, "string")]) for name in TRIP_COLUMNS]
+
+
+def trip_row(trip: Dict[str, Any], vehicle: Dict[str, Any]) -> List[Any]:
+    """Typed values of one trip, in TRIP_COLUMNS order (CSV report fields)."""
+    # Columns not stored on the trip itself, as in the CSV report
+    derived = {
+        "trip_date": trip.get("trip_start_datetime"),
+        "vehicle_vin": vehicle.get("vin"),
+        "license_plate": vehicle.get("license_plate"),
+    }
+    return [
+        convert(derived[name] if name in derived else trip.get(name))
+        for name, convert in TRIP_CONVERTERS
+    ]
+
+
+def checkpoint_row(checkpoint: Dict[str, Any]) -> List[Any]:
+    """Typed values of one checkpoint, in CHECKPOINT_COLUMNS order."""
+    location = checkpoint.get("location") or {}
+    coords = location.get("coords") or {}
+    receipt = checkpoint.get("receipt") or {}
+    return [
+        _string(checkpoint.get("checkpoint_id")),
+        _string(checkpoint.get("checkpoint_type")),
+        _timestamp(checkpoint.get("datetime")),
+        _float(checkpoint.get("odometer_km")),
+        _string(checkpoint.get("odometer_source")),
+        _float(checkpoint.get("odometer_confidence")),
+        _string(location.get("address")),
+        _float(coords.get("latitude")),
+        _float(coords.get("longitude")),
+        _string(receipt.get("receipt_id")),
+        _float(receipt.get("fuel_liters")),
+        _float(receipt.get("fuel_cost_eur")),
+        _float(checkpoint.get("distance_since_previous_km")),
+        _string(checkpoint.get("previous_checkpoint_id")),
+    ]
+
+
+class PartitionWriter:
+    """One partition's Parquet file, appended in Arrow record batches"""
+
+    def __init__(self, path: Path, schema):
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        self._columns: List[List[Any]] = [[] for _ in schema]
+        self._writer = None
+
+    def append(self, values: List[Any]) -> None:
+        """Buffer one row; a full buffer is written as a record batch."""
+        for column, value in zip(self._columns, values):
+            column.append(value)
+        self.rows += 1
+        if len(self._columns[0]) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as one record batch."""
+        if not self._columns[0]:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(self._columns, self.schema)],
+            schema=self.schema,
+        )
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(
+                str(self.path), self.schema, compression=PARQUET_COMPRESSION
+            )
+        self._writer.write_batch(batch)
+        for column in self._columns:
+            column.clear()
+
+    def close(self) -> None:
+        """Write the remaining rows and finish the file."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def export_collection(
+    collection: str,
+    records: Iterable[Dict[str, Any]],
+    to_row: Callable[[Dict[str, Any]], List[Any]],
+    output_dir: Path,
+) -> List[Dict[str, Any]]:
+    """
+    Stream records into vehicle/month partitions.
+
+    Records must come in datetime order (as the storage iterators yield
+    them), so each month's writers are closed once the next month starts.
+
+    Args:
+        collection: trips or checkpoints
+        records: Records in datetime order
+        to_row: Record -> typed values in schema order
+        output_dir: Export root directory
+
+    Returns:
+        Written files: {"collection", "vehicle_id", "month", "path", "rows"}
+    """
+    schema = get_schema(collection)
+    time_field = "trip_start_datetime" if collection == "trips" else "datetime"
+    files = []
+    writers: Dict[str, PartitionWriter] = {}
+    current_month = None
+
+    def close_month():
+        for vehicle_id, writer in writers.items():
+            writer.close()
+            files.append({
+                "collection": collection,
+                "vehicle_id": vehicle_id,
+                "month": current_month,
+                "path": str(writer.path),
+                "rows": writer.rows,
+            })
+        writers.clear()
+
+    for record in records:
+        month = (record.get(time_field) or "")[:7] or "unknown"
+        if month != current_month:
+            close_month()
+            current_month = month
+
+        vehicle_id = record.get("vehicle_id") or "unknown"
+        writer = writers.get(vehicle_id)
+        if writer is None:
+            path = (
+                output_dir / collection / f"vehicle_id={vehicle_id}"
+                / f"month={month}" / "part-0.parquet"
+            )
+            writer = writers[vehicle_id] = PartitionWriter(path, schema)
+        writer.append(to_row(record))
+
+    close_month()
+    return files
+
+
+async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Export trips and checkpoints of a date range to Parquet.
+
+    Args:
+        arguments: Tool arguments (start_date, end_date, vehicle_id, business_only, collections)
+
+    Returns:
+        Success status, export directory, written files and row counts
+    """
+    if pa is None:
+        return {
+            "success": False,
+            "error": {
+                "code": "DEPENDENCY_MISSING",
+                "message": "Parquet export needs pyarrow (pip install pyarrow)",
+            },
+        }
+
+    start_date = arguments["start_date"]
+    end_date = arguments["end_date"]
+    vehicle_id = arguments.get("vehicle_id")
+    business_only = arguments.get("business_only", False)
+    collections = arguments.get("collections") or list(COLLECTIONS)
+
+    if not isinstance(collections, list) or not set(collections) <= set(COLLECTIONS):
+        return {
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": f"collections must be a list of: {', '.join(COLLECTIONS)}",
+                "field": "collections",
+            },
+        }
+
+    start_dt = datetime.fromisoformat(start_date)
+    end_dt = datetime.fromisoformat(end_date)
+
+    # Build the export next to its final place, then swap it in
+    output_dir = get_data_path() / "reports" / "parquet" / f"{start_date}_{end_date}"
+    work_dir = output_dir.with_name(f"{output_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+
+    try:
+        files = []
+        if "trips" in collections:
+            vehicles: Dict[str, Dict[str, Any]] = {}
+
+            def to_trip_row(trip: Dict[str, Any]) -> List[Any]:
+                trip_vehicle_id = trip.get("vehicle_id")
+                if trip_vehicle_id not in vehicles:
+                    vehicles[trip_vehicle_id] = (
+                        read_record("vehicles", trip_vehicle_id) if trip_vehicle_id else None
+                    ) or {}
+                return trip_row(trip, vehicles[trip_vehicle_id])
+
+            trips = iter_trips(
+                vehicle_id, start_dt, end_dt, "Business" if business_only else None
+            )
+            files += export_collection("trips", trips, to_trip_row, work_dir)
+
+        if "checkpoints" in collections:
+            checkpoints = iter_checkpoints(vehicle_id, start_dt, end_dt)
+            files += export_collection("checkpoints", checkpoints, checkpoint_row, work_dir)
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(work_dir, output_dir)
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    for file in files:
+        file["path"] = str(output_dir / Path(file["path"]).relative_to(work_dir))
+
+    return {
+        "success": True,
+        "output_dir": str(output_dir),
+        "files": files,
+        "row_counts": {
+            collection: sum(f["rows"] for f in files if f["collection"] == collection)
+            for collection in collections
+        },
+    }
@@ -0,0 +1,401 @@
+"""
+Generate CSV reports for several vehicles and months in one call.
+
+Month-end closing needs one report per vehicle per month. Instead of one
+generate_csv call (and one storage scan) per report, each requested month
+has its manifests scanned once for all vehicles, and the trip rows are
+partitioned by (vehicle, month). Each report's fingerprint (the same sidecar
+as generate_csv) is built from those rows before its trips are read. CSV
+rendering is pure Python, so larger batches run on a process pool kept
+between calls; small ones render inline. The result is a manifest of output
+files with their summaries.
+"""
+
+import asyncio
+import atexit
+import calendar
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .generate_csv import (
+    SummaryAccumulator,
+    get_data_path,
+    remove_fingerprint,
+    report_fingerprint,
+    write_fingerprint,
+    write_trips_csv,
+)
+
+# Shared storage helpers from car-log-core
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from car_log_core.storage import iter_trip_rows, read_manifest_record, read_record
+
+# Worker processes by default (1 = render reports inline)
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+MAX_WORKERS = 32
+
+# Fewer reports than this render inline: a month's CSV renders in
+# milliseconds, less than shipping its trips to another process
+POOL_MIN_REPORTS = 8
+
+# Process pool kept between calls (workers never touch storage)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers: Optional[int] = None
+_pool_lock = threading.Lock()
+
+PERIOD_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "vehicle_ids": {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": 1,
+            "description": "Vehicles to report on",
+        },
+        "periods": {
+            "type": "array",
+            "items": {"type": "string", "pattern": "^\\d{4}-\\d{2}$"},
+            "minItems": 1,
+            "description": "Months to report on (YYYY-MM)",
+        },
+        "business_only": {
+            "type": "boolean",
+            "default": True,
+            "description": "Include only business trips (default: true)",
+        },
+        "workers": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": MAX_WORKERS,
+            "description": (
+                f"Worker processes (default {DEFAULT_WORKERS}; 1 = no pool). "
+                f"Batches under {POOL_MIN_REPORTS} reports always render inline"
+            ),
+        },
+    },
+    "required": ["vehicle_ids", "periods"],
+}
+
+
+def period_range(period: str) -> Tuple[date, date]:
+    """First and last day of a YYYY-MM period."""
+    year, month = int(period[:4]), int(period[5:7])
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def report_path(period: str, vehicle_id: str) -> Path:
+    """Output file of one (vehicle, month) report."""
+    return get_data_path() / "reports" / period / f"{period}-{vehicle_id}-report.csv"
+
+
+def partition_rows(
+    vehicle_ids: List[str],
+    periods: List[str],
+    purpose: str = None,
+) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """
+    Scan each period's manifests once and group the trip rows by vehicle.
+
+    Periods are read from their month folders; update_trip keeps a trip in
+    the folder of its trip_start_datetime month, so edited trips land in
+    the report of their new month.
+
+    Args:
+        vehicle_ids: Vehicles to keep
+        periods: Months (YYYY-MM)
+        purpose: Filter by purpose (optional)
+
+    Returns:
+        (vehicle_id, period) -> trip manifest rows in trip_start_datetime
+        order, with an entry (possibly empty) for every requested pair
+    """
+    partitions = {
+        (vehicle_id, period): [] for period in periods for vehicle_id in vehicle_ids
+    }
+    for period in sorted(set(periods)):
+        start, end = period_range(period)
+        for row in iter_trip_rows(None, start, end, purpose):
+            rows = partitions.get((row.get("vehicle_id"), period))
+            if rows is not None:
+                rows.append(row)
+    return partitions
+
+
+def report_sidecar(
+    period: str,
+    vehicle_id: str,
+    business_only: bool,
+    rows: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Fingerprint and arguments of one (vehicle, month) report.
+
+    The same arguments as the equivalent generate_csv call, so is_report_stale
+    and generate_csv treat batch reports like their own. The fingerprint is
+    built from the partition's rows, before any trip is read: a trip edited
+    afterwards makes the report stale instead of looking fresh.
+    """
+    start, end = period_range(period)
+    arguments = {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "vehicle_id": vehicle_id,
+        "business_only": business_only,
+    }
+    return {
+        "fingerprint": report_fingerprint(**arguments, rows=rows),
+        "arguments": arguments,
+    }
+
+
+def load_trips(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Trip records behind manifest rows (files deleted meanwhile are skipped)."""
+    trips = []
+    for row in rows:
+        trip = read_manifest_record("trips", row)
+        if trip is not None:
+            trips.append(trip)
+    return trips
+
+
+def render_report(
+    output_path: str,
+    trips: List[Dict[str, Any]],
+    vehicle: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Write one report CSV (runs in a worker process; no storage access).
+
+    Errors are returned instead of raised, so one bad report never fails
+    the batch.
+
+    Returns:
+        {"trip_count", "summary"} or an error response
+    """
+    try:
+        path = Path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        accumulator = SummaryAccumulator()
+        trip_count = write_trips_csv(path, trips, vehicle, accumulator)
+        return {"trip_count": trip_count, "summary": accumulator.summary()}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": str(e),
+            },
+        }
+
+
+def finish_report(
+    output_file: str,
+    sidecar: Dict[str, Any],
+    result: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Write a rendered report's fingerprint sidecar; the result or an error response."""
+    try:
+        write_fingerprint(Path(output_file), {
+            **sidecar,
+            **result,
+            "size_bytes": Path(output_file).stat().st_size,
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": str(e),
+            },
+        }
+    return result
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Render pool, kept between calls while the worker count stays the same."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers == workers:
+            return _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the render pool (it is started again on demand)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, None
+
+
+atexit.register(shutdown_pool)
+
+
+async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate one CSV report per (vehicle, month).
+
+    Args:
+        arguments: Tool arguments (vehicle_ids, periods, business_only, workers)
+
+    Returns:
+        Manifest with one entry per report and batch totals
+    """
+    try:
+        vehicle_ids = arguments.get("vehicle_ids")
+        periods = arguments.get("periods")
+        business_only = arguments.get("business_only", True)
+        workers = arguments.get("workers", DEFAULT_WORKERS)
+
+        if (
+            not isinstance(vehicle_ids, list)
+            or not vehicle_ids
+            or not all(isinstance(v, str) and v.strip() for v in vehicle_ids)
+        ):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "vehicle_ids must be a non-empty list of vehicle IDs",
+                    "field": "vehicle_ids",
+                },
+            }
+
+        if (
+            not isinstance(periods, list)
+            or not periods
+            or not all(isinstance(p, str) and PERIOD_PATTERN.match(p) for p in periods)
+        ):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "periods must be a non-empty list of months (YYYY-MM)",
+                    "field": "periods",
+                },
+            }
+
+        if not isinstance(workers, int) or not 1 <= workers <= MAX_WORKERS:
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"workers must be an integer between 1 and {MAX_WORKERS}",
+                    "field": "workers",
+                },
+            }
+
+        # Duplicates would render the same file twice
+        vehicle_ids = list(dict.fromkeys(v.strip() for v in vehicle_ids))
+        periods = sorted(set(periods))
+
+        vehicles = {}
+        for vehicle_id in vehicle_ids:
+            vehicle = read_record("vehicles", vehicle_id)
+            if vehicle is None:
+                return {
+                    "success": False,
+                    "error": {
+                        "code": "NOT_FOUND",
+                        "message": f"Vehicle not found: {vehicle_id}",
+                        "field": "vehicle_ids",
+                    },
+                }
+            vehicles[vehicle_id] = vehicle
+
+        partitions = partition_rows(
+            vehicle_ids, periods, "Business" if business_only else None
+        )
+
+        # Months without trips get no file (like generate_csv). Fingerprint
+        # first, then read trips: edits made meanwhile show as stale
+        jobs = []
+        sidecars = {}
+        for (vehicle_id, period), rows in partitions.items():
+            if not rows:
+                continue
+            output_file = str(report_path(period, vehicle_id))
+            sidecars[output_file] = report_sidecar(period, vehicle_id, business_only, rows)
+            # A half-written report must never look up to date
+            remove_fingerprint(Path(output_file))
+            jobs.append((output_file, load_trips(rows), vehicles[vehicle_id]))
+
+        # Render: inline for one worker or a small batch, otherwise on the
+        # kept process pool
+        if workers == 1 or len(jobs) < POOL_MIN_REPORTS:
+            rendered = [render_report(*job) for job in jobs]
+        else:
+            loop = asyncio.get_running_loop()
+            pool = _get_pool(workers)
+            try:
+                rendered = await asyncio.gather(*(
+                    loop.run_in_executor(pool, render_report, *job)
+                    for job in jobs
+                ))
+            except BrokenProcessPool:
+                # A worker died: start a fresh pool next time
+                shutdown_pool()
+                raise
+        by_path = {job[0]: result for job, result in zip(jobs, rendered)}
+
+        for output_file, result in by_path.items():
+            if "error" not in result:
+                by_path[output_file] = finish_report(output_file, sidecars[output_file], result)
+
+        reports = []
+        for (vehicle_id, period), rows in partitions.items():
+            entry = {"vehicle_id": vehicle_id, "period": period}
+            if not rows:
+                entry.update({
+                    "success": True,
+                    "output_file": None,
+                    "trip_count": 0,
+                    "summary": SummaryAccumulator().summary(),
+                })
+            else:
+                output_file = str(report_path(period, vehicle_id))
+                result = by_path[output_file]
+                if "error" in result:
+                    entry.update(result)
+                else:
+                    entry.update({"success": True, "output_file": output_file, **result})
+            reports.append(entry)
+
+        return {
+            "success": True,
+            "business_only": business_only,
+            "reports": reports,
+            "summary": {
+                "reports_written": sum(1 for r in reports if r.get("output_file")),
+                "reports_failed": sum(1 for r in reports if not r["success"]),
+                "total_trips": sum(r.get("trip_count", 0) for r in reports),
+                "total_distance_km": round(
+                    sum(r["summary"]["total_distance_km"] for r in reports if r["success"]), 2
+                ),
+            },
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": str(e),
+            },
+        }
@@ -1,13 +1,39 @@
 """
 Generate CSV report for Slovak tax compliance.
+
+Trips stream from the storage iterator through a running summary into the
+CSV writer, so memory stays flat however long the date range is.
+
+Each report gets a fingerprint sidecar (<report>.fingerprint.json) built
+from the trip IDs and file versions (mtime and size, or a content hash with
+the SQLite backend) of its input trips and vehicle. Regenerating a report
+whose inputs did not change returns the existing file without reading or
+writing any trip.
 """
 
 import csv
+import hashlib
+import itertools
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+# Shared storage helpers from car-log-core
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from car_log_core.storage import (
+    atomic_write_json,
+    delete_json,
+    find_record_file,
+    iter_trip_rows,
+    iter_trips,
+    read_json,
+    read_record,
+    record_version,
+)
 
 # Input schema for MCP
 INPUT_SCHEMA = {
@@ -36,10 +62,41 @@ INPUT_SCHEMA = {
             "type": "string",
             "description": "Output filename (optional, default: YYYY-MM-report.csv)",
         },
+        "force": {
+            "type": "boolean",
+            "default": False,
+            "description": "Rewrite the report even if its input trips are unchanged",
+        },
     },
     "required": ["start_date", "end_date"],
 }
 
+# CSV columns (Slovak tax compliance fields)
+FIELDNAMES = [
+    "trip_date",
+    "driver_name",
+    "vehicle_vin",
+    "license_plate",
+    "trip_start_datetime",
+    "trip_end_datetime",
+    "trip_start_location",
+    "trip_end_location",
+    "distance_km",
+    "purpose",
+    "business_description",
+    "fuel_consumption_liters",
+    "fuel_efficiency_l_per_100km",
+    "reconstruction_method",
+    "confidence_score",
+]
+
+# Output file write buffer: rows reach the disk in chunks of this size
+FLUSH_BYTES = 64 * 1024
+
+# Sidecar next to each report; bump the version when the CSV format changes
+FINGERPRINT_SUFFIX = ".fingerprint.json"
+FINGERPRINT_VERSION = 1
+
 
 def get_data_path() -> Path:
     """Get data directory path from environment or use default"""
@@ -49,107 +106,297 @@ def get_data_path() -> Path:
 
 def load_vehicle(vehicle_id: str) -> Dict[str, Any]:
     """Load vehicle data by ID"""
-    data_path = get_data_path()
-    vehicle_file = data_path / "vehicles" / f"{vehicle_id}.json"
+    vehicle = read_record("vehicles", vehicle_id)
 
-    if not vehicle_file.exists():
+    if vehicle is None:
         raise ValueError(f"Vehicle not found: {vehicle_id}")
 
-    with open(vehicle_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return vehicle
 
 
-def load_trips_in_range(start_date: str, end_date: str, vehicle_id: str = None) -> List[Dict[str, Any]]:
+def iter_trips_in_range(
+    start_date: str,
+    end_date: str,
+    vehicle_id: str = None,
+    purpose: str = None,
+) -> Iterator[Dict[str, Any]]:
     """
-    Load all trips within date range.
+    Stream trips within date range, in trip_start_datetime order.
 
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
         vehicle_id: Filter by vehicle (optional)
+        purpose: Filter by purpose (optional)
 
-    Returns:
-        List of trip dictionaries
+    Yields:
+        Trip dictionaries, one at a time
     """
-    data_path = get_data_path()
-    trips_path = data_path / "trips"
-
-    if not trips_path.exists():
-        return []
-
     start_dt = datetime.fromisoformat(start_date)
     end_dt = datetime.fromisoformat(end_date)
 
-    trips = []
+    # Filters run on month manifests; months outside the range are skipped
+    return iter_trips(vehicle_id, start_dt, end_dt, purpose)
 
-    # Iterate through monthly folders
-    for month_folder in sorted(trips_path.iterdir()):
-        if not month_folder.is_dir():
-            continue
 
-        # Load all trip files in this month
-        for trip_file in month_folder.glob("*.json"):
-            if trip_file.name == "index.json":
-                continue
+def load_trips_in_range(
+    start_date: str,
+    end_date: str,
+    vehicle_id: str = None,
+    purpose: str = None,
+) -> List[Dict[str, Any]]:
+    """
+    Load all trips within date range, in trip_start_datetime order.
 
-            try:
-                with open(trip_file, "r", encoding="utf-8") as f:
-                    trip = json.load(f)
+    Args:
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        vehicle_id: Filter by vehicle (optional)
+        purpose: Filter by purpose (optional)
 
-                # Filter by vehicle if specified
-                if vehicle_id and trip.get("vehicle_id") != vehicle_id:
-                    continue
+    Returns:
+        List of trip dictionaries
+    """
+    return list(iter_trips_in_range(start_date, end_date, vehicle_id, purpose))
 
-                # Filter by date range
-                trip_date = datetime.fromisoformat(trip["trip_start_datetime"].split("T")[0])
-                if start_dt <= trip_date <= end_dt:
-                    trips.append(trip)
 
-            except (json.JSONDecodeError, KeyError, ValueError):
-                # Skip invalid trip files
-                continue
+class SummaryAccumulator:
+    """Running totals of calculate_summary, fed one trip at a time"""
 
-    return trips
+    def __init__(self):
+        self.total_trips = 0
+        self.total_distance = 0
+        self.total_fuel = 0
+        self.efficiency_weighted = 0.0
+        self.distance_with_efficiency = 0.0
 
+    def add(self, trip: Dict[str, Any]) -> None:
+        """Add one trip to the totals."""
+        self.total_trips += 1
+        self.total_distance += trip.get("distance_km", 0)
+        if trip.get("fuel_consumption_liters"):
+            self.total_fuel += trip["fuel_consumption_liters"]
+
+        # Average efficiency is weighted by distance
+        if trip.get("fuel_efficiency_l_per_100km") and trip.get("distance_km"):
+            self.efficiency_weighted += trip["fuel_efficiency_l_per_100km"] * trip["distance_km"]
+            self.distance_with_efficiency += trip["distance_km"]
+
+    def summary(self) -> Dict[str, Any]:
+        """Summary statistics of the trips added so far."""
+        if not self.total_trips:
+            return {
+                "total_trips": 0,
+                "total_distance_km": 0.0,
+                "total_fuel_liters": 0.0,
+                "total_cost_incl_vat": 0.0,
+                "total_vat": 0.0,
+                "average_efficiency_l_per_100km": 0.0,
+            }
+
+        avg_efficiency = (
+            self.efficiency_weighted / self.distance_with_efficiency
+            if self.distance_with_efficiency > 0
+            else 0.0
+        )
 
-def calculate_summary(trips: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate summary statistics for trips"""
-    if not trips:
         return {
-            "total_trips": 0,
-            "total_distance_km": 0.0,
-            "total_fuel_liters": 0.0,
-            "total_cost_incl_vat": 0.0,
-            "total_vat": 0.0,
-            "average_efficiency_l_per_100km": 0.0,
+            "total_trips": self.total_trips,
+            "total_distance_km": round(self.total_distance, 2),
+            "total_fuel_liters": round(self.total_fuel, 2),
+            "average_efficiency_l_per_100km": round(avg_efficiency, 2),
         }
 
-    total_distance = sum(trip.get("distance_km", 0) for trip in trips)
-    total_fuel = sum(trip.get("fuel_consumption_liters", 0) for trip in trips if trip.get("fuel_consumption_liters"))
-
-    # Calculate average efficiency (weighted by distance)
-    total_efficiency_weighted = 0.0
-    total_distance_with_efficiency = 0.0
 
+def calculate_summary(trips: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculate summary statistics for trips"""
+    accumulator = SummaryAccumulator()
     for trip in trips:
-        if trip.get("fuel_efficiency_l_per_100km") and trip.get("distance_km"):
-            efficiency = trip["fuel_efficiency_l_per_100km"]
-            distance = trip["distance_km"]
-            total_efficiency_weighted += efficiency * distance
-            total_distance_with_efficiency += distance
-
-    avg_efficiency = (
-        total_efficiency_weighted / total_distance_with_efficiency
-        if total_distance_with_efficiency > 0
-        else 0.0
-    )
+        accumulator.add(trip)
+    return accumulator.summary()
+
+
+def fill_row(row: List[Any], trip: Dict[str, Any], vehicle: Dict[str, Any]) -> None:
+    """Write one trip's values into row (in FIELDNAMES order, reused across trips)."""
+    row[0] = trip.get("trip_start_datetime", "").split("T")[0]
+    row[1] = trip.get("driver_name", "")
+    row[2] = vehicle.get("vin", "")
+    row[3] = vehicle.get("license_plate", "")
+    for position in range(4, len(FIELDNAMES)):
+        row[position] = trip.get(FIELDNAMES[position], "")
+
+
+def write_trips_csv(
+    output_path: Path,
+    trips: Iterable[Dict[str, Any]],
+    vehicle: Dict[str, Any],
+    accumulator: Optional[SummaryAccumulator] = None,
+) -> int:
+    """
+    Stream trips into a CSV file in constant memory.
 
-    return {
-        "total_trips": len(trips),
-        "total_distance_km": round(total_distance, 2),
-        "total_fuel_liters": round(total_fuel, 2),
-        "average_efficiency_l_per_100km": round(avg_efficiency, 2),
-    }
+    Each trip is formatted into one reused row list and added to the
+    accumulator; the file's write buffer (FLUSH_BYTES) batches the writes.
+
+    Args:
+        output_path: CSV file to (over)write
+        trips: Trips in output order (consumed once)
+        vehicle: Vehicle for VIN and license plate columns
+        accumulator: Summary totals to update (optional)
+
+    Returns:
+        Number of trips written
+    """
+    row = [""] * len(FIELDNAMES)
+    count = 0
+
+    with open(
+        output_path, "w", newline="", encoding="utf-8", buffering=FLUSH_BYTES
+    ) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(FIELDNAMES)
+        for trip in trips:
+            fill_row(row, trip, vehicle)
+            writer.writerow(row)
+            if accumulator is not None:
+                accumulator.add(trip)
+            count += 1
+
+    return count
+
+
+def fingerprint_path(output_path: Path) -> Path:
+    """Fingerprint sidecar of a report file."""
+    return output_path.with_name(output_path.name + FINGERPRINT_SUFFIX)
+
+
+def report_fingerprint(
+    start_date: str,
+    end_date: str,
+    vehicle_id: str = None,
+    business_only: bool = True,
+    rows: Optional[Iterable[Dict[str, Any]]] = None,
+) -> str:
+    """
+    Fingerprint of a report's inputs, without reading any trip.
+
+    Covers the report arguments, the CSV format, the ID and file version of
+    every trip in range (from month manifests) and the vehicle record.
+
+    Args:
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        vehicle_id: Filter by vehicle (optional)
+        business_only: Include only business trips
+        rows: The report's trip manifest rows in iter_trip_rows order, if
+            already scanned (default: scanned here)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        [FINGERPRINT_VERSION, FIELDNAMES, start_date, end_date, vehicle_id, business_only]
+    ).encode("utf-8"))
+
+    data_path = get_data_path()
+    report_vehicle_id = vehicle_id
+    if rows is None:
+        rows = iter_trip_rows(
+            vehicle_id,
+            datetime.fromisoformat(start_date),
+            datetime.fromisoformat(end_date),
+            "Business" if business_only else None,
+        )
+    for row in rows:
+        # Without a vehicle filter the report uses the first trip's vehicle
+        if report_vehicle_id is None:
+            report_vehicle_id = row.get("vehicle_id")
+        version = record_version(data_path / "trips" / row["folder"] / f"{row['id']}.json")
+        digest.update(f"\n{row['id']}:{version}".encode("utf-8"))
+
+    vehicle_file = find_record_file("vehicles", report_vehicle_id) if report_vehicle_id else None
+    vehicle_version = record_version(vehicle_file) if vehicle_file else None
+    digest.update(f"\nvehicle:{report_vehicle_id}:{vehicle_version}".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def read_fingerprint(output_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Read a report's fingerprint sidecar.
+
+    Returns:
+        Sidecar data, or None if missing or unreadable
+    """
+    try:
+        return read_json(fingerprint_path(output_path))
+    except (OSError, ValueError):
+        return None
+
+
+def write_fingerprint(output_path: Path, data: Dict[str, Any]) -> None:
+    """Write a report's fingerprint sidecar (atomically, like all storage writes)."""
+    atomic_write_json(fingerprint_path(output_path), data)
+
+
+def remove_fingerprint(output_path: Path) -> None:
+    """Remove a report's fingerprint sidecar, if any."""
+    delete_json(fingerprint_path(output_path))
+
+
+def _fingerprint_matches(
+    output_path: Path,
+    recorded: Optional[Dict[str, Any]],
+    fingerprint: str,
+) -> bool:
+    """True if the report file is the complete output of these inputs."""
+    if not recorded or recorded.get("fingerprint") != fingerprint:
+        return False
+    try:
+        return output_path.stat().st_size == recorded.get("size_bytes")
+    except OSError:
+        return False
+
+
+def is_report_stale(
+    output_path: Path,
+    fingerprints: Optional[Dict[tuple, str]] = None,
+) -> Optional[bool]:
+    """
+    Check whether a report's input trips changed since it was written.
+
+    Args:
+        output_path: Report CSV file
+        fingerprints: Cache of current fingerprints by report arguments, to
+            share between the reports of one listing (optional)
+
+    Returns:
+        True if stale, False if up to date, None if the report has no
+        usable fingerprint (missing, malformed, or written before
+        fingerprints existed)
+    """
+    output_path = Path(output_path)
+    recorded = read_fingerprint(output_path)
+    if not isinstance(recorded, dict) or not isinstance(recorded.get("arguments"), dict):
+        return None
+
+    arguments = recorded["arguments"]
+    try:
+        key = (
+            arguments["start_date"],
+            arguments["end_date"],
+            arguments.get("vehicle_id"),
+            arguments.get("business_only", True),
+        )
+        fingerprint = fingerprints.get(key) if fingerprints is not None else None
+        if fingerprint is None:
+            fingerprint = report_fingerprint(*key)
+            if fingerprints is not None:
+                fingerprints[key] = fingerprint
+    except (KeyError, TypeError, ValueError):
+        return None
+    return not _fingerprint_matches(output_path, recorded, fingerprint)
 
 
 async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
@@ -157,30 +404,32 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
     Generate CSV mileage log report.
 
     Args:
-        arguments: Tool arguments (start_date, end_date, vehicle_id, business_only, output_filename)
+        arguments: Tool arguments (start_date, end_date, vehicle_id, business_only,
+            output_filename, force)
 
     Returns:
-        Success status, output filename, and summary statistics
+        Success status, output filename, summary statistics, and whether the
+        file was (re)written
     """
     start_date = arguments["start_date"]
     end_date = arguments["end_date"]
     vehicle_id = arguments.get("vehicle_id")
     business_only = arguments.get("business_only", True)
     output_filename = arguments.get("output_filename")
+    force = arguments.get("force", False)
 
     # Generate default filename if not provided
     if not output_filename:
         start_dt = datetime.fromisoformat(start_date)
         output_filename = f"{start_dt.strftime('%Y-%m')}-report.csv"
 
-    # Load trips
-    trips = load_trips_in_range(start_date, end_date, vehicle_id)
-
-    # Filter business trips if requested
-    if business_only:
-        trips = [t for t in trips if t.get("purpose") == "Business"]
+    # Stream trips (business only if requested); peek at the first one
+    trips = iter_trips_in_range(
+        start_date, end_date, vehicle_id, "Business" if business_only else None
+    )
+    first_trip = next(trips, None)
 
-    if not trips:
+    if first_trip is None:
         return {
             "success": True,
             "message": "No trips found matching criteria",
@@ -188,14 +437,11 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     # Load vehicle data for VIN (use first trip's vehicle if not specified)
-    if not vehicle_id and trips:
-        vehicle_id = trips[0].get("vehicle_id")
+    if not vehicle_id:
+        vehicle_id = first_trip.get("vehicle_id")
 
     vehicle = load_vehicle(vehicle_id) if vehicle_id else {}
 
-    # Calculate summary
-    summary = calculate_summary(trips)
-
     # Create output directory
     data_path = get_data_path()
     start_dt = datetime.fromisoformat(start_date)
@@ -204,51 +450,49 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
     output_path = output_dir / output_filename
 
-    # Generate CSV
-    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-        fieldnames = [
-            "trip_date",
-            "driver_name",
-            "vehicle_vin",
-            "license_plate",
-            "trip_start_datetime",
-            "trip_end_datetime",
-            "trip_start_location",
-            "trip_end_location",
-            "distance_km",
-            "purpose",
-            "business_description",
-            "fuel_consumption_liters",
-            "fuel_efficiency_l_per_100km",
-            "reconstruction_method",
-            "confidence_score",
-        ]
-
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    # Unchanged inputs: the existing report is still correct
+    filter_vehicle_id = arguments.get("vehicle_id")
+    fingerprint = report_fingerprint(start_date, end_date, filter_vehicle_id, business_only)
+    recorded = read_fingerprint(output_path)
+    if not force and _fingerprint_matches(output_path, recorded, fingerprint):
+        return {
+            "success": True,
+            "output_file": str(output_path),
+            "summary": recorded["summary"],
+            "trip_count": recorded["trip_count"],
+            "regenerated": False,
+        }
 
-        for trip in trips:
-            writer.writerow({
-                "trip_date": trip.get("trip_start_datetime", "").split("T")[0],
-                "driver_name": trip.get("driver_name", ""),
-                "vehicle_vin": vehicle.get("vin", ""),
-                "license_plate": vehicle.get("license_plate", ""),
-                "trip_start_datetime": trip.get("trip_start_datetime", ""),
-                "trip_end_datetime": trip.get("trip_end_datetime", ""),
-                "trip_start_location": trip.get("trip_start_location", ""),
-                "trip_end_location": trip.get("trip_end_location", ""),
-                "distance_km": trip.get("distance_km", ""),
-                "purpose": trip.get("purpose", ""),
-                "business_description": trip.get("business_description", ""),
-                "fuel_consumption_liters": trip.get("fuel_consumption_liters", ""),
-                "fuel_efficiency_l_per_100km": trip.get("fuel_efficiency_l_per_100km", ""),
-                "reconstruction_method": trip.get("reconstruction_method", ""),
-                "confidence_score": trip.get("confidence_score", ""),
-            })
+    # A half-written report must never look up to date
+    remove_fingerprint(output_path)
+
+    # Generate CSV, summarizing while writing
+    accumulator = SummaryAccumulator()
+    trip_count = write_trips_csv(
+        output_path, itertools.chain([first_trip], trips), vehicle, accumulator
+    )
+
+    # Totals of exactly the rows written, so they always match the CSV body
+    summary = accumulator.summary()
+
+    write_fingerprint(output_path, {
+        "fingerprint": fingerprint,
+        "arguments": {
+            "start_date": start_date,
+            "end_date": end_date,
+            "vehicle_id": filter_vehicle_id,
+            "business_only": business_only,
+        },
+        "trip_count": trip_count,
+        "summary": summary,
+        "size_bytes": output_path.stat().st_size,
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+    })
 
     return {
         "success": True,
         "output_file": str(output_path),
         "summary": summary,
-        "trip_count": len(trips),
+        "trip_count": trip_count,
+        "regenerated": True,
     }
@@ -0,0 +1,462 @@
+"""
+Generate PDF mileage log report for Slovak tax compliance.
+
+The report is a summary page followed by a paginated trip table. Trips
+stream from the storage iterator straight onto pages in one pass: the
+totals on the summary page and the page count in the footers are PDF form
+objects referenced up front and filled in once the last trip is drawn.
+
+Fonts and the page template (geometry, columns, header/footer layout) are
+loaded once per process and reused for every report. The per-report page
+header is drawn once as a form object and placed on each page.
+
+Requires reportlab (pip install reportlab). A TrueType font with Slovak
+diacritics (DejaVu Sans, Arial) is used when found; set PDF_FONT_PATH and
+PDF_BOLD_FONT_PATH to choose one. Otherwise the built-in Helvetica is used.
+"""
+
+import functools
+import itertools
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .generate_csv import (
+    SummaryAccumulator,
+    get_data_path,
+    iter_trips_in_range,
+    load_vehicle,
+)
+
+try:
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+# Input schema for MCP
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "start_date": {
+            "type": "string",
+            "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+            "description": "Start date (YYYY-MM-DD)",
+        },
+        "end_date": {
+            "type": "string",
+            "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+            "description": "End date (YYYY-MM-DD)",
+        },
+        "vehicle_id": {
+            "type": "string",
+            "description": "Filter by vehicle ID (optional)",
+        },
+        "business_only": {
+            "type": "boolean",
+            "default": True,
+            "description": "Include only business trips (default: true)",
+        },
+        "output_filename": {
+            "type": "string",
+            "description": "Output filename (optional, default: YYYY-MM-report.pdf)",
+        },
+    },
+    "required": ["start_date", "end_date"],
+}
+
+# (regular, bold) TrueType fonts tried in order when PDF_FONT_PATH is not set
+FONT_CANDIDATES = [
+    (
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    ),
+    (
+        "/System/Library/Fonts/Supplemental/Arial.ttf",
+        "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+    ),
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf"),
+]
+
+# Trip table: (header, width in points, right-aligned); widths fill the page
+COLUMNS = [
+    ("Date", 52, False),
+    ("Driver", 85, False),
+    ("Start", 32, False),
+    ("End", 52, False),
+    ("From", 110, False),
+    ("To", 110, False),
+    ("km", 42, True),
+    ("Purpose", 50, False),
+    ("Description", 147, False),
+    ("Fuel (L)", 40, True),
+    ("L/100km", 50, True),
+]
+
+MARGIN = 36
+FONT_SIZE = 7.5
+ROW_HEIGHT = 12
+
+# Fitted cell texts kept per process (driver, places and purposes repeat)
+CELL_CACHE_SIZE = 4096
+
+# Form objects filled in after the last trip is drawn
+SUMMARY_FORM = "summary-values"
+PAGE_COUNT_FORM = "page-count"
+PAGE_HEADER_FORM = "page-header"
+
+
+@functools.lru_cache(maxsize=None)
+def load_fonts() -> Tuple[str, str]:
+    """
+    Register the report fonts with reportlab (once per process).
+
+    Returns:
+        (regular, bold) font names
+    """
+    candidates = FONT_CANDIDATES
+    if os.getenv("PDF_FONT_PATH"):
+        regular = os.environ["PDF_FONT_PATH"]
+        candidates = [(regular, os.getenv("PDF_BOLD_FONT_PATH", regular))]
+
+    for regular, bold in candidates:
+        if Path(regular).is_file() and Path(bold).is_file():
+            pdfmetrics.registerFont(TTFont("ReportSans", regular))
+            pdfmetrics.registerFont(TTFont("ReportSans-Bold", bold))
+            return "ReportSans", "ReportSans-Bold"
+
+    # Standard PDF font: no embedding, but no glyphs beyond Latin-1
+    return "Helvetica", "Helvetica-Bold"
+
+
+class PageTemplate:
+    """Page geometry and trip table layout, shared by every report of the process"""
+
+    def __init__(self, font: str, bold_font: str):
+        self.font = font
+        self.bold_font = bold_font
+        self.width, self.height = landscape(A4)
+
+        # Column left edges and cell widths (with 2pt padding on each side)
+        self.columns = []
+        x = MARGIN
+        for header, width, right in COLUMNS:
+            self.columns.append((header, x, width, right))
+            x += width
+
+        self.header_top = self.height - MARGIN
+        self.table_top = self.header_top - 44
+        self.footer_y = MARGIN - 12
+        self.rows_per_page = int((self.table_top - ROW_HEIGHT - MARGIN) // ROW_HEIGHT)
+
+        self._ellipsis = self.text_width("…", font)
+        self._cells: Dict[Tuple[str, float], Tuple[str, float]] = {}
+
+    def text_width(self, text: str, font: str, size: float = FONT_SIZE) -> float:
+        """Rendered width of text in points."""
+        return pdfmetrics.stringWidth(text, font, size)
+
+    def fit(self, text: str, width: float) -> str:
+        """Text shortened with an ellipsis to fit a cell width."""
+        if self.text_width(text, self.font) <= width:
+            return text
+        # Characters are at least ~2pt wide; trim from a safe upper bound
+        text = text[: int(width / 2)]
+        while text and self.text_width(text, self.font) + self._ellipsis > width:
+            text = text[:-1]
+        return text + "…"
+
+    def cell(self, text: str, width: float) -> Tuple[str, float]:
+        """Cell text fitted to width and its rendered width (cached)."""
+        key = (text, width)
+        cached = self._cells.get(key)
+        if cached is None:
+            if len(self._cells) >= CELL_CACHE_SIZE:
+                self._cells.clear()
+            fitted = self.fit(text, width)
+            cached = self._cells[key] = (fitted, self.text_width(fitted, self.font))
+        return cached
+
+
+@functools.lru_cache(maxsize=None)
+def get_page_template() -> PageTemplate:
+    """Page template of this process (fonts are registered on first use)."""
+    return PageTemplate(*load_fonts())
+
+
+def _number(value: Any, digits: int) -> str:
+    """Format a numeric cell ("" for missing values)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{value:.{digits}f}"
+    return str(value) if value not in (None, "") else ""
+
+
+def trip_cells(trip: Dict[str, Any]) -> List[str]:
+    """Table cells of one trip, in COLUMNS order."""
+    start = trip.get("trip_start_datetime") or ""
+    end = trip.get("trip_end_datetime") or ""
+    if end[:10] == start[:10]:
+        end_cell = end[11:16]
+    else:
+        end_cell = f"{end[5:10]} {end[11:16]}".strip()
+
+    return [
+        start[:10],
+        str(trip.get("driver_name") or ""),
+        start[11:16],
+        end_cell,
+        str(trip.get("trip_start_location") or ""),
+        str(trip.get("trip_end_location") or ""),
+        _number(trip.get("distance_km"), 1),
+        str(trip.get("purpose") or ""),
+        str(trip.get("business_description") or ""),
+        _number(trip.get("fuel_consumption_liters"), 2),
+        _number(trip.get("fuel_efficiency_l_per_100km"), 2),
+    ]
+
+
+def _draw_page_header(pdf, template: PageTemplate, vehicle: Dict[str, Any], period: str) -> None:
+    """Define the per-report header form: title, vehicle and column headings."""
+    pdf.beginForm(PAGE_HEADER_FORM)
+    top = template.header_top
+    pdf.setFont(template.bold_font, 11)
+    pdf.drawString(MARGIN, top - 11, "Mileage Log")
+    pdf.setFont(template.font, 8)
+    pdf.drawRightString(
+        template.width - MARGIN,
+        top - 10,
+        f"VIN {vehicle.get('vin', '')}   {vehicle.get('license_plate', '')}   {period}",
+    )
+
+    heading_y = template.table_top - ROW_HEIGHT + 3
+    pdf.setFont(template.bold_font, FONT_SIZE)
+    for header, x, width, right in template.columns:
+        if right:
+            pdf.drawRightString(x + width - 2, heading_y, header)
+        else:
+            pdf.drawString(x + 2, heading_y, header)
+    pdf.setLineWidth(0.5)
+    pdf.line(MARGIN, heading_y - 3, template.width - MARGIN, heading_y - 3)
+    pdf.endForm()
+
+
+def _draw_summary_page(
+    pdf,
+    template: PageTemplate,
+    vehicle: Dict[str, Any],
+    period: str,
+    business_only: bool,
+) -> None:
+    """Draw the summary page; totals come from SUMMARY_FORM (defined at the end)."""
+    top = template.header_top
+    pdf.setFont(template.bold_font, 16)
+    pdf.drawString(MARGIN, top - 16, "Mileage Log - Summary")
+
+    details = [
+        ("Vehicle", vehicle.get("name") or " ".join(
+            filter(None, [vehicle.get("make"), vehicle.get("model")])
+        )),
+        ("VIN", vehicle.get("vin", "")),
+        ("License plate", vehicle.get("license_plate", "")),
+        ("Fuel type", vehicle.get("fuel_type", "")),
+        ("Period", period),
+        ("Trips", "Business only" if business_only else "All"),
+        ("Generated", datetime.now().strftime("%Y-%m-%d %H:%M")),
+    ]
+    y = top - 50
+    for label, value in details:
+        pdf.setFont(template.bold_font, 10)
+        pdf.drawString(MARGIN, y, label)
+        pdf.setFont(template.font, 10)
+        pdf.drawString(MARGIN + 110, y, str(value or ""))
+        y -= 16
+
+    pdf.doForm(SUMMARY_FORM)
+    pdf.doForm(PAGE_COUNT_FORM)
+    _draw_page_number(pdf, template, 1)
+
+
+def _define_summary_form(pdf, template: PageTemplate, summary: Dict[str, Any]) -> None:
+    """Fill in the totals shown on the summary page."""
+    pdf.beginForm(SUMMARY_FORM)
+    totals = [
+        ("Total trips", str(summary["total_trips"])),
+        ("Total distance", f"{summary['total_distance_km']:.2f} km"),
+        ("Total fuel", f"{summary['total_fuel_liters']:.2f} L"),
+        ("Average efficiency", f"{summary['average_efficiency_l_per_100km']:.2f} L/100km"),
+    ]
+    y = template.header_top - 190
+    for label, value in totals:
+        pdf.setFont(template.bold_font, 10)
+        pdf.drawString(MARGIN, y, label)
+        pdf.setFont(template.font, 10)
+        pdf.drawString(MARGIN + 110, y, value)
+        y -= 16
+    pdf.endForm()
+
+
+def _draw_page_number(pdf, template: PageTemplate, page: int) -> None:
+    """Footer "Page N of"; the total is PAGE_COUNT_FORM."""
+    pdf.setFont(template.font, FONT_SIZE)
+    pdf.drawRightString(template.width - MARGIN - 20, template.footer_y, f"Page {page} of")
+
+
+def _define_page_count_form(pdf, template: PageTemplate, pages: int) -> None:
+    """Fill in the page total shown in every footer."""
+    pdf.beginForm(PAGE_COUNT_FORM)
+    pdf.setFont(template.font, FONT_SIZE)
+    pdf.drawRightString(template.width - MARGIN, template.footer_y, str(pages))
+    pdf.endForm()
+
+
+def write_trips_pdf(
+    output_path: Path,
+    trips: Iterable[Dict[str, Any]],
+    vehicle: Dict[str, Any],
+    period: str,
+    business_only: bool = True,
+    accumulator: Optional[SummaryAccumulator] = None,
+) -> Tuple[int, int]:
+    """
+    Stream trips into a PDF report in one pass.
+
+    Only the current page's rows are formatted at a time, as one text
+    object per page; pages are compressed as they are finished.
+
+    Args:
+        output_path: PDF file to (over)write
+        trips: Trips in output order (consumed once)
+        vehicle: Vehicle for the summary page and page headers
+        period: Period label (e.g. "2025-11-01 - 2025-11-30")
+        business_only: Shown on the summary page
+        accumulator: Summary totals to update (optional); the summary page
+            shows its totals, so they always match the trip table
+
+    Returns:
+        (trips written, pages)
+    """
+    template = get_page_template()
+    accumulator = accumulator if accumulator is not None else SummaryAccumulator()
+
+    pdf = canvas.Canvas(
+        str(output_path), pagesize=(template.width, template.height), pageCompression=1
+    )
+    pdf.setTitle(f"Mileage Log {period}")
+    _draw_page_header(pdf, template, vehicle, period)
+    _draw_summary_page(pdf, template, vehicle, period, business_only)
+
+    pages = 1
+    row = template.rows_per_page
+    count = 0
+    text = None
+    for trip in trips:
+        if row == template.rows_per_page:
+            if text is not None:
+                pdf.drawText(text)
+            pdf.showPage()
+            pages += 1
+            pdf.doForm(PAGE_HEADER_FORM)
+            pdf.doForm(PAGE_COUNT_FORM)
+            _draw_page_number(pdf, template, pages)
+            text = pdf.beginText()
+            text.setFont(template.font, FONT_SIZE)
+            row = 0
+
+        y = template.table_top - ROW_HEIGHT * (row + 2) + 3
+        for value, (_, x, width, right) in zip(trip_cells(trip), template.columns):
+            if not value:
+                continue
+            fitted, fitted_width = template.cell(value, width - 4)
+            text.setTextOrigin(x + width - 2 - fitted_width if right else x + 2, y)
+            text.textOut(fitted)
+
+        accumulator.add(trip)
+        row += 1
+        count += 1
+
+    if text is not None:
+        pdf.drawText(text)
+    pdf.showPage()
+    _define_summary_form(pdf, template, accumulator.summary())
+    _define_page_count_form(pdf, template, pages)
+    pdf.save()
+
+    return count, pages
+
+
+async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate PDF mileage log report.
+
+    Args:
+        arguments: Tool arguments (start_date, end_date, vehicle_id, business_only, output_filename)
+
+    Returns:
+        Success status, output filename, summary statistics and page count
+    """
+    if canvas is None:
+        return {
+            "success": False,
+            "error": {
+                "code": "DEPENDENCY_MISSING",
+                "message": "PDF reports need reportlab (pip install reportlab)",
+            },
+        }
+
+    start_date = arguments["start_date"]
+    end_date = arguments["end_date"]
+    vehicle_id = arguments.get("vehicle_id")
+    business_only = arguments.get("business_only", True)
+    output_filename = arguments.get("output_filename")
+
+    # Generate default filename if not provided
+    if not output_filename:
+        start_dt = datetime.fromisoformat(start_date)
+        output_filename = f"{start_dt.strftime('%Y-%m')}-report.pdf"
+
+    # Stream trips (business only if requested); peek at the first one
+    purpose = "Business" if business_only else None
+    trips = iter_trips_in_range(start_date, end_date, vehicle_id, purpose)
+    first_trip = next(trips, None)
+
+    if first_trip is None:
+        return {
+            "success": True,
+            "message": "No trips found matching criteria",
+            "trip_count": 0,
+        }
+
+    # Load vehicle data for VIN (use first trip's vehicle if not specified)
+    if not vehicle_id:
+        vehicle_id = first_trip.get("vehicle_id")
+
+    vehicle = load_vehicle(vehicle_id) if vehicle_id else {}
+
+    # Create output directory
+    start_dt = datetime.fromisoformat(start_date)
+    output_dir = get_data_path() / "reports" / start_dt.strftime("%Y-%m")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    output_path = output_dir / output_filename
+
+    # Summarize while drawing
+    accumulator = SummaryAccumulator()
+    trip_count, page_count = write_trips_pdf(
+        output_path,
+        itertools.chain([first_trip], trips),
+        vehicle,
+        f"{start_date} - {end_date}",
+        business_only,
+        accumulator,
+    )
+
+    return {
+        "success": True,
+        "output_file": str(output_path),
+        "summary": accumulator.summary(),
+        "trip_count": trip_count,
+        "page_count": page_count,
+    }
@@ -18,6 +18,7 @@ from mcp.types import Tool
 from .tools import (
     match_templates,
     calculate_template_completeness,
+    reconstruct_gaps,
 )
 
 # Configure logging
@@ -49,6 +50,11 @@ async def list_tools():
             description="Calculate template completeness and provide improvement suggestions",
             inputSchema=calculate_template_completeness.INPUT_SCHEMA,
         ),
+        Tool(
+            name="reconstruct_gaps",
+            description="Find all checkpoint gaps of a vehicle in a date range and propose trips for each",
+            inputSchema=reconstruct_gaps.INPUT_SCHEMA,
+        ),
     ]
 
 
@@ -60,6 +66,8 @@ async def call_tool(name: str, arguments: dict):
             return await match_templates.execute(arguments)
         elif name == "calculate_template_completeness":
             return await calculate_template_completeness.execute(arguments)
+        elif name == "reconstruct_gaps":
+            return await reconstruct_gaps.execute(arguments)
         else:
             return {
                 "success": False,
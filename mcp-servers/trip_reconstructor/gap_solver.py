@@ -0,0 +1,280 @@
+"""
+Gap-filling solvers for reconstruction proposals.
+
+Given matched templates (sorted by confidence) and a gap distance, choose how
+many times to drive each template:
+
+- greedy: take as many of each template as fit, in confidence order, and
+  stop once less than GREEDY_STOP_KM remains (the original behavior)
+- optimal: exact integer knapsack over template distances (at
+  RESOLUTION_KM). It finds the best coverage not exceeding the gap and,
+  among all totals within tolerance_km of it, the one with the highest
+  confidence-weighted distance. Vectorized with numpy when installed.
+  Falls back to greedy when the time budget runs out.
+
+Totals never exceed the gap distance.
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SOLVERS = ("optimal", "greedy")
+
+# Distances are packed in units of 0.1 km (template distances rounded up)
+RESOLUTION_KM = 0.1
+
+# Default tolerance: coverage this close to the best competes on confidence
+DEFAULT_TOLERANCE_KM = 50
+
+# Greedy stops once the remainder is below this
+GREEDY_STOP_KM = 50
+
+# Optimal solver time budget before falling back to greedy
+DEFAULT_TIME_BUDGET_MS = 30
+
+# numpy solver: running maxima row by row up to this many rows, else by doubling
+ROW_LOOP_MAX = 64
+
+# One proposal line: (match, num_trips, effective_distance_km)
+Allocation = List[Tuple[Dict, int, float]]
+
+
+class SolverTimeout(Exception):
+    """Raised internally when the optimal solver exceeds its budget"""
+
+
+def effective_distance_km(template: Dict) -> float:
+    """Distance driven per use of a template (round trips count twice)."""
+    distance = template.get('distance_km', 0) or 0
+    return distance * 2 if template.get('is_round_trip', False) else distance
+
+
+def solve_greedy(gap_distance_km: float, matched_templates: List[Dict]) -> Allocation:
+    """
+    Fill the gap template by template in confidence order.
+
+    Args:
+        gap_distance_km: Distance to cover
+        matched_templates: Matched templates (sorted by confidence)
+
+    Returns:
+        Allocation in confidence order
+    """
+    allocation = []
+    remaining_distance = gap_distance_km
+
+    for match in matched_templates:
+        effective_distance = effective_distance_km(match['template'])
+        if effective_distance <= 0:
+            continue
+
+        # Calculate number of trips (round down)
+        num_trips = int(remaining_distance / effective_distance)
+        if num_trips > 0:
+            allocation.append((match, num_trips, effective_distance))
+            remaining_distance -= num_trips * effective_distance
+
+            # Stop if we've covered enough
+            if remaining_distance < GREEDY_STOP_KM:
+                break
+
+    return allocation
+
+
+def _units(distance_km: float) -> int:
+    """Distance in solver units (rounded up so real totals never exceed the gap)."""
+    return math.ceil(round(distance_km / RESOLUTION_KM, 6))
+
+
+def _check(deadline: float) -> None:
+    """Raise SolverTimeout once the deadline has passed."""
+    if time.perf_counter() > deadline:
+        raise SolverTimeout()
+
+
+def solve_optimal(
+    gap_distance_km: float,
+    matched_templates: List[Dict],
+    tolerance_km: float = DEFAULT_TOLERANCE_KM,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+) -> Optional[Allocation]:
+    """
+    Integer-knapsack gap fill maximizing confidence-weighted coverage.
+
+    Exact at RESOLUTION_KM: a dynamic program keeps, for every reachable
+    total, the best confidence-weighted distance and which template each
+    stage added, so the chosen total is the best one in the whole tolerance
+    window and its allocation is recovered without guessing.
+
+    Args:
+        gap_distance_km: Distance to cover
+        matched_templates: Matched templates (sorted by confidence)
+        tolerance_km: Coverage within this of the best achievable competes
+            on confidence-weighted distance
+        time_budget_ms: Give up after this long
+
+    Returns:
+        Allocation in confidence order, or None if the budget ran out
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    capacity = int(gap_distance_km / RESOLUTION_KM + 1e-9)
+    if capacity <= 0:
+        return []
+
+    # One item per distinct size (the first, i.e. most confident, wins)
+    items = []
+    seen = set()
+    for match in matched_templates:
+        effective_distance = effective_distance_km(match['template'])
+        if effective_distance <= 0:
+            continue
+        units = _units(effective_distance)
+        if units > capacity or units in seen:
+            continue
+        seen.add(units)
+        items.append((match, units, effective_distance))
+
+    try:
+        if np is not None:
+            values, taken = _knapsack_numpy(items, capacity, deadline)
+        else:
+            values, taken = _knapsack_python(items, capacity, deadline)
+    except SolverTimeout:
+        return None
+
+    # Best reachable coverage (total 0 always is)
+    best = capacity
+    while values[best] == -math.inf:
+        best -= 1
+    lowest = max(0, best - int(tolerance_km / RESOLUTION_KM + 1e-9))
+
+    # Highest confidence-weighted distance in the window; ties keep more coverage
+    target = best
+    for total in range(best - 1, lowest - 1, -1):
+        if values[total] > values[target]:
+            target = total
+
+    return _backtrack(items, taken, target)
+
+
+def _value(match: Dict, distance: float) -> float:
+    """Confidence-weighted distance of one use of a template."""
+    return distance * match['confidence_score']
+
+
+def _knapsack_numpy(
+    items: List[Tuple[Dict, int, float]], capacity: int, deadline: float
+) -> Tuple["np.ndarray", List[bytes]]:
+    """
+    Unbounded knapsack, one vectorized pass per item.
+
+    Seen as rows of `units` totals, adding the item once more is a step to
+    the next row: best[row] = max(values[row], best[row - 1] + value), a
+    running maximum computed a whole row (or, by doubling, many rows) at a
+    time.
+
+    Returns:
+        (best value per total, -inf if unreachable;
+         per item, packed bits: total improved by adding this item)
+    """
+    values = np.full(capacity + 1, -np.inf)
+    values[0] = 0.0
+    # Preallocated buffers: memory stays at three arrays whatever the item count
+    best = np.empty_like(values)
+    shifted = np.empty_like(values)
+    taken = []
+    for match, units, distance in items:
+        value = _value(match, distance)
+        np.copyto(best, values)
+        rows = capacity // units + 1
+        if rows <= ROW_LOOP_MAX:
+            for start in range(units, capacity + 1, units):
+                row = best[start:start + units]
+                previous = shifted[:len(row)]
+                np.add(best[start - units:start - units + len(row)], value, out=previous)
+                np.maximum(row, previous, out=row)
+        else:
+            copies = 1
+            while copies < rows:
+                shift = copies * units
+                previous = shifted[:capacity + 1 - shift]
+                np.add(best[:-shift], copies * value, out=previous)
+                np.maximum(best[shift:], previous, out=best[shift:])
+                copies *= 2
+
+        taken.append(np.packbits(best > values).tobytes())
+        values, best = best, values
+        _check(deadline)
+
+    return values, taken
+
+
+def _knapsack_python(
+    items: List[Tuple[Dict, int, float]], capacity: int, deadline: float
+) -> Tuple[List[float], List[bytes]]:
+    """Same result as _knapsack_numpy with plain loops (numpy not installed)."""
+    values = [-math.inf] * (capacity + 1)
+    values[0] = 0.0
+    taken = []
+    for match, units, distance in items:
+        value = _value(match, distance)
+        took = bytearray((capacity >> 3) + 1)
+        for total in range(units, capacity + 1):
+            candidate = values[total - units] + value
+            if candidate > values[total]:
+                values[total] = candidate
+                took[total >> 3] |= 0x80 >> (total & 7)
+        taken.append(bytes(took))
+        _check(deadline)
+
+    return values, taken
+
+
+def _backtrack(items: List[Tuple[Dict, int, float]], taken: List[bytes], target: int) -> Allocation:
+    """Recover the counts behind a total, walking the items back from the last."""
+    counts = []
+    for k in range(len(items) - 1, -1, -1):
+        match, units, distance = items[k]
+        bits = taken[k]
+        num = 0
+        while target > 0 and (bits[target >> 3] >> (7 - (target & 7))) & 1:
+            target -= units
+            num += 1
+        if num:
+            counts.append((match, num, distance))
+
+    counts.reverse()
+    return counts
+
+
+def solve_gap(
+    gap_distance_km: float,
+    matched_templates: List[Dict],
+    solver: str = "optimal",
+    tolerance_km: float = DEFAULT_TOLERANCE_KM,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+) -> Tuple[Allocation, str]:
+    """
+    Choose template counts for a gap.
+
+    Args:
+        gap_distance_km: Distance to cover
+        matched_templates: Matched templates (sorted by confidence)
+        solver: "optimal" or "greedy"
+        tolerance_km: See solve_optimal
+        time_budget_ms: See solve_optimal
+
+    Returns:
+        (allocation, solver actually used)
+    """
+    if solver == "optimal":
+        allocation = solve_optimal(gap_distance_km, matched_templates, tolerance_km, time_budget_ms)
+        if allocation is not None:
+            return allocation, "optimal"
+    return solve_greedy(gap_distance_km, matched_templates), "greedy"
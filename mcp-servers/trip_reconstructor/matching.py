@@ -5,12 +5,26 @@ Implements:
 - GPS matching with Haversine distance (70% weight)
 - Address matching with normalization (30% weight)
 - Hybrid scoring with bonuses
+- Optional NumPy batch scoring of many templates at once (same results)
+- Memoized address components and bounded edit distance (rapidfuzz when
+  installed)
 """
 
 import math
 import re
 import unicodedata
-from typing import Dict, Tuple, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from rapidfuzz.distance import Levenshtein as rapidfuzz_levenshtein
+except ImportError:
+    rapidfuzz_levenshtein = None
 
 
 # GPS Scoring Thresholds
@@ -21,6 +35,23 @@ GPS_SCORE_THRESHOLDS = [
     (5000, 40),      # 2000m-5000m → 40 points
 ]
 
+# Beyond this distance an endpoint gets no GPS points at all
+GPS_MATCH_RADIUS_M = GPS_SCORE_THRESHOLDS[-1][0]
+
+# Earth radius in meters (Haversine)
+EARTH_RADIUS_M = 6371000
+
+# Common Slovak cities recognized in addresses
+SLOVAK_CITIES = [
+    'bratislava', 'kosice', 'presov', 'zilina', 'banska bystrica',
+    'nitra', 'trnava', 'martin', 'trencin', 'poprad'
+]
+
+STREET_PATTERN = re.compile(r'([a-z\s]+)\s+(\d+)')
+
+# Parsed addresses kept in memory (template addresses repeat across gaps)
+ADDRESS_CACHE_SIZE = 4096
+
 # Weights for hybrid scoring
 GPS_WEIGHT = 0.7      # 70% GPS
 ADDRESS_WEIGHT = 0.3  # 30% Address
@@ -37,8 +68,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in meters
     """
-    # Earth radius in meters
-    R = 6371000
+    R = EARTH_RADIUS_M
 
     # Convert to radians
     phi1 = math.radians(lat1)
@@ -114,6 +144,12 @@ def extract_address_components(address: str) -> Dict[str, str]:
     Returns:
         Dictionary with components
     """
+    return dict(_address_components(address))
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _address_components(address: str) -> Dict[str, str]:
+    """Memoized extract_address_components (callers must not modify the result)."""
     if not address:
         return {}
 
@@ -121,18 +157,13 @@ def extract_address_components(address: str) -> Dict[str, str]:
     components = {}
 
     # Extract city (common Slovak cities)
-    cities = [
-        'bratislava', 'kosice', 'presov', 'zilina', 'banska bystrica',
-        'nitra', 'trnava', 'martin', 'trencin', 'poprad'
-    ]
-
-    for city in cities:
+    for city in SLOVAK_CITIES:
         if city in normalized:
             components['city'] = city
             break
 
     # Extract street number pattern
-    street_match = re.search(r'([a-z\s]+)\s+(\d+)', normalized)
+    street_match = STREET_PATTERN.search(normalized)
     if street_match:
         components['street'] = street_match.group(1).strip()
         components['number'] = street_match.group(2)
@@ -143,18 +174,28 @@ def extract_address_components(address: str) -> Dict[str, str]:
     return components
 
 
-def levenshtein_distance(s1: str, s2: str) -> int:
+def levenshtein_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
     """
     Calculate Levenshtein distance between two strings.
 
+    Uses rapidfuzz when installed.
+
     Args:
         s1, s2: Strings to compare
+        max_distance: Optional bound; larger distances are not computed
+            exactly and max_distance + 1 is returned instead
 
     Returns:
         Edit distance
     """
+    if rapidfuzz_levenshtein is not None:
+        return rapidfuzz_levenshtein.distance(s1, s2, score_cutoff=max_distance)
+
     if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
+        return levenshtein_distance(s2, s1, max_distance)
+
+    if max_distance is not None and len(s1) - len(s2) > max_distance:
+        return max_distance + 1
 
     if len(s2) == 0:
         return len(s1)
@@ -168,27 +209,64 @@ def levenshtein_distance(s1: str, s2: str) -> int:
             deletions = current_row[j] + 1
             substitutions = previous_row[j] + (c1 != c2)
             current_row.append(min(insertions, deletions, substitutions))
+        # Row minimums never decrease, so the bound is already exceeded
+        if max_distance is not None and min(current_row) > max_distance:
+            return max_distance + 1
         previous_row = current_row
 
     return previous_row[-1]
 
 
-def score_address_match(address1: Optional[str], address2: Optional[str]) -> int:
+def _similarity_points(text1: str, text2: str, points_needed: Optional[float]) -> Optional[int]:
+    """
+    Edit-distance similarity of two strings scaled to 0-30 points.
+
+    Args:
+        text1, text2: Non-empty strings to compare
+        points_needed: Optional minimum; when the strings cannot earn it the
+            distance is not computed in full
+
+    Returns:
+        Points, or None once points_needed is out of reach
+    """
+    max_len = max(len(text1), len(text2))
+    cutoff = None
+    if points_needed is not None and points_needed > 0:
+        if points_needed > 30:
+            return None
+        # One above the exact limit, to stay clear of float rounding
+        cutoff = math.floor(max_len * (1 - points_needed / 30)) + 1
+
+    distance = levenshtein_distance(text1, text2, cutoff)
+    if cutoff is not None and distance > cutoff:
+        return None
+    similarity = 1 - (distance / max_len)
+    return int(similarity * 30)
+
+
+def score_address_match(
+    address1: Optional[str],
+    address2: Optional[str],
+    min_score: Optional[float] = None,
+) -> int:
     """
     Score address match using component-based similarity.
 
     Args:
         address1: First address
         address2: Second address
+        min_score: Optional score the caller needs; once it is out of reach
+            the remaining comparisons are skipped and a lower score
+            (never a higher one) is returned
 
     Returns:
-        Score from 0-100
+        Score from 0-100 (exact whenever it is at least min_score)
     """
     if not address1 or not address2:
         return 0
 
-    components1 = extract_address_components(address1)
-    components2 = extract_address_components(address2)
+    components1 = _address_components(address1)
+    components2 = _address_components(address2)
 
     if not components1 or not components2:
         return 0
@@ -203,26 +281,82 @@ def score_address_match(address1: Optional[str], address2: Optional[str]) -> int
     if 'street' in components1 and 'street' in components2:
         street1 = components1['street']
         street2 = components2['street']
-        max_len = max(len(street1), len(street2))
 
-        if max_len > 0:
-            distance = levenshtein_distance(street1, street2)
-            similarity = 1 - (distance / max_len)
-            score += int(similarity * 30)
+        if max(len(street1), len(street2)) > 0:
+            points = _similarity_points(
+                street1, street2, None if min_score is None else min_score - score - 30
+            )
+            if points is None:
+                return score
+            score += points
 
     # Full address similarity (30 points)
     full1 = components1.get('full', '')
     full2 = components2.get('full', '')
-    max_len = max(len(full1), len(full2))
-
-    if max_len > 0:
-        distance = levenshtein_distance(full1, full2)
-        similarity = 1 - (distance / max_len)
-        score += int(similarity * 30)
+    if max(len(full1), len(full2)) > 0:
+        points = _similarity_points(
+            full1, full2, None if min_score is None else min_score - score
+        )
+        if points is None:
+            return score
+        score += points
 
     return min(score, 100)
 
 
+def score_distance_bonus(
+    template_distance_km: Optional[float],
+    gap_distance_km: Optional[float],
+) -> int:
+    """
+    Bonus for a template distance close to the gap distance.
+
+    Returns:
+        10 within 10%, 5 within 20%, otherwise 0
+    """
+    if template_distance_km and gap_distance_km:
+        distance_diff = abs(template_distance_km - gap_distance_km)
+        distance_diff_pct = distance_diff / template_distance_km if template_distance_km > 0 else 0
+
+        if distance_diff_pct < 0.1:  # Within 10%
+            return 10
+        elif distance_diff_pct < 0.2:  # Within 20%
+            return 5
+    return 0
+
+
+def score_day_bonus(gap_day_of_week: Optional[str], template_typical_days: Optional[list]) -> int:
+    """
+    Bonus when the gap falls on one of the template's typical days.
+
+    Returns:
+        10 or 0
+    """
+    if gap_day_of_week and template_typical_days:
+        if gap_day_of_week in template_typical_days:
+            return 10
+    return 0
+
+
+def max_endpoint_score(within_radius: bool, bonuses: int) -> float:
+    """
+    Upper bound of an endpoint's hybrid score.
+
+    An endpoint farther than GPS_MATCH_RADIUS_M gets 0 GPS points, so at
+    best it earns full address points plus its bonuses.
+
+    Args:
+        within_radius: Whether the endpoint may lie within GPS_MATCH_RADIUS_M
+        bonuses: Distance bonus + day bonus of the template
+
+    Returns:
+        Highest score calculate_hybrid_score could return
+    """
+    if within_radius:
+        return 100
+    return min(100 * ADDRESS_WEIGHT + bonuses, 100)
+
+
 def calculate_hybrid_score(
     gap_coords: Tuple[float, float],
     template_coords: Tuple[float, float],
@@ -232,6 +366,7 @@ def calculate_hybrid_score(
     gap_distance_km: Optional[float] = None,
     gap_day_of_week: Optional[str] = None,
     template_typical_days: Optional[list] = None,
+    min_score: Optional[float] = None,
 ) -> Dict[str, any]:
     """
     Calculate hybrid matching score (GPS 70% + Address 30%).
@@ -245,6 +380,8 @@ def calculate_hybrid_score(
         gap_distance_km: Optional gap distance
         gap_day_of_week: Optional day of week (e.g., "Monday")
         template_typical_days: Optional list of typical days
+        min_score: Optional total score the caller needs (see
+            combine_hybrid_score)
 
     Returns:
         Dictionary with scores and breakdown
@@ -256,31 +393,53 @@ def calculate_hybrid_score(
     )
     gps_score = score_gps_match(distance_meters)
 
+    return combine_hybrid_score(
+        distance_meters=distance_meters,
+        gps_score=gps_score,
+        gap_address=gap_address,
+        template_address=template_address,
+        distance_bonus=score_distance_bonus(template_distance_km, gap_distance_km),
+        day_bonus=score_day_bonus(gap_day_of_week, template_typical_days),
+        min_score=min_score,
+    )
+
+
+def combine_hybrid_score(
+    distance_meters: float,
+    gps_score: int,
+    gap_address: Optional[str],
+    template_address: Optional[str],
+    distance_bonus: int,
+    day_bonus: int,
+    min_score: Optional[float] = None,
+) -> Dict[str, any]:
+    """
+    Combine GPS score, address score and bonuses into the hybrid result.
+
+    Shared by the scalar and batch paths so both return identical results.
+
+    Args:
+        min_score: Optional total score the caller needs. Address scoring
+            stops early once it is out of reach, so a result below
+            min_score may be underestimated; results at or above it are exact.
+
+    Returns:
+        Dictionary with scores and breakdown (see calculate_hybrid_score)
+    """
     # Address matching (optional)
     address_score = 0
     if gap_address and template_address:
-        address_score = score_address_match(gap_address, template_address)
+        min_address = None
+        if min_score is not None:
+            # One point of slack covers float and round(total, 2) effects
+            min_address = (
+                min_score - gps_score * GPS_WEIGHT - distance_bonus - day_bonus
+            ) / ADDRESS_WEIGHT - 1
+        address_score = score_address_match(gap_address, template_address, min_address)
 
     # Base hybrid score
     base_score = (gps_score * GPS_WEIGHT) + (address_score * ADDRESS_WEIGHT)
 
-    # Distance bonus (up to +10 points)
-    distance_bonus = 0
-    if template_distance_km and gap_distance_km:
-        distance_diff = abs(template_distance_km - gap_distance_km)
-        distance_diff_pct = distance_diff / template_distance_km if template_distance_km > 0 else 0
-
-        if distance_diff_pct < 0.1:  # Within 10%
-            distance_bonus = 10
-        elif distance_diff_pct < 0.2:  # Within 20%
-            distance_bonus = 5
-
-    # Day-of-week bonus (up to +10 points)
-    day_bonus = 0
-    if gap_day_of_week and template_typical_days:
-        if gap_day_of_week in template_typical_days:
-            day_bonus = 10
-
     # Total score (capped at 100)
     total_score = min(base_score + distance_bonus + day_bonus, 100)
 
@@ -305,6 +464,7 @@ def match_checkpoint_to_template(
     endpoint: str = 'from',  # 'from' or 'to'
     gap_distance_km: Optional[float] = None,
     gap_day_of_week: Optional[str] = None,
+    min_score: Optional[float] = None,
 ) -> Dict:
     """
     Match a gap checkpoint to a template endpoint.
@@ -315,6 +475,8 @@ def match_checkpoint_to_template(
         endpoint: 'from' or 'to' endpoint to match
         gap_distance_km: Optional gap distance for distance bonus
         gap_day_of_week: Optional day of week for day bonus
+        min_score: Optional score the caller needs; lower scores may be
+            underestimated (see combine_hybrid_score)
 
     Returns:
         Match result with score and details
@@ -358,6 +520,7 @@ def match_checkpoint_to_template(
         gap_distance_km=gap_distance_km,
         gap_day_of_week=gap_day_of_week,
         template_typical_days=template.get('typical_days'),
+        min_score=min_score,
     )
 
     return {
@@ -366,3 +529,128 @@ def match_checkpoint_to_template(
         'score': score_result['total_score'],
         'details': score_result,
     }
+
+
+# Batch scoring (NumPy)
+
+# match_templates switches to the batch path from this many templates on
+BATCH_MIN_TEMPLATES = 200
+
+
+def batch_scoring_available() -> bool:
+    """True when NumPy is installed."""
+    return np is not None
+
+
+def haversine_distance_batch(
+    lat: float, lon: float, lats: "np.ndarray", lons: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Haversine distances from one point to many (vectorized haversine_distance).
+
+    Args:
+        lat, lon: Gap coordinate (degrees)
+        lats, lons: Template coordinates (degrees)
+
+    Returns:
+        Distances in meters
+    """
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = np.radians(lats - lat)
+    delta_lambda = np.radians(lons - lon)
+
+    a = (np.sin(delta_phi / 2) ** 2 +
+         math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_M * c
+
+
+def score_gps_match_batch(distances_meters: "np.ndarray") -> "np.ndarray":
+    """Vectorized score_gps_match (integer scores 0-100)."""
+    scores = np.zeros(len(distances_meters), dtype=np.int64)
+    for threshold, score in reversed(GPS_SCORE_THRESHOLDS):
+        scores[distances_meters < threshold] = score
+    return scores
+
+
+def score_distance_bonus_batch(
+    template_distances_km: "np.ndarray", gap_distance_km: Optional[float]
+) -> "np.ndarray":
+    """
+    Vectorized score_distance_bonus.
+
+    Args:
+        template_distances_km: Template distances (NaN or 0 = unknown)
+        gap_distance_km: Gap distance
+
+    Returns:
+        Bonuses (10, 5 or 0)
+    """
+    bonuses = np.zeros(len(template_distances_km), dtype=np.int64)
+    if not gap_distance_km:
+        return bonuses
+
+    known = ~np.isnan(template_distances_km) & (template_distances_km != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff_pct = np.where(
+            template_distances_km > 0,
+            np.abs(template_distances_km - gap_distance_km) / template_distances_km,
+            0.0,
+        )
+    bonuses[known & (diff_pct < 0.2)] = 5
+    bonuses[known & (diff_pct < 0.1)] = 10
+    return bonuses
+
+
+def prepare_templates_batch(templates: List[Dict]) -> Dict[str, Any]:
+    """
+    Template-side arrays for batch scoring (computed once per template set).
+
+    Args:
+        templates: Template dicts; those missing either endpoint are left out
+
+    Returns:
+        {"templates": usable templates, "positions": their positions in
+        templates, "from_coords"/"to_coords": (n, 2) lat/lng arrays,
+        "distances_km": template distances (NaN if unknown)}
+    """
+    positions = [
+        i for i, t in enumerate(templates) if t.get("from_coords") and t.get("to_coords")
+    ]
+    usable = [templates[i] for i in positions]
+    return {
+        "templates": usable,
+        "positions": np.array(positions, dtype=np.int64),
+        "from_coords": np.array(
+            [(t["from_coords"]["lat"], t["from_coords"]["lng"]) for t in usable],
+            dtype=np.float64,
+        ).reshape(-1, 2),
+        "to_coords": np.array(
+            [(t["to_coords"]["lat"], t["to_coords"]["lng"]) for t in usable],
+            dtype=np.float64,
+        ).reshape(-1, 2),
+        "distances_km": np.array(
+            [t.get("distance_km") or np.nan for t in usable], dtype=np.float64
+        ),
+    }
+
+
+def score_endpoints_batch(
+    gap_coords: Tuple[float, float],
+    template_coords: List[Tuple[float, float]],
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    GPS part of calculate_hybrid_score for many template endpoints at once.
+
+    Args:
+        gap_coords: (lat, lng) of gap checkpoint
+        template_coords: (lat, lng) of each template endpoint (list or (n, 2) array)
+
+    Returns:
+        (distances in meters, GPS scores)
+    """
+    coords = np.asarray(template_coords, dtype=np.float64).reshape(-1, 2)
+    distances = haversine_distance_batch(gap_coords[0], gap_coords[1], coords[:, 0], coords[:, 1])
+    return distances, score_gps_match_batch(distances)
@@ -0,0 +1,100 @@
+"""
+Distance and day-of-week indexes over templates for match_templates.
+
+Optional candidate stages that run before any GPS or address scoring:
+
+- distance: templates whose distance per use (round trips count twice) is
+  longer than the gap can never be part of a reconstruction proposal (both
+  gap solvers skip them). A sorted distance index finds them with one bisect.
+  Templates without a distance are kept.
+- day: templates whose typical_days do not include the gap's start day,
+  found with an inverted index by day. Templates without typical_days are
+  kept. Such templates would only miss the day bonus, so this stage can
+  drop templates that would otherwise match.
+
+Distance pruning leaves the proposal unchanged and only shortens
+matched_templates.
+"""
+
+import bisect
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .gap_solver import effective_distance_km
+
+PREFILTER_STAGES = ("distance", "day")
+
+
+class TemplatePrefilterIndex:
+    """Sorted distance index and inverted day index over a template list"""
+
+    def __init__(self, templates: List[Dict]):
+        """
+        Build both indexes.
+
+        Args:
+            templates: Template dicts (indexed by position in this list)
+        """
+        self.size = len(templates)
+
+        by_distance = sorted(
+            (effective_distance_km(template), position)
+            for position, template in enumerate(templates)
+            if isinstance(template.get("distance_km"), (int, float))
+            and template["distance_km"] > 0
+        )
+        self._distances = [distance for distance, _ in by_distance]
+        self._by_distance = [position for _, position in by_distance]
+
+        # day -> template positions; positions with any typical_days at all
+        self._days: Dict[str, Set[int]] = {}
+        self._with_days: Set[int] = set()
+        for position, template in enumerate(templates):
+            typical_days = template.get("typical_days")
+            if not isinstance(typical_days, list) or not typical_days:
+                continue
+            self._with_days.add(position)
+            for day in typical_days:
+                if isinstance(day, str):
+                    self._days.setdefault(day, set()).add(position)
+
+    def longer_than(self, distance_km: float) -> List[int]:
+        """Positions of templates whose distance per use exceeds distance_km."""
+        return self._by_distance[bisect.bisect_right(self._distances, distance_km):]
+
+    def not_on_day(self, day: Optional[str]) -> Set[int]:
+        """Positions of templates with typical_days that exclude day (none if day unknown)."""
+        if not day:
+            return set()
+        return self._with_days - self._days.get(day, set())
+
+    def prune(
+        self,
+        stages: Sequence[str],
+        gap_distance_km: float,
+        day: Optional[str],
+    ) -> Tuple[Set[int], Dict[str, int]]:
+        """
+        Run the requested stages.
+
+        Args:
+            stages: Subset of PREFILTER_STAGES
+            gap_distance_km: Gap distance
+            day: Gap start day name (e.g. "Monday")
+
+        Returns:
+            (pruned positions, templates pruned per stage; a template pruned
+            by both stages counts for the first in PREFILTER_STAGES order)
+        """
+        pruned: Set[int] = set()
+        counts: Dict[str, int] = {}
+        for stage in PREFILTER_STAGES:
+            if stage not in stages:
+                continue
+            if stage == "distance":
+                found = self.longer_than(gap_distance_km or 0)
+            else:
+                found = self.not_on_day(day)
+            before = len(pruned)
+            pruned.update(found)
+            counts[stage] = len(pruned) - before
+        return pruned, counts
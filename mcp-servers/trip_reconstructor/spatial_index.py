@@ -0,0 +1,109 @@
+"""
+Grid index over template endpoints for match_templates.
+
+GPS scoring gives 0 points beyond GPS_MATCH_RADIUS_M (5 km), so a template
+endpoint outside that radius can only earn address points and bonuses. The
+index returns, for a gap checkpoint, the templates whose endpoint may lie
+within the radius; everything else is known to be farther away and can be
+bounded (and usually skipped) without Haversine or address scoring.
+"""
+
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from .matching import EARTH_RADIUS_M, GPS_MATCH_RADIUS_M
+
+ENDPOINTS = ("from", "to")
+
+
+def _endpoint_coords(template: Dict, endpoint: str) -> Optional[Tuple[float, float]]:
+    """(lat, lng) of a template endpoint or None if missing/invalid."""
+    coords = template.get(f"{endpoint}_coords")
+    if not isinstance(coords, dict):
+        return None
+    try:
+        return float(coords["lat"]), float(coords["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TemplateSpatialIndex:
+    """Uniform lat/lng grid over template from/to coordinates"""
+
+    def __init__(self, templates: List[Dict], radius_m: float = GPS_MATCH_RADIUS_M):
+        """
+        Build the grid.
+
+        Args:
+            templates: Template dicts (indexed by position in this list)
+            radius_m: Search radius; also the cell size in degrees of latitude
+        """
+        self.radius_m = radius_m
+        self.cell_deg = math.degrees(radius_m / EARTH_RADIUS_M)
+        self.size = len(templates)
+        # endpoint -> lat cell -> lng cell -> template positions
+        self._cells: Dict[str, Dict[int, Dict[int, List[int]]]] = {e: {} for e in ENDPOINTS}
+
+        for position, template in enumerate(templates):
+            for endpoint in ENDPOINTS:
+                coords = _endpoint_coords(template, endpoint)
+                if coords is None:
+                    continue
+                row = self._cells[endpoint].setdefault(self._cell(coords[0]), {})
+                row.setdefault(self._cell(coords[1]), []).append(position)
+
+    def _cell(self, degrees: float) -> int:
+        """Grid cell number of a latitude or longitude."""
+        return math.floor(degrees / self.cell_deg)
+
+    def _lng_ranges(self, lat: float, lng: float, dlat: float) -> List[Tuple[float, float]]:
+        """
+        Longitude intervals that can hold points within the radius.
+
+        The half-width is derived from the Haversine formula at the
+        highest latitude of the band, so the box never misses a point; it
+        wraps across the antimeridian and spans everything near the poles.
+        """
+        cos_min = math.cos(math.radians(min(90.0, abs(lat) + dlat)))
+        ratio = math.sin(self.radius_m / (2 * EARTH_RADIUS_M)) / cos_min if cos_min > 1e-12 else 2
+        if ratio >= 1:
+            return [(-180.0, 180.0)]
+
+        dlng = math.degrees(2 * math.asin(ratio))
+        low, high = lng - dlng, lng + dlng
+        ranges = [(max(low, -180.0), min(high, 180.0))]
+        if low < -180.0:
+            ranges.append((low + 360.0, 180.0))
+        if high > 180.0:
+            ranges.append((-180.0, high - 360.0))
+        return ranges
+
+    def near(self, endpoint: str, lat: float, lng: float) -> Set[int]:
+        """
+        Templates whose endpoint may lie within the radius of a point.
+
+        Args:
+            endpoint: "from" or "to"
+            lat, lng: Point (degrees)
+
+        Returns:
+            Template positions (a superset of those within the radius)
+        """
+        dlat = math.degrees(self.radius_m / EARTH_RADIUS_M)
+        rows = self._cells[endpoint]
+        lng_ranges = self._lng_ranges(lat, lng, dlat)
+
+        found: Set[int] = set()
+        for lat_cell in range(self._cell(lat - dlat), self._cell(lat + dlat) + 1):
+            row = rows.get(lat_cell)
+            if not row:
+                continue
+            for low, high in lng_ranges:
+                first, last = self._cell(low), self._cell(high)
+                if last - first + 1 >= len(row):
+                    cells = [c for c in row if first <= c <= last]
+                else:
+                    cells = [c for c in range(first, last + 1) if c in row]
+                for lng_cell in cells:
+                    found.update(row[lng_cell])
+        return found
@@ -0,0 +1,149 @@
+"""
+Compiled template sets reused across match_templates calls.
+
+Compiling a template set builds its spatial index and, for large sets with
+NumPy installed, the batch-scoring arrays; the prefilter indexes are built
+on first use. Compiled sets are kept per process under a content hash of the
+templates ("tset-..."), so a caller can pass that handle instead of sending
+the same templates again.
+
+Each set records the car-log-core template revision it was compiled under.
+create_template, update_template and delete_template bump the revision, and
+cached sets from an older revision are dropped on their next lookup; callers
+then send their templates again.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .matching import BATCH_MIN_TEMPLATES, batch_scoring_available, prepare_templates_batch
+from .prefilter import TemplatePrefilterIndex
+from .spatial_index import TemplateSpatialIndex
+
+# Template revision from car-log-core storage
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from car_log_core.storage import get_templates_revision
+
+# Compiled template sets kept per process (least recently used dropped first)
+MAX_TEMPLATE_SETS = 8
+
+HANDLE_PREFIX = "tset-"
+
+
+def template_set_handle(templates: List[Dict]) -> str:
+    """
+    Content hash of a template set (independent of key order).
+
+    Args:
+        templates: Template dicts
+
+    Returns:
+        Handle such as "tset-3f2a..."
+    """
+    canonical = json.dumps(
+        templates, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return HANDLE_PREFIX + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+class CompiledTemplateSet:
+    """Template set with its spatial index and batch arrays, built once"""
+
+    def __init__(
+        self,
+        templates: List[Dict],
+        handle: Optional[str] = None,
+        revision: Optional[str] = None,
+    ):
+        """
+        Compile a template set.
+
+        Args:
+            templates: Template dicts (not copied; treat as read-only)
+            handle: Content hash (computed when not given)
+            revision: car-log-core template revision at compile time
+        """
+        self.templates = templates
+        self.handle = handle or template_set_handle(templates)
+        self.revision = revision
+        self.index = TemplateSpatialIndex(templates)
+        self.batch = (
+            prepare_templates_batch(templates)
+            if len(templates) >= BATCH_MIN_TEMPLATES and batch_scoring_available()
+            else None
+        )
+        self._prefilter: Optional[TemplatePrefilterIndex] = None
+
+    @property
+    def prefilter(self) -> TemplatePrefilterIndex:
+        """Distance and day indexes (built on first use)."""
+        if self._prefilter is None:
+            self._prefilter = TemplatePrefilterIndex(self.templates)
+        return self._prefilter
+
+
+_cache: "OrderedDict[str, CompiledTemplateSet]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_templates(templates: List[Dict]) -> CompiledTemplateSet:
+    """
+    Get the compiled form of a template set, compiling it on a cache miss.
+
+    Args:
+        templates: Template dicts
+
+    Returns:
+        Cached or newly compiled set
+    """
+    handle = template_set_handle(templates)
+    revision = get_templates_revision()
+
+    with _cache_lock:
+        compiled = _cache.get(handle)
+        if compiled is not None and compiled.revision == revision:
+            _cache.move_to_end(handle)
+            return compiled
+
+    compiled = CompiledTemplateSet(templates, handle, revision)
+    with _cache_lock:
+        _cache[handle] = compiled
+        _cache.move_to_end(handle)
+        while len(_cache) > MAX_TEMPLATE_SETS:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def get_template_set(handle: str) -> Optional[CompiledTemplateSet]:
+    """
+    Look up a compiled set by handle.
+
+    Args:
+        handle: Handle returned by match_templates
+
+    Returns:
+        Compiled set, or None if unknown, evicted or compiled before the
+        templates last changed
+    """
+    revision = get_templates_revision()
+    with _cache_lock:
+        compiled = _cache.get(handle)
+        if compiled is None:
+            return None
+        if compiled.revision != revision:
+            del _cache[handle]
+            return None
+        _cache.move_to_end(handle)
+        return compiled
+
+
+def clear_template_sets() -> None:
+    """Drop all compiled template sets of this process."""
+    with _cache_lock:
+        _cache.clear()
@@ -5,9 +5,11 @@ Tool implementations for trip-reconstructor MCP server.
 from . import (
     match_templates,
     calculate_template_completeness,
+    reconstruct_gaps,
 )
 
 __all__ = [
     "match_templates",
     "calculate_template_completeness",
+    "reconstruct_gaps",
 ]
@@ -1,13 +1,31 @@
 """
 Match templates to gap between checkpoints.
 
-Implements stateless template matching using hybrid GPS + address scoring.
+Implements template matching using hybrid GPS + address scoring. Template
+sets are compiled once and cached (see template_cache); responses carry the
+set's handle, which later calls may pass instead of the templates.
 """
 
 from datetime import datetime
-from typing import Dict, Any, List
-
-from ..matching import match_checkpoint_to_template
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..matching import (
+    ADDRESS_WEIGHT,
+    GPS_WEIGHT,
+    combine_hybrid_score,
+    match_checkpoint_to_template,
+    max_endpoint_score,
+    np,
+    prepare_templates_batch,
+    score_day_bonus,
+    score_distance_bonus,
+    score_distance_bonus_batch,
+    score_endpoints_batch,
+)
+from ..gap_solver import DEFAULT_TIME_BUDGET_MS, DEFAULT_TOLERANCE_KM, SOLVERS, solve_gap
+from ..prefilter import PREFILTER_STAGES
+from ..spatial_index import TemplateSpatialIndex
+from ..template_cache import CompiledTemplateSet, compile_templates, get_template_set
 
 
 INPUT_SCHEMA = {
@@ -28,13 +46,46 @@ INPUT_SCHEMA = {
             "description": "List of trip templates to match against",
             "items": {"type": "object"},
         },
+        "template_set": {
+            "type": "string",
+            "description": (
+                "Handle of an already sent template set (template_set of an earlier "
+                "response), instead of templates; expires when templates change"
+            ),
+        },
         "confidence_threshold": {
             "type": "number",
             "description": "Minimum confidence score (0-100, default 70)",
             "default": 70,
         },
+        "solver": {
+            "type": "string",
+            "enum": list(SOLVERS),
+            "description": (
+                "Gap-filling strategy: optimal (best coverage, confidence-weighted) "
+                "or greedy (confidence order)"
+            ),
+            "default": "optimal",
+        },
+        "tolerance_km": {
+            "type": "number",
+            "description": (
+                "Optimal solver: solutions within this many km of the best coverage "
+                "compete on confidence (default 50)"
+            ),
+            "default": DEFAULT_TOLERANCE_KM,
+        },
+        "prefilter": {
+            "type": "array",
+            "items": {"type": "string", "enum": list(PREFILTER_STAGES)},
+            "description": (
+                "Skip templates before scoring: distance (longer than the gap, never "
+                "in a proposal) and/or day (typical_days exclude the gap day)"
+            ),
+            "default": [],
+        },
     },
-    "required": ["gap_data", "templates"],
+    "required": ["gap_data"],
 }
 
 
@@ -67,8 +118,12 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
     """
     try:
         gap_data = arguments.get("gap_data", {})
-        templates = arguments.get("templates", [])
+        templates = arguments.get("templates")
+        template_set = arguments.get("template_set")
         confidence_threshold = arguments.get("confidence_threshold", 70)
+        solver = arguments.get("solver", "optimal")
+        tolerance_km = arguments.get("tolerance_km", DEFAULT_TOLERANCE_KM)
+        prefilter = arguments.get("prefilter", [])
 
         # Validate inputs
         if not gap_data:
@@ -80,135 +135,385 @@ async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
                 },
             }
 
-        if not isinstance(templates, list):
+        if templates is not None and template_set is not None:
             return {
                 "success": False,
                 "error": {
                     "code": "VALIDATION_ERROR",
-                    "message": "templates must be an array",
+                    "message": "Pass either templates or template_set, not both",
+                    "field": "template_set",
                 },
             }
 
-        # Extract gap data
-        distance_km = gap_data.get("distance_km", 0)
-        start_checkpoint = gap_data.get("start_checkpoint")
-        end_checkpoint = gap_data.get("end_checkpoint")
-
-        if not start_checkpoint or not end_checkpoint:
+        if templates is not None and not isinstance(templates, list):
             return {
                 "success": False,
                 "error": {
                     "code": "VALIDATION_ERROR",
-                    "message": "gap_data must include start_checkpoint and end_checkpoint",
+                    "message": "templates must be an array",
                 },
             }
 
-        # Check if both checkpoints have GPS
-        start_location = start_checkpoint.get("location", {})
-        end_location = end_checkpoint.get("location", {})
-
-        has_start_gps = start_location.get("coords") is not None
-        has_end_gps = end_location.get("coords") is not None
-
-        if not has_start_gps or not has_end_gps:
+        if solver not in SOLVERS:
             return {
                 "success": False,
                 "error": {
-                    "code": "GPS_REQUIRED",
-                    "message": "Both checkpoints must have GPS coordinates for template matching",
+                    "code": "VALIDATION_ERROR",
+                    "message": f"solver must be one of: {', '.join(SOLVERS)}",
+                    "field": "solver",
                 },
             }
 
-        # Get day of week for bonuses
-        start_day = get_day_of_week(start_checkpoint.get("datetime", ""))
+        if not isinstance(prefilter, list) or not set(prefilter) <= set(PREFILTER_STAGES):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"prefilter must be a list of: {', '.join(PREFILTER_STAGES)}",
+                    "field": "prefilter",
+                },
+            }
 
-        # Match all templates
-        matched_templates = []
+        if template_set is not None:
+            compiled = get_template_set(template_set)
+            if compiled is None:
+                return {
+                    "success": False,
+                    "error": {
+                        "code": "NOT_FOUND",
+                        "message": (
+                            f"Template set not found or expired: {template_set} "
+                            "(send templates again)"
+                        ),
+                        "field": "template_set",
+                    },
+                }
+        else:
+            compiled = compile_templates(templates or [])
 
-        for template in templates:
-            template_id = template.get("template_id")
-            template_name = template.get("name", "Unnamed")
+        return match_gap(
+            gap_data, compiled, confidence_threshold, solver, tolerance_km, prefilter
+        )
 
-            # Match start checkpoint to template FROM endpoint
-            start_match = match_checkpoint_to_template(
-                gap_checkpoint=start_checkpoint,
-                template=template,
-                endpoint='from',
-                gap_distance_km=distance_km,
-                gap_day_of_week=start_day,
-            )
+    except Exception as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": str(e),
+            },
+        }
 
-            # Match end checkpoint to template TO endpoint
-            end_match = match_checkpoint_to_template(
-                gap_checkpoint=end_checkpoint,
-                template=template,
-                endpoint='to',
-                gap_distance_km=distance_km,
-                gap_day_of_week=start_day,
-            )
 
-            # Check if both matches succeeded
-            if not start_match.get('success') or not end_match.get('success'):
-                continue
-
-            # Calculate average confidence score
-            start_score = start_match['score']
-            end_score = end_match['score']
-            avg_confidence = (start_score + end_score) / 2
-
-            # Filter by confidence threshold
-            if avg_confidence >= confidence_threshold:
-                matched_templates.append({
-                    "template_id": template_id,
-                    "template_name": template_name,
-                    "confidence_score": round(avg_confidence, 2),
-                    "start_match": {
-                        "score": round(start_score, 2),
-                        "distance_meters": start_match['details']['distance_meters'],
-                        "gps_score": start_match['details']['gps_score'],
-                        "address_score": start_match['details']['address_score'],
-                    },
-                    "end_match": {
-                        "score": round(end_score, 2),
-                        "distance_meters": end_match['details']['distance_meters'],
-                        "gps_score": end_match['details']['gps_score'],
-                        "address_score": end_match['details']['address_score'],
-                    },
-                    "template": template,
-                })
+def match_gap(
+    gap_data: Dict,
+    compiled: CompiledTemplateSet,
+    confidence_threshold: float = 70,
+    solver: str = "optimal",
+    tolerance_km: float = DEFAULT_TOLERANCE_KM,
+    prefilter: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Match templates to one gap and build its reconstruction proposal.
 
-        # Sort by confidence score (highest first)
-        matched_templates.sort(key=lambda x: x['confidence_score'], reverse=True)
+    Args:
+        gap_data: Gap analysis data (distance_km, start/end checkpoints)
+        compiled: Compiled template set to match against (reused across gaps)
+        confidence_threshold: Minimum average endpoint score
+        solver: Gap-filling solver (see gap_solver)
+        tolerance_km: Coverage tolerance of the optimal solver
+        prefilter: Candidate stages to run before scoring (see prefilter)
 
-        # Generate reconstruction proposal
-        proposal = generate_reconstruction_proposal(
-            gap_data=gap_data,
-            matched_templates=matched_templates,
-        )
+    Returns:
+        match_templates response
+    """
+    # Extract gap data
+    distance_km = gap_data.get("distance_km", 0)
+    start_checkpoint = gap_data.get("start_checkpoint")
+    end_checkpoint = gap_data.get("end_checkpoint")
 
+    if not start_checkpoint or not end_checkpoint:
         return {
-            "success": True,
-            "gap_distance_km": distance_km,
-            "templates_evaluated": len(templates),
-            "templates_matched": len(matched_templates),
-            "confidence_threshold": confidence_threshold,
-            "matched_templates": matched_templates,
-            "reconstruction_proposal": proposal,
+            "success": False,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "gap_data must include start_checkpoint and end_checkpoint",
+            },
         }
 
-    except Exception as e:
+    # Check if both checkpoints have GPS
+    start_location = start_checkpoint.get("location", {})
+    end_location = end_checkpoint.get("location", {})
+
+    has_start_gps = start_location.get("coords") is not None
+    has_end_gps = end_location.get("coords") is not None
+
+    if not has_start_gps or not has_end_gps:
         return {
             "success": False,
             "error": {
-                "code": "EXECUTION_ERROR",
-                "message": str(e),
+                "code": "GPS_REQUIRED",
+                "message": "Both checkpoints must have GPS coordinates for template matching",
             },
         }
 
+    # Get day of week for bonuses
+    start_day = get_day_of_week(start_checkpoint.get("datetime", ""))
+
+    # Optional distance/day candidate stage
+    if prefilter:
+        pruned, pruned_by = compiled.prefilter.prune(prefilter, distance_km, start_day)
+    else:
+        pruned, pruned_by = set(), {}
+
+    # Score templates (NumPy batch path for large template sets)
+    templates = compiled.templates
+    if compiled.batch is not None:
+        scored = score_templates_batch(
+            templates, start_checkpoint, end_checkpoint, distance_km, start_day,
+            confidence_threshold, prepared=compiled.batch, pruned=pruned,
+        )
+    else:
+        scored = score_templates(
+            templates, start_checkpoint, end_checkpoint, distance_km, start_day,
+            confidence_threshold, index=compiled.index, pruned=pruned,
+        )
+
+    # Match all templates
+    matched_templates = []
+
+    for template, start_match, end_match in scored:
+        template_id = template.get("template_id")
+        template_name = template.get("name", "Unnamed")
+
+        # Check if both matches succeeded
+        if not start_match.get('success') or not end_match.get('success'):
+            continue
+
+        # Calculate average confidence score
+        start_score = start_match['score']
+        end_score = end_match['score']
+        avg_confidence = (start_score + end_score) / 2
+
+        # Filter by confidence threshold
+        if avg_confidence >= confidence_threshold:
+            matched_templates.append({
+                "template_id": template_id,
+                "template_name": template_name,
+                "confidence_score": round(avg_confidence, 2),
+                "start_match": {
+                    "score": round(start_score, 2),
+                    "distance_meters": start_match['details']['distance_meters'],
+                    "gps_score": start_match['details']['gps_score'],
+                    "address_score": start_match['details']['address_score'],
+                },
+                "end_match": {
+                    "score": round(end_score, 2),
+                    "distance_meters": end_match['details']['distance_meters'],
+                    "gps_score": end_match['details']['gps_score'],
+                    "address_score": end_match['details']['address_score'],
+                },
+                "template": template,
+            })
+
+    # Sort by confidence score (highest first)
+    matched_templates.sort(key=lambda x: x['confidence_score'], reverse=True)
+
+    # Generate reconstruction proposal
+    proposal = generate_reconstruction_proposal(
+        gap_data=gap_data,
+        matched_templates=matched_templates,
+        solver=solver,
+        tolerance_km=tolerance_km,
+    )
+
+    return {
+        "success": True,
+        "gap_distance_km": distance_km,
+        "template_set": compiled.handle,
+        "templates_evaluated": len(templates),
+        "templates_pruned": len(pruned),
+        "pruned_by": pruned_by,
+        "templates_matched": len(matched_templates),
+        "confidence_threshold": confidence_threshold,
+        "matched_templates": matched_templates,
+        "reconstruction_proposal": proposal,
+    }
+
+
+def min_endpoint_score(confidence_threshold: float, other_score: float) -> float:
+    """
+    Lowest endpoint score that can still average to the threshold.
+
+    Args:
+        confidence_threshold: Minimum average of both endpoint scores
+        other_score: Score (or best possible score) of the other endpoint
+
+    Returns:
+        Minimum score, 0.01 lower so float rounding never drops a match
+    """
+    return 2 * confidence_threshold - other_score - 0.01
+
+
+def score_templates(
+    templates: List[Dict],
+    start_checkpoint: Dict,
+    end_checkpoint: Dict,
+    distance_km: float,
+    start_day: Optional[str],
+    confidence_threshold: float,
+    index: Optional[TemplateSpatialIndex] = None,
+    pruned: Optional[Set[int]] = None,
+) -> Iterator[Tuple[Dict, Dict, Dict]]:
+    """
+    Score template endpoints one by one (scalar path).
+
+    Templates whose best possible score misses the threshold are skipped
+    using the spatial index (an endpoint outside the GPS radius earns no
+    GPS points). Each endpoint is scored against the minimum it needs to
+    keep the template above the threshold, so address scoring stops early
+    for templates that cannot match. Positions in pruned are not scored.
+
+    Yields:
+        (template, start_match, end_match) as from match_checkpoint_to_template
+    """
+    if index is None:
+        index = TemplateSpatialIndex(templates)
+    start_coords = start_checkpoint["location"]["coords"]
+    end_coords = end_checkpoint["location"]["coords"]
+    near_start = index.near("from", start_coords["latitude"], start_coords["longitude"])
+    near_end = index.near("to", end_coords["latitude"], end_coords["longitude"])
+
+    for position, template in enumerate(templates):
+        if pruned and position in pruned:
+            continue
+        in_start, in_end = position in near_start, position in near_end
+        bonuses = (
+            score_distance_bonus(template.get("distance_km"), distance_km)
+            + score_day_bonus(start_day, template.get("typical_days"))
+        )
+        best_start = max_endpoint_score(in_start, bonuses)
+        best_end = max_endpoint_score(in_end, bonuses)
+        if (best_start + best_end) / 2 < confidence_threshold:
+            continue
+
+        # Match start checkpoint to template FROM endpoint
+        min_start = min_endpoint_score(confidence_threshold, best_end)
+        start_match = match_checkpoint_to_template(
+            gap_checkpoint=start_checkpoint,
+            template=template,
+            endpoint='from',
+            gap_distance_km=distance_km,
+            gap_day_of_week=start_day,
+            min_score=min_start,
+        )
+        if start_match.get('success') and start_match['score'] < min_start:
+            continue
+
+        # Match end checkpoint to template TO endpoint
+        end_match = match_checkpoint_to_template(
+            gap_checkpoint=end_checkpoint,
+            template=template,
+            endpoint='to',
+            gap_distance_km=distance_km,
+            gap_day_of_week=start_day,
+            min_score=min_endpoint_score(confidence_threshold, start_match.get('score', 0)),
+        )
+
+        yield template, start_match, end_match
+
+
+def score_templates_batch(
+    templates: List[Dict],
+    start_checkpoint: Dict,
+    end_checkpoint: Dict,
+    distance_km: float,
+    start_day: Optional[str],
+    confidence_threshold: float,
+    prepared: Optional[Dict[str, Any]] = None,
+    pruned: Optional[Set[int]] = None,
+) -> Iterator[Tuple[Dict, Dict, Dict]]:
+    """
+    Score template endpoints with NumPy (same results as score_templates).
+
+    Distances, GPS scores and bonuses are computed for all templates at
+    once; address scoring only runs for templates that can still reach the
+    threshold with full address points, and stops early as in the scalar
+    path. Templates missing either endpoint or in pruned (positions) are
+    skipped. prepared is prepare_templates_batch(templates), when already
+    computed.
+
+    Yields:
+        (template, start_match, end_match) as from match_checkpoint_to_template
+    """
+    if prepared is None:
+        prepared = prepare_templates_batch(templates)
+    usable = prepared["templates"]
+    if not usable:
+        return
+
+    start_location = start_checkpoint["location"]
+    end_location = end_checkpoint["location"]
+    start_coords = start_location["coords"]
+    end_coords = end_location["coords"]
+
+    start_distances, start_gps = score_endpoints_batch(
+        (start_coords["latitude"], start_coords["longitude"]), prepared["from_coords"]
+    )
+    end_distances, end_gps = score_endpoints_batch(
+        (end_coords["latitude"], end_coords["longitude"]), prepared["to_coords"]
+    )
+    distance_bonuses = score_distance_bonus_batch(prepared["distances_km"], distance_km)
+    day_bonuses = np.array(
+        [score_day_bonus(start_day, t.get("typical_days")) for t in usable], dtype=np.int64
+    )
+
+    # Best possible averages with full address points
+    bonuses = distance_bonuses + day_bonuses
+    best_start = np.minimum(start_gps * GPS_WEIGHT + 100 * ADDRESS_WEIGHT + bonuses, 100)
+    best_end = np.minimum(end_gps * GPS_WEIGHT + 100 * ADDRESS_WEIGHT + bonuses, 100)
+    reachable = (best_start + best_end) / 2 >= confidence_threshold
+    if pruned:
+        reachable &= ~np.isin(prepared["positions"], list(pruned))
+    candidates = np.flatnonzero(reachable)
+
+    for i in candidates.tolist():
+        template = usable[i]
+        # Minimum start score given the best end score, then the exact one
+        min_score = min_endpoint_score(confidence_threshold, float(best_end[i]))
+        matches = []
+        for endpoint, location, distances, gps in (
+            ("from", start_location, start_distances, start_gps),
+            ("to", end_location, end_distances, end_gps),
+        ):
+            details = combine_hybrid_score(
+                distance_meters=float(distances[i]),
+                gps_score=int(gps[i]),
+                gap_address=location.get("address"),
+                template_address=template.get(f"{endpoint}_address"),
+                distance_bonus=int(distance_bonuses[i]),
+                day_bonus=int(day_bonuses[i]),
+                min_score=min_score,
+            )
+            if details["total_score"] < min_score:
+                break
+            matches.append({
+                "success": True,
+                "endpoint": endpoint,
+                "score": details["total_score"],
+                "details": details,
+            })
+            min_score = min_endpoint_score(confidence_threshold, details["total_score"])
+        else:
+            yield template, matches[0], matches[1]
+
 
 def generate_reconstruction_proposal(
     gap_data: Dict,
     matched_templates: List[Dict],
+    solver: str = "optimal",
+    tolerance_km: float = DEFAULT_TOLERANCE_KM,
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
 ) -> Dict:
     """
     Generate reconstruction proposal from matched templates.
@@ -216,6 +521,9 @@ def generate_reconstruction_proposal(
     Args:
         gap_data: Gap analysis data
         matched_templates: List of matched templates (sorted by confidence)
+        solver: "optimal" (knapsack, greedy fallback) or "greedy"
+        tolerance_km: Coverage tolerance of the optimal solver
+        time_budget_ms: Time budget of the optimal solver
 
     Returns:
         Reconstruction proposal
@@ -228,45 +536,24 @@ def generate_reconstruction_proposal(
             "message": "No templates matched above confidence threshold",
         }
 
-    # Try to reconstruct gap with templates
-    proposed_trips = []
-    remaining_distance = gap_distance_km
+    allocation, solver_used = solve_gap(
+        gap_distance_km, matched_templates, solver, tolerance_km, time_budget_ms
+    )
 
-    for match in matched_templates:
+    proposed_trips = []
+    for match, num_trips, effective_distance in allocation:
         template = match['template']
-        template_distance = template.get('distance_km', 0)
-        is_round_trip = template.get('is_round_trip', False)
-
-        if template_distance == 0:
-            continue
-
-        # Calculate how many times this template fits
-        if is_round_trip:
-            # Round trip counts as 2x the distance
-            effective_distance = template_distance * 2
-        else:
-            effective_distance = template_distance
-
-        # Calculate number of trips (round down)
-        if effective_distance > 0:
-            num_trips = int(remaining_distance / effective_distance)
-
-            if num_trips > 0:
-                proposed_trips.append({
-                    "template_id": match['template_id'],
-                    "template_name": match['template_name'],
-                    "confidence_score": match['confidence_score'],
-                    "num_trips": num_trips,
-                    "distance_km": template_distance,
-                    "is_round_trip": is_round_trip,
-                    "total_distance_km": num_trips * effective_distance,
-                })
-
-                remaining_distance -= num_trips * effective_distance
-
-                # Stop if we've covered enough
-                if remaining_distance < 50:  # 50km threshold
-                    break
+        proposed_trips.append({
+            "template_id": match['template_id'],
+            "template_name": match['template_name'],
+            "confidence_score": match['confidence_score'],
+            "num_trips": num_trips,
+            "distance_km": template.get('distance_km', 0),
+            "is_round_trip": template.get('is_round_trip', False),
+            "total_distance_km": num_trips * effective_distance,
+        })
+
+    remaining_distance = gap_distance_km - sum(t["total_distance_km"] for t in proposed_trips)
 
     # Calculate coverage
     reconstructed_km = gap_distance_km - remaining_distance
@@ -279,6 +566,7 @@ def generate_reconstruction_proposal(
         "reconstructed_km": round(reconstructed_km, 2),
         "remaining_km": round(remaining_distance, 2),
         "coverage_percent": round(coverage_pct, 2),
+        "solver": solver_used,
         "reconstruction_quality": (
             "excellent" if coverage_pct >= 90 else
             "good" if coverage_pct >= 70 else
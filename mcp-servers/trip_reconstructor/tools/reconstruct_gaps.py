@@ -0,0 +1,403 @@
+"""
+Reconstruct every checkpoint gap of a vehicle in one call.
+
+Walks the vehicle's checkpoint timeline (car-log-core) for a date range,
+analyzes each consecutive checkpoint pair like detect_gap, and matches all
+gaps against one template set compiled once (see template_cache). Small
+batches run inline; larger ones run on a process pool that is kept between
+calls, its workers compiling the template set once when the pool starts.
+"""
+
+import asyncio
+import atexit
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..gap_solver import DEFAULT_TOLERANCE_KM, SOLVERS
+from ..prefilter import PREFILTER_STAGES
+from ..template_cache import CompiledTemplateSet, compile_templates
+from .match_templates import match_gap
+
+# Shared storage and tools from car-log-core
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from car_log_core.storage import get_checkpoint_timeline, read_record
+from car_log_core.tools import list_templates
+from car_log_core.tools.detect_gap import analyze_gap
+
+# Worker processes by default (1 = run gaps inline)
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+MAX_WORKERS = 32
+
+# Fewer matchable gaps than this run inline: matching one gap takes
+# milliseconds, far less than handing it to another process
+POOL_MIN_GAPS = 32
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "vehicle_id": {
+            "type": "string",
+            "format": "uuid",
+            "description": "Vehicle whose checkpoint gaps to reconstruct",
+        },
+        "start_date": {
+            "type": "string",
+            "format": "date",
+            "description": "First day of checkpoints to include (YYYY-MM-DD, optional)",
+        },
+        "end_date": {
+            "type": "string",
+            "format": "date",
+            "description": "Last day of checkpoints to include (YYYY-MM-DD, optional)",
+        },
+        "templates": {
+            "type": "array",
+            "description": "Templates to match against (default: all car-log-core templates)",
+            "items": {"type": "object"},
+        },
+        "confidence_threshold": {
+            "type": "number",
+            "description": "Minimum confidence score (0-100, default 70)",
+            "default": 70,
+        },
+        "solver": {
+            "type": "string",
+            "enum": list(SOLVERS),
+            "description": "Gap-filling strategy (see match_templates)",
+            "default": "optimal",
+        },
+        "tolerance_km": {
+            "type": "number",
+            "description": "Optimal solver coverage tolerance in km (default 50)",
+            "default": DEFAULT_TOLERANCE_KM,
+        },
+        "prefilter": {
+            "type": "array",
+            "items": {"type": "string", "enum": list(PREFILTER_STAGES)},
+            "description": "Candidate stages before scoring (see match_templates)",
+            "default": [],
+        },
+        "workers": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": MAX_WORKERS,
+            "description": (
+                f"Worker processes (default {DEFAULT_WORKERS}; 1 = no pool). "
+                f"Batches under {POOL_MIN_GAPS} gaps always run inline"
+            ),
+        },
+    },
+    "required": ["vehicle_id"],
+}
+
+
+# Per-worker compiled template set (set by _init_worker)
+_worker_templates: Optional[CompiledTemplateSet] = None
+
+# Process pool kept between calls, keyed on (template set handle, workers)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[tuple] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(templates: List[Dict], handle: str) -> None:
+    """Compile the template set once per worker process."""
+    global _worker_templates
+    _worker_templates = CompiledTemplateSet(templates, handle)
+
+
+def _get_pool(templates: List[Dict], handle: str, workers: int) -> ProcessPoolExecutor:
+    """
+    Pool whose workers hold the compiled template set.
+
+    Reused while the template set and worker count stay the same; otherwise
+    the old pool is shut down and a new one starts.
+    """
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and _pool_key == (handle, workers):
+            return _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(templates, handle),
+        )
+        _pool_key = (handle, workers)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker pool (it is started again on demand)."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_key = None, None
+
+
+atexit.register(shutdown_pool)
+
+
+def _match_in_worker(gap_data: Dict, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Match one gap against the worker's compiled templates."""
+    return _match(gap_data, _worker_templates, options)
+
+
+def _match(
+    gap_data: Dict,
+    compiled: CompiledTemplateSet,
+    options: Dict[str, Any],
+) -> Dict[str, Any]:
+    """match_gap with errors returned instead of raised (one bad gap never fails the batch)."""
+    try:
+        return match_gap(gap_data, compiled, **options)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": str(e),
+            },
+        }
+
+
+def find_gaps(
+    vehicle_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Analyze consecutive checkpoint pairs of a vehicle.
+
+    Args:
+        vehicle_id: Vehicle ID
+        start_date: First day (YYYY-MM-DD, inclusive; optional)
+        end_date: Last day (YYYY-MM-DD, inclusive; optional)
+
+    Returns:
+        detect_gap-style analyses in chronological order (failed analyses
+        keep their error; pairs with no distance driven are left out)
+    """
+    entries = [
+        entry for entry in get_checkpoint_timeline(vehicle_id)
+        if (start_date is None or entry["datetime"][:10] >= start_date)
+        and (end_date is None or entry["datetime"][:10] <= end_date)
+    ]
+
+    checkpoints = [read_record("checkpoints", entry["checkpoint_id"]) for entry in entries]
+    checkpoints = [checkpoint for checkpoint in checkpoints if checkpoint is not None]
+
+    gaps = []
+    for start_checkpoint, end_checkpoint in zip(checkpoints, checkpoints[1:]):
+        gap = analyze_gap(start_checkpoint, end_checkpoint)
+        if gap.get("success") and not gap["distance_km"]:
+            continue
+        gap["start_checkpoint_id"] = start_checkpoint.get("checkpoint_id")
+        gap["end_checkpoint_id"] = end_checkpoint.get("checkpoint_id")
+        gaps.append(gap)
+    return gaps
+
+
+def _gap_result(gap: Dict[str, Any], match: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compact per-gap entry of the response."""
+    result = {
+        "start_checkpoint_id": gap["start_checkpoint_id"],
+        "end_checkpoint_id": gap["end_checkpoint_id"],
+    }
+    if not gap.get("success"):
+        result.update({"success": False, "error": gap["error"]})
+        return result
+
+    result.update({
+        "start_datetime": gap["start_checkpoint"].get("datetime"),
+        "end_datetime": gap["end_checkpoint"].get("datetime"),
+        "distance_km": gap["distance_km"],
+        "days": gap["days"],
+        "reconstruction_recommended": gap["reconstruction_recommended"],
+        "success": match["success"],
+    })
+    if match["success"]:
+        result["templates_pruned"] = match["templates_pruned"]
+        result["templates_matched"] = match["templates_matched"]
+        result["reconstruction_proposal"] = match["reconstruction_proposal"]
+    else:
+        result["error"] = match["error"]
+    return result
+
+
+async def execute(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstruct all checkpoint gaps of a vehicle.
+
+    Args:
+        arguments: Tool input arguments
+
+    Returns:
+        Success response with one proposal per gap and a summary
+    """
+    try:
+        vehicle_id = (arguments.get("vehicle_id") or "").strip()
+        start_date = arguments.get("start_date")
+        end_date = arguments.get("end_date")
+        templates = arguments.get("templates")
+        solver = arguments.get("solver", "optimal")
+        workers = arguments.get("workers", DEFAULT_WORKERS)
+        options = {
+            "confidence_threshold": arguments.get("confidence_threshold", 70),
+            "solver": solver,
+            "tolerance_km": arguments.get("tolerance_km", DEFAULT_TOLERANCE_KM),
+            "prefilter": arguments.get("prefilter", []),
+        }
+
+        if not vehicle_id:
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "vehicle_id is required",
+                    "field": "vehicle_id",
+                },
+            }
+
+        for field, value in (("start_date", start_date), ("end_date", end_date)):
+            if value is not None and not DATE_PATTERN.match(str(value)):
+                return {
+                    "success": False,
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": f"{field} must be YYYY-MM-DD",
+                        "field": field,
+                    },
+                }
+
+        if templates is not None and not isinstance(templates, list):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "templates must be an array",
+                    "field": "templates",
+                },
+            }
+
+        if solver not in SOLVERS:
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"solver must be one of: {', '.join(SOLVERS)}",
+                    "field": "solver",
+                },
+            }
+
+        prefilter = options["prefilter"]
+        if not isinstance(prefilter, list) or not set(prefilter) <= set(PREFILTER_STAGES):
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"prefilter must be a list of: {', '.join(PREFILTER_STAGES)}",
+                    "field": "prefilter",
+                },
+            }
+
+        if not isinstance(workers, int) or not 1 <= workers <= MAX_WORKERS:
+            return {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"workers must be an integer between 1 and {MAX_WORKERS}",
+                    "field": "workers",
+                },
+            }
+
+        if read_record("vehicles", vehicle_id) is None:
+            return {
+                "success": False,
+                "error": {
+                    "code": "NOT_FOUND",
+                    "message": f"Vehicle not found: {vehicle_id}",
+                },
+            }
+
+        if templates is None:
+            listed = await list_templates.execute({})
+            if not listed.get("success"):
+                return listed
+            templates = listed["templates"]
+
+        compiled = compile_templates(templates)
+        gaps = find_gaps(vehicle_id, start_date, end_date)
+        matchable = [gap for gap in gaps if gap.get("success")]
+
+        # Match gaps: inline for one worker or a small batch, otherwise on
+        # the kept process pool
+        if workers == 1 or len(matchable) < POOL_MIN_GAPS:
+            matches = [_match(gap, compiled, options) for gap in matchable]
+        else:
+            loop = asyncio.get_running_loop()
+            pool = _get_pool(templates, compiled.handle, workers)
+            try:
+                matches = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _match_in_worker, gap, options)
+                    for gap in matchable
+                ))
+            except BrokenProcessPool:
+                # A worker died: start a fresh pool next time
+                shutdown_pool()
+                raise
+
+        match_iter = iter(matches)
+        results = [
+            _gap_result(gap, next(match_iter) if gap.get("success") else None)
+            for gap in gaps
+        ]
+
+        total_km = sum(r.get("distance_km", 0) for r in results)
+        reconstructed_km = sum(
+            r["reconstruction_proposal"].get("reconstructed_km", 0)
+            for r in results if r.get("success")
+        )
+
+        return {
+            "success": True,
+            "vehicle_id": vehicle_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "template_set": compiled.handle,
+            "templates_evaluated": len(templates),
+            "gaps_found": len(results),
+            "gaps": results,
+            "summary": {
+                "gaps_with_proposal": sum(
+                    1 for r in results
+                    if r.get("success") and r["reconstruction_proposal"].get("has_proposal")
+                ),
+                "gaps_failed": sum(1 for r in results if not r["success"]),
+                "total_gap_km": round(total_km, 2),
+                "reconstructed_km": round(reconstructed_km, 2),
+                "coverage_percent": (
+                    round(reconstructed_km / total_km * 100, 2) if total_km > 0 else 0
+                ),
+            },
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": {
+                "code": "EXECUTION_ERROR",
+                "message": str(e),
+            },
+        }
@@ -6,12 +6,28 @@ Threshold: ±10% variance is acceptable.
 """
 
 import os
-import json
+import sys
+from pathlib import Path
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from ..thresholds import DISTANCE_VARIANCE_PERCENT
 
+# Shared storage helpers from car-log-core
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from car_log_core.storage import (
+    iter_month_folders,
+    list_json_files,
+    path_exists,
+    read_json,
+    read_record,
+)
+
+# Month folders follow local trip time; pad the range so any pair of UTC
+# offsets (at most 26h apart) still lands inside the scanned months
+MONTH_PRUNE_SLACK = timedelta(days=2)
+
 # Input schema for MCP
 INPUT_SCHEMA = {
     "type": "object",
@@ -39,7 +55,7 @@ def get_data_path() -> str:
 
 def load_checkpoint(checkpoint_id: str) -> Dict[str, Any]:
     """
-    Load checkpoint from file.
+    Load checkpoint by ID.
 
     Args:
         checkpoint_id: UUID of checkpoint
@@ -50,24 +66,9 @@ def load_checkpoint(checkpoint_id: str) -> Dict[str, Any]:
     Raises:
         FileNotFoundError: If checkpoint doesn't exist
     """
-    data_path = get_data_path()
-
-    # Search through monthly folders
-    checkpoints_dir = os.path.join(data_path, "checkpoints")
-
-    if not os.path.exists(checkpoints_dir):
-        raise FileNotFoundError(f"Checkpoints directory not found: {checkpoints_dir}")
-
-    # Search all monthly folders
-    for month_dir in os.listdir(checkpoints_dir):
-        month_path = os.path.join(checkpoints_dir, month_dir)
-        if not os.path.isdir(month_path):
-            continue
-
-        checkpoint_file = os.path.join(month_path, f"{checkpoint_id}.json")
-        if os.path.exists(checkpoint_file):
-            with open(checkpoint_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+    checkpoint = read_record("checkpoints", checkpoint_id)
+    if checkpoint is not None:
+        return checkpoint
 
     raise FileNotFoundError(f"Checkpoint not found: {checkpoint_id}")
 
@@ -86,31 +87,25 @@ def list_trips_between(
     Returns:
         List of trip dictionaries
     """
-    data_path = get_data_path()
-    trips_dir = os.path.join(data_path, "trips")
+    trips_dir = Path(get_data_path()) / "trips"
 
-    if not os.path.exists(trips_dir):
+    if not path_exists(trips_dir):
         return []
 
     trips = []
     start_dt = datetime.fromisoformat(start_datetime.replace("Z", "+00:00"))
     end_dt = datetime.fromisoformat(end_datetime.replace("Z", "+00:00"))
 
-    # Search all monthly folders
-    for month_dir in os.listdir(trips_dir):
-        month_path = os.path.join(trips_dir, month_dir)
-        if not os.path.isdir(month_path):
-            continue
-
+    # Search monthly folders overlapping the range
+    for month_folder in iter_month_folders(
+        trips_dir, start_dt - MONTH_PRUNE_SLACK, end_dt + MONTH_PRUNE_SLACK
+    ):
         # Check each trip file
-        for filename in os.listdir(month_path):
-            if not filename.endswith(".json") or filename == "index.json":
+        for trip_file in list_json_files(month_folder):
+            trip = read_json(trip_file)
+            if trip is None:
                 continue
 
-            trip_file = os.path.join(month_path, filename)
-            with open(trip_file, "r", encoding="utf-8") as f:
-                trip = json.load(f)
-
             # Filter by vehicle and date range
             if trip.get("vehicle_id") != vehicle_id:
                 continue
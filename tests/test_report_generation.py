@@ -18,7 +18,22 @@ import sys
 # Add mcp-servers to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
 
+from report_generator.tools import generate_csv as generate_csv_module
+from report_generator.tools import generate_batch as generate_batch_module
+from report_generator.tools.generate_batch import execute as generate_reports_batch
 from report_generator.tools.generate_csv import execute as generate_csv
+from report_generator.tools import export_parquet as export_parquet_module
+from report_generator.tools import generate_pdf as generate_pdf_module
+from report_generator.tools.generate_pdf import execute as generate_pdf
+from car_log_core.storage import rebuild_index
+from car_log_core.tools.update_trip import execute as update_trip
+
+requires_reportlab = pytest.mark.skipif(
+    generate_pdf_module.canvas is None, reason="reportlab not installed"
+)
+requires_pyarrow = pytest.mark.skipif(
+    export_parquet_module.pa is None, reason="pyarrow not installed"
+)
 
 
 @pytest.fixture
@@ -270,5 +285,455 @@ async def test_summary_statistics_calculation(temp_data_dir):
     assert "km_per_l" not in str(result).lower()
 
 
+@pytest.mark.asyncio
+async def test_summary_matches_written_rows(temp_data_dir):
+    """A trip filed under the wrong month never skews the summary"""
+    with open(temp_data_dir / "trips" / "2025-11" / "trip-misfiled.json", "w") as f:
+        json.dump({
+            "trip_id": "trip-misfiled",
+            "vehicle_id": "vehicle-001",
+            "trip_start_datetime": "2025-12-02T08:00:00+01:00",
+            "distance_km": 999,
+            "purpose": "Business",
+        }, f)
+
+    result = await generate_csv({"start_date": "2025-11-01", "end_date": "2025-11-30"})
+    with open(result["output_file"], "r", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == result["summary"]["total_trips"] == 2
+    assert result["summary"]["total_distance_km"] == 820.0
+
+
+@pytest.mark.asyncio
+async def test_csv_streams_in_chunks(temp_data_dir, monkeypatch):
+    """Many trips written through small flushes: every row once, same summary"""
+    for day in range(1, 31):
+        for hour in range(8, 18):
+            trip_id = f"trip-{day:02d}-{hour}"
+            trip_file = temp_data_dir / "trips" / "2025-12" / f"{trip_id}.json"
+            trip_file.parent.mkdir(exist_ok=True)
+            with open(trip_file, "w") as f:
+                json.dump({
+                    "trip_id": trip_id,
+                    "vehicle_id": "vehicle-001",
+                    "driver_name": "Ján Kováč",
+                    "trip_start_datetime": f"2025-12-{day:02d}T{hour:02d}:00:00+01:00",
+                    "distance_km": 10 + hour,
+                    "purpose": "Business" if hour % 3 else "Personal",
+                    "business_description": 'Client "A", Bratislava',
+                    "fuel_efficiency_l_per_100km": 7.5,
+                }, f)
+
+    monkeypatch.setattr(generate_csv_module, "FLUSH_BYTES", 512)
+    result = await generate_csv({
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-31",
+        "business_only": True,
+    })
+
+    expected = generate_csv_module.load_trips_in_range(
+        "2025-11-01", "2025-12-31", purpose="Business"
+    )
+    with open(result["output_file"], "r", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    assert result["trip_count"] == len(expected) == 2 + 30 * 7
+    assert [row["trip_start_datetime"] for row in rows] == [
+        trip["trip_start_datetime"] for trip in expected
+    ]
+    assert rows[-1]["business_description"] == 'Client "A", Bratislava'
+    assert result["summary"] == generate_csv_module.calculate_summary(expected)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_report_is_not_rewritten(temp_data_dir):
+    """Same inputs return the existing report; force rewrites it"""
+    arguments = {"start_date": "2025-11-01", "end_date": "2025-11-30"}
+    first = await generate_csv(arguments)
+    output_path = Path(first["output_file"])
+    assert first["regenerated"] is True
+    assert generate_csv_module.fingerprint_path(output_path).exists()
+    assert generate_csv_module.is_report_stale(output_path) is False
+
+    mtime = output_path.stat().st_mtime_ns
+    second = await generate_csv(arguments)
+    assert second["regenerated"] is False
+    assert second["summary"] == first["summary"]
+    assert second["trip_count"] == first["trip_count"]
+    assert output_path.stat().st_mtime_ns == mtime
+
+    forced = await generate_csv({**arguments, "force": True})
+    assert forced["regenerated"] is True
+
+    # Other arguments, same file name: not the same report
+    personal = await generate_csv({**arguments, "business_only": False})
+    assert personal["regenerated"] is True
+    assert personal["trip_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_changed_trips_make_report_stale(temp_data_dir):
+    """Editing, adding a trip or changing the vehicle invalidates the fingerprint"""
+    arguments = {"start_date": "2025-11-01", "end_date": "2025-11-30"}
+    output_path = Path((await generate_csv(arguments))["output_file"])
+
+    trip_file = temp_data_dir / "trips" / "2025-11" / "trip-001.json"
+    trip = json.loads(trip_file.read_text())
+    trip["distance_km"] = 4100
+    trip_file.write_text(json.dumps(trip))
+
+    assert generate_csv_module.is_report_stale(output_path) is True
+    result = await generate_csv(arguments)
+    assert result["regenerated"] is True
+    with open(output_path, "r", encoding="utf-8") as f:
+        assert [row["distance_km"] for row in csv.DictReader(f)] == ["4100", "410"]
+    # The summary totals the rows written, whatever derived data says
+    assert result["summary"]["total_distance_km"] == 4510.0
+    assert generate_csv_module.is_report_stale(output_path) is False
+
+    vehicle_file = temp_data_dir / "vehicles" / "vehicle-001.json"
+    vehicle = json.loads(vehicle_file.read_text())
+    vehicle["license_plate"] = "BA-999XY"
+    vehicle_file.write_text(json.dumps(vehicle))
+    assert generate_csv_module.is_report_stale(output_path) is True
+    assert (await generate_csv(arguments))["regenerated"] is True
+
+    # A truncated report is never reused
+    output_path.write_text("trip_date\n")
+    assert generate_csv_module.is_report_stale(output_path) is True
+    assert (await generate_csv(arguments))["regenerated"] is True
+
+
+@requires_reportlab
+@pytest.mark.asyncio
+async def test_generate_pdf_pages(temp_data_dir):
+    """Summary page plus trip table pages; same totals as the CSV report"""
+    rows_per_page = generate_pdf_module.get_page_template().rows_per_page
+    for index in range(rows_per_page + 5):
+        trip_id = f"trip-pdf-{index:03d}"
+        with open(temp_data_dir / "trips" / "2025-11" / f"{trip_id}.json", "w") as f:
+            json.dump({
+                "trip_id": trip_id,
+                "vehicle_id": "vehicle-001",
+                "driver_name": "Ján Kováč",
+                "trip_start_datetime": f"2025-11-{index % 28 + 1:02d}T09:00:00+01:00",
+                "trip_end_datetime": f"2025-11-{index % 28 + 1:02d}T10:00:00+01:00",
+                "trip_start_location": "Bratislava, Mlynské nivy 12",
+                "trip_end_location": "Žilina",
+                "distance_km": 200,
+                "purpose": "Business",
+                "business_description": "Stretnutie s klientom " * 5,
+                "fuel_efficiency_l_per_100km": 6.5,
+            }, f)
+
+    arguments = {"start_date": "2025-11-01", "end_date": "2025-11-30"}
+    result = await generate_pdf(arguments)
+    csv_result = await generate_csv(arguments)
+
+    assert result["success"] is True
+    assert result["trip_count"] == csv_result["trip_count"] == rows_per_page + 7
+    assert result["page_count"] == 1 + 2
+    assert result["summary"] == csv_result["summary"]
+    assert result["output_file"].endswith("2025-11-report.pdf")
+    assert Path(result["output_file"]).read_bytes().startswith(b"%PDF")
+
+
+@requires_reportlab
+@pytest.mark.asyncio
+async def test_pdf_summary_matches_trip_table(temp_data_dir):
+    """The summary page totals the trips drawn, not the month's derived data"""
+    with open(temp_data_dir / "trips" / "2025-11" / "trip-misfiled.json", "w") as f:
+        json.dump({
+            "trip_id": "trip-misfiled",
+            "vehicle_id": "vehicle-001",
+            "trip_start_datetime": "2025-12-02T08:00:00+01:00",
+            "distance_km": 999,
+            "purpose": "Business",
+        }, f)
+
+    result = await generate_pdf({"start_date": "2025-11-01", "end_date": "2025-11-30"})
+    assert result["trip_count"] == result["summary"]["total_trips"] == 2
+    assert result["summary"]["total_distance_km"] == 820.0
+
+
+@requires_reportlab
+def test_pdf_cells_fit_columns():
+    """Long texts are cut to the column width with an ellipsis"""
+    template = generate_pdf_module.get_page_template()
+    fitted, width = template.cell("Bratislava, Mlynské nivy 12 " * 4, 100)
+    assert fitted.endswith("…")
+    assert width <= 100
+    assert template.cell("Košice", 100) == ("Košice", template.text_width("Košice", template.font))
+
+
+@pytest.mark.asyncio
+async def test_generate_pdf_without_reportlab(temp_data_dir, monkeypatch):
+    """Missing optional dependency is reported, not raised"""
+    monkeypatch.setattr(generate_pdf_module, "canvas", None)
+    result = await generate_pdf({"start_date": "2025-11-01", "end_date": "2025-11-30"})
+    assert result["success"] is False
+    assert result["error"]["code"] == "DEPENDENCY_MISSING"
+
+
+@requires_pyarrow
+@pytest.mark.asyncio
+async def test_export_parquet_typed_partitions(temp_data_dir, monkeypatch):
+    """Trips and checkpoints land in vehicle/month partitions with typed columns"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    add_batch_data(temp_data_dir)
+    (temp_data_dir / "checkpoints" / "2025-11").mkdir(parents=True)
+    with open(temp_data_dir / "checkpoints" / "2025-11" / "cp-001.json", "w") as f:
+        json.dump({
+            "checkpoint_id": "cp-001",
+            "vehicle_id": "vehicle-001",
+            "checkpoint_type": "refuel",
+            "datetime": "2025-11-01T07:30:00Z",
+            "odometer_km": 45000,
+            "location": {"address": "Bratislava", "coords": {"latitude": 48.14, "longitude": 17.11}},
+            "receipt": {"receipt_id": "O-123", "fuel_liters": 50.5},
+        }, f)
+
+    # Small batches: several record batches per partition file
+    monkeypatch.setattr(export_parquet_module, "BATCH_ROWS", 2)
+    result = await export_parquet_module.execute({
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-31",
+    })
+
+    assert result["success"] is True
+    assert result["row_counts"] == {"trips": 3 + 10, "checkpoints": 1}
+    partitions = {(f["collection"], f["vehicle_id"], f["month"]): f["rows"] for f in result["files"]}
+    assert partitions == {
+        ("trips", "vehicle-001", "2025-11"): 3,
+        ("trips", "vehicle-001", "2025-12"): 5,
+        ("trips", "vehicle-002", "2025-12"): 5,
+        ("checkpoints", "vehicle-001", "2025-11"): 1,
+    }
+
+    trips_file = Path(result["output_dir"]) / "trips" / "vehicle_id=vehicle-001" / "month=2025-11" / "part-0.parquet"
+    assert pq.ParquetFile(trips_file).num_row_groups == 2
+    table = pq.read_table(trips_file)
+    assert table.column_names == ["trip_id"] + generate_csv_module.FIELDNAMES
+    assert table.schema.field("trip_start_datetime").type == pa.timestamp("us")
+    assert table.schema.field("trip_date").type == pa.date32()
+    assert table.schema.field("distance_km").type == pa.float64()
+    rows = table.to_pylist()
+    assert [row["trip_id"] for row in rows] == ["trip-001", "trip-002", "trip-003"]
+    assert rows[0]["vehicle_vin"] == "WBAXX01234ABC5678"
+    assert rows[0]["trip_start_datetime"].isoformat() == "2025-11-01T08:00:00"
+    assert rows[0]["fuel_efficiency_l_per_100km"] == 8.5
+
+    checkpoints = pq.read_table(
+        Path(result["output_dir"]) / "checkpoints" / "vehicle_id=vehicle-001" / "month=2025-11" / "part-0.parquet"
+    ).to_pylist()
+    assert checkpoints[0]["odometer_km"] == 45000.0
+    assert checkpoints[0]["latitude"] == 48.14
+    assert checkpoints[0]["fuel_liters"] == 50.5
+
+    # Re-export replaces the previous files
+    again = await export_parquet_module.execute({
+        "start_date": "2025-11-01",
+        "end_date": "2025-12-31",
+        "vehicle_id": "vehicle-002",
+        "collections": ["trips"],
+    })
+    assert again["row_counts"] == {"trips": 5}
+    assert not (Path(again["output_dir"]) / "checkpoints").exists()
+
+
+@pytest.mark.asyncio
+async def test_export_parquet_without_pyarrow(temp_data_dir, monkeypatch):
+    """Missing optional dependency is reported, not raised"""
+    monkeypatch.setattr(export_parquet_module, "pa", None)
+    result = await export_parquet_module.execute({"start_date": "2025-11-01", "end_date": "2025-11-30"})
+    assert result["success"] is False
+    assert result["error"]["code"] == "DEPENDENCY_MISSING"
+
+
+def add_batch_data(data_dir):
+    """Second vehicle and December trips for both vehicles"""
+    with open(data_dir / "vehicles" / "vehicle-002.json", "w") as f:
+        json.dump({"vehicle_id": "vehicle-002", "vin": "TMBJJ7NE1J0123456", "license_plate": "KE-123AB"}, f)
+
+    (data_dir / "trips" / "2025-12").mkdir(exist_ok=True)
+    for vehicle_id in ("vehicle-001", "vehicle-002"):
+        for day in range(1, 6):
+            trip_id = f"trip-{vehicle_id}-{day}"
+            with open(data_dir / "trips" / "2025-12" / f"{trip_id}.json", "w") as f:
+                json.dump({
+                    "trip_id": trip_id,
+                    "vehicle_id": vehicle_id,
+                    "driver_name": "Ján Kováč",
+                    "trip_start_datetime": f"2025-12-{day:02d}T08:00:00+01:00",
+                    "distance_km": 100 + day,
+                    "purpose": "Business",
+                    "fuel_efficiency_l_per_100km": 6.0,
+                }, f)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2])
+async def test_reports_batch_matches_generate_csv(temp_data_dir, monkeypatch, workers):
+    """One report per (vehicle, month), same rows and summary as generate_csv"""
+    add_batch_data(temp_data_dir)
+    monkeypatch.setattr(generate_batch_module, "POOL_MIN_REPORTS", 1)
+
+    try:
+        result = await generate_reports_batch({
+            "vehicle_ids": ["vehicle-001", "vehicle-002"],
+            "periods": ["2025-12", "2025-11"],
+            "workers": workers,
+        })
+        pool = generate_batch_module._pool
+    finally:
+        generate_batch_module.shutdown_pool()
+    assert (pool is not None) == (workers > 1)
+
+    assert result["success"] is True
+    reports = {(r["vehicle_id"], r["period"]): r for r in result["reports"]}
+    assert list(reports) == [
+        ("vehicle-001", "2025-11"), ("vehicle-002", "2025-11"),
+        ("vehicle-001", "2025-12"), ("vehicle-002", "2025-12"),
+    ]
+    assert reports[("vehicle-002", "2025-11")]["output_file"] is None
+    assert reports[("vehicle-002", "2025-11")]["trip_count"] == 0
+    assert result["summary"]["reports_written"] == 3
+    assert result["summary"]["total_trips"] == 2 + 5 + 5
+
+    for (vehicle_id, period), report in reports.items():
+        if report["output_file"] is None:
+            continue
+        single = await generate_csv({
+            "start_date": f"{period}-01",
+            "end_date": f"{period}-{30 if period == '2025-11' else 31}",
+            "vehicle_id": vehicle_id,
+            "output_filename": f"single-{vehicle_id}.csv",
+        })
+        assert report["trip_count"] == single["trip_count"]
+        assert report["summary"] == single["summary"]
+        assert Path(report["output_file"]).read_bytes() == Path(single["output_file"]).read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_reports_batch_writes_fingerprints(temp_data_dir):
+    """Batch reports are up to date until their trips change"""
+    add_batch_data(temp_data_dir)
+    result = await generate_reports_batch({
+        "vehicle_ids": ["vehicle-001", "vehicle-002"],
+        "periods": ["2025-11", "2025-12"],
+        "workers": 2,
+    })
+    paths = {
+        (r["vehicle_id"], r["period"]): Path(r["output_file"])
+        for r in result["reports"] if r["output_file"]
+    }
+    fingerprints = {}
+    assert all(generate_csv_module.is_report_stale(p, fingerprints) is False for p in paths.values())
+    assert len(fingerprints) == 3
+
+    trip_file = temp_data_dir / "trips" / "2025-12" / "trip-vehicle-002-1.json"
+    trip = json.loads(trip_file.read_text())
+    trip["distance_km"] = 999
+    trip_file.write_text(json.dumps(trip))
+
+    assert generate_csv_module.is_report_stale(paths[("vehicle-002", "2025-12")]) is True
+    assert generate_csv_module.is_report_stale(paths[("vehicle-001", "2025-12")]) is False
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_write_is_atomic(temp_data_dir):
+    """A failed sidecar write leaves the previous sidecar intact"""
+    result = await generate_csv({"start_date": "2025-11-01", "end_date": "2025-11-30"})
+    output_path = Path(result["output_file"])
+    before = generate_csv_module.fingerprint_path(output_path).read_bytes()
+
+    with pytest.raises(TypeError):
+        generate_csv_module.write_fingerprint(output_path, {"fingerprint": object()})
+
+    assert generate_csv_module.fingerprint_path(output_path).read_bytes() == before
+    assert generate_csv_module.is_report_stale(output_path) is False
+    assert not list(output_path.parent.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_reports_batch_fingerprint_precedes_trip_reads(temp_data_dir, monkeypatch):
+    """A trip edited after the scan leaves a stale report, never a fresh-looking one"""
+    add_batch_data(temp_data_dir)
+    trip_file = temp_data_dir / "trips" / "2025-12" / "trip-vehicle-001-1.json"
+    load_trips = generate_batch_module.load_trips
+
+    def edit_then_load(rows):
+        trip = json.loads(trip_file.read_text())
+        trip["distance_km"] = 999
+        trip_file.write_text(json.dumps(trip))
+        return load_trips(rows)
+
+    monkeypatch.setattr(generate_batch_module, "load_trips", edit_then_load)
+    result = await generate_reports_batch({
+        "vehicle_ids": ["vehicle-001"], "periods": ["2025-12"], "workers": 1,
+    })
+
+    output_path = Path(result["reports"][0]["output_file"])
+    assert result["reports"][0]["summary"]["total_distance_km"] == 999 + 102 + 103 + 104 + 105
+    assert generate_csv_module.is_report_stale(output_path) is True
+
+
+def test_malformed_fingerprint_is_unknown(temp_data_dir):
+    """A partial or malformed sidecar means unknown, not an error"""
+    output_path = temp_data_dir / "reports" / "2025-11" / "2025-11-report.csv"
+    output_path.write_text("trip_date\n")
+    sidecar = generate_csv_module.fingerprint_path(output_path)
+
+    for content in (
+        '{"fingerprint": "x", "arguments": {"end_date": "2025-11-30"}}',
+        '{"fingerprint": "x", "arguments": {"start_date": "11/2025", "end_date": "2025-11-30"}}',
+        '["not", "an", "object"]',
+        '{"fingerprint": ',
+    ):
+        sidecar.write_text(content)
+        assert generate_csv_module.is_report_stale(output_path) is None
+
+
+@pytest.mark.asyncio
+async def test_reports_batch_includes_moved_trip(temp_data_dir):
+    """A trip whose date update_trip moved to December is in December's report"""
+    add_batch_data(temp_data_dir)
+    rebuild_index()
+
+    moved = await update_trip({
+        "trip_id": "trip-001",
+        "updates": {
+            "trip_start_datetime": "2025-12-20T08:00:00+01:00",
+            "trip_end_datetime": "2025-12-20T14:30:00+01:00",
+        },
+    })
+    assert moved["success"] is True, moved
+
+    result = await generate_reports_batch({
+        "vehicle_ids": ["vehicle-001"],
+        "periods": ["2025-11", "2025-12"],
+        "workers": 2,
+    })
+
+    reports = {r["period"]: r for r in result["reports"]}
+    assert reports["2025-11"]["trip_count"] == 1
+    assert reports["2025-12"]["trip_count"] == 6
+    with open(reports["2025-12"]["output_file"], "r", encoding="utf-8") as f:
+        assert "2025-12-20" in [row["trip_date"] for row in csv.DictReader(f)]
+
+
+@pytest.mark.asyncio
+async def test_reports_batch_validation(temp_data_dir):
+    """Bad periods and unknown vehicles fail the whole batch"""
+    result = await generate_reports_batch({"vehicle_ids": ["vehicle-001"], "periods": ["2025-13"]})
+    assert result["error"]["code"] == "VALIDATION_ERROR"
+    assert result["error"]["field"] == "periods"
+
+    result = await generate_reports_batch({"vehicle_ids": ["missing"], "periods": ["2025-11"]})
+    assert result["error"]["code"] == "NOT_FOUND"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,221 @@
+"""
+Tests for the optional SQLite storage backend and the migrate command.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add mcp-servers to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from car_log_core import storage
+from car_log_core.migrate import main as migrate_main
+from car_log_core.tools import (
+    create_checkpoint,
+    create_template,
+    create_trip,
+    create_vehicle,
+    delete_vehicle,
+    get_trip,
+    list_templates,
+    list_trips,
+    update_trip,
+)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """Point DATA_PATH at an empty temporary directory"""
+    os.environ["DATA_PATH"] = str(tmp_path)
+    yield tmp_path
+    del os.environ["DATA_PATH"]
+    os.environ.pop(storage.STORAGE_BACKEND_ENV, None)
+
+
+def use_backend(backend: str) -> None:
+    """Select storage backend for following tool calls"""
+    os.environ[storage.STORAGE_BACKEND_ENV] = backend
+
+
+async def create_sample_data() -> dict:
+    """Vehicle, two checkpoints, one trip and one template through the tools"""
+    result = await create_vehicle.execute({
+        "name": "Škoda Octavia Business",
+        "license_plate": "BA-456CD",
+        "vin": "WBAXX01234ABC5678",
+        "make": "Škoda",
+        "model": "Octavia",
+        "year": 2022,
+        "fuel_type": "Diesel",
+        "initial_odometer_km": 15000,
+    })
+    assert result["success"], result
+    vehicle_id = result["vehicle_id"]
+
+    checkpoint_ids = []
+    for when, odometer in (("2025-11-15T08:00:00Z", 15000), ("2025-11-15T14:00:00Z", 15410)):
+        result = await create_checkpoint.execute({
+            "vehicle_id": vehicle_id,
+            "checkpoint_type": "refuel",
+            "datetime": when,
+            "odometer_km": odometer,
+        })
+        assert result["success"], result
+        checkpoint_ids.append(result["checkpoint_id"])
+
+    result = await create_trip.execute({
+        "vehicle_id": vehicle_id,
+        "start_checkpoint_id": checkpoint_ids[0],
+        "end_checkpoint_id": checkpoint_ids[1],
+        "driver_name": "Ján Novák",
+        "trip_start_datetime": "2025-11-15T08:30:00Z",
+        "trip_end_datetime": "2025-11-15T13:30:00Z",
+        "trip_start_location": "Bratislava",
+        "trip_end_location": "Košice",
+        "distance_km": 410,
+        "purpose": "Business",
+        "business_description": "Client meeting",
+    })
+    assert result["success"], result
+    trip_id = result["trip_id"]
+
+    result = await create_template.execute({
+        "name": "Warehouse run",
+        "from_coords": {"lat": 48.1486, "lng": 17.1077},
+        "to_coords": {"lat": 48.7164, "lng": 21.2611},
+    })
+    assert result["success"], result
+
+    return {"vehicle_id": vehicle_id, "trip_id": trip_id, "checkpoint_ids": checkpoint_ids}
+
+
+@pytest.mark.asyncio
+async def test_tools_run_on_sqlite(data_path):
+    """CRUD tools work unchanged with records stored in SQLite"""
+    use_backend("sqlite")
+    ids = await create_sample_data()
+
+    # Nothing but the database (and its WAL files) is written
+    assert {p.name.split("-wal")[0].split("-shm")[0] for p in data_path.iterdir()} == {
+        storage.SQLITE_DB_NAME
+    }
+
+    result = await get_trip.execute({"trip_id": ids["trip_id"]})
+    assert result["trip"]["distance_km"] == 410
+
+    result = await update_trip.execute({
+        "trip_id": ids["trip_id"],
+        "updates": {"distance_km": 415},
+    })
+    assert result["success"], result
+
+    result = await list_trips.execute({"vehicle_id": ids["vehicle_id"]})
+    assert [t["distance_km"] for t in result["trips"]] == [415]
+    assert result["summary"]["total_distance_km"] == 415
+    assert result["summary"]["business_trips"] == 1
+
+    result = await list_templates.execute({})
+    assert [t["name"] for t in result["templates"]] == ["Warehouse run"]
+
+    result = await delete_vehicle.execute({"vehicle_id": ids["vehicle_id"], "cascade": True})
+    assert result["success"], result
+    result = await list_trips.execute({})
+    assert result["count"] == 0
+    assert storage.verify_index()["ok"]
+
+
+def test_unknown_backend_rejected(data_path):
+    """Typos in the backend name fail loudly instead of writing JSON"""
+    use_backend("mongodb")
+    with pytest.raises(ValueError):
+        storage.get_storage_backend()
+
+
+@pytest.mark.asyncio
+async def test_migrate_round_trip(data_path):
+    """Folders -> SQLite -> folders keeps every record and document"""
+    ids = await create_sample_data()
+
+    assert migrate_main(["--to", "sqlite"]) == 0
+    for name in ("vehicles", "checkpoints", "trips", "typical-destinations.json"):
+        path = data_path / name
+        if path.is_dir():
+            for child in path.rglob("*"):
+                if child.is_file():
+                    child.unlink()
+        else:
+            path.unlink()
+
+    use_backend("sqlite")
+    result = await get_trip.execute({"trip_id": ids["trip_id"]})
+    assert result["success"], result
+    result = await list_templates.execute({})
+    assert result["count"] == 1
+
+    assert migrate_main(["--to", "json"]) == 0
+    use_backend("json")
+    result = await list_trips.execute({})
+    assert [t["trip_id"] for t in result["trips"]] == [ids["trip_id"]]
+    assert storage.read_record("vehicles", ids["vehicle_id"])["license_plate"] == "BA-456CD"
+    assert storage.verify_index()["ok"]
+
+
+@pytest.mark.asyncio
+async def test_migrate_drops_records_deleted_on_other_backend(data_path):
+    """Records deleted on one backend do not come back after switching"""
+    ids = await create_sample_data()
+    assert migrate_main(["--to", "sqlite"]) == 0
+
+    # Deleted while on SQLite: the stale record file must go on export
+    use_backend("sqlite")
+    storage.delete_json(data_path / "trips" / "2025-11" / f"{ids['trip_id']}.json")
+    assert migrate_main(["--to", "json"]) == 0
+    use_backend("json")
+    assert (await list_trips.execute({}))["trips"] == []
+    assert storage.read_record("trips", ids["trip_id"]) is None
+    assert storage.verify_index()["ok"]
+
+    # Deleted while on JSON: the stale database rows must go on import
+    checkpoint_id = ids["checkpoint_ids"][0]
+    storage.delete_json(data_path / "checkpoints" / "2025-11" / f"{checkpoint_id}.json")
+    storage.delete_json(data_path / "typical-destinations.json")
+    assert migrate_main(["--to", "sqlite"]) == 0
+    use_backend("sqlite")
+    assert storage.read_record("checkpoints", checkpoint_id) is None
+    assert (await list_templates.execute({}))["count"] == 0
+    assert storage.read_record("vehicles", ids["vehicle_id"]) is not None
+
+
+def test_transactions_isolated_between_threads(data_path):
+    """A rolled-back transaction never takes another thread's write with it"""
+    import threading
+    import time
+
+    store = storage.SQLiteStore(data_path / storage.SQLITE_DB_NAME, storage.SQLITE_COLUMNS)
+    started = threading.Event()
+
+    def failing_transaction():
+        try:
+            with store.transaction():
+                store.put("trips", "2025-11", "trip-a", {"trip_id": "trip-a"})
+                started.set()
+                time.sleep(0.2)
+                raise RuntimeError("rollback")
+        except RuntimeError:
+            pass
+
+    def concurrent_write():
+        started.wait()
+        store.put("trips", "2025-11", "trip-b", {"trip_id": "trip-b"})
+
+    threads = [threading.Thread(target=failing_transaction), threading.Thread(target=concurrent_write)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.ids("trips") == ["trip-b"]
+    store.close()
@@ -0,0 +1,726 @@
+"""
+Tests for car-log-core storage layer (atomic writes, ID index, month manifests).
+"""
+
+import json
+import os
+import shutil
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+# Add mcp-servers to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp-servers"))
+
+from car_log_core import json_codec, storage
+from car_log_core.reindex import main as reindex_main
+from car_log_core.tools import get_trip, delete_trip, list_trips, update_trip
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """Point DATA_PATH at an empty temporary directory"""
+    os.environ["DATA_PATH"] = str(tmp_path)
+    yield tmp_path
+    del os.environ["DATA_PATH"]
+
+
+def write_trip(
+    data_path: Path,
+    trip_id: str,
+    month: str = "2025-11",
+    day: int = 3,
+    purpose: str = "Business",
+    distance_km: float = 120,
+) -> Path:
+    """Write a trip record through the storage API"""
+    trip_file = data_path / "trips" / month / f"{trip_id}.json"
+    storage.atomic_write_json(trip_file, {
+        "trip_id": trip_id,
+        "vehicle_id": "vehicle-001",
+        "trip_start_datetime": f"{month}-{day:02d}T08:00:00",
+        "distance_km": distance_km,
+        "purpose": purpose,
+    })
+    return trip_file
+
+
+def test_atomic_write_maintains_id_index(data_path):
+    """Record writes register the month folder in the ID index"""
+    trip_file = write_trip(data_path, "trip-001", "2024-03")
+
+    assert storage.find_record_file("trips", "trip-001") == trip_file
+    assert storage.read_record("trips", "trip-001")["distance_km"] == 120
+    assert storage.verify_index()["ok"]
+
+
+def test_delete_json_drops_index_entry(data_path):
+    """Deleted records disappear from the index"""
+    trip_file = write_trip(data_path, "trip-001")
+
+    assert storage.delete_json(trip_file)
+    assert not trip_file.exists()
+    assert storage.find_record_file("trips", "trip-001") is None
+    assert storage.verify_index()["ok"]
+
+
+def test_stale_index_falls_back_to_scan(data_path):
+    """Files moved by hand are still found and the index is repaired"""
+    trip_file = write_trip(data_path, "trip-001", "2025-10")
+
+    moved = data_path / "trips" / "2025-11" / "trip-001.json"
+    moved.parent.mkdir(parents=True)
+    os.replace(trip_file, moved)
+    assert not storage.verify_index()["ok"]
+
+    assert storage.find_record_file("trips", "trip-001") == moved
+    trips_report = storage.verify_index()["collections"]["trips"]
+    assert trips_report["missing"] == [] and trips_report["stale"] == []
+
+
+def test_rebuild_index_after_manual_edits(data_path):
+    """Reindex command picks up files written outside the storage API"""
+    (data_path / "trips" / "2025-11").mkdir(parents=True)
+    with open(data_path / "trips" / "2025-11" / "trip-manual.json", "w") as f:
+        json.dump({"trip_id": "trip-manual"}, f)
+    (data_path / "vehicles").mkdir()
+    with open(data_path / "vehicles" / "vehicle-001.json", "w") as f:
+        json.dump({"vehicle_id": "vehicle-001"}, f)
+
+    report = storage.verify_index()
+    assert report["collections"]["trips"]["missing"] == ["trip-manual"]
+    assert reindex_main(["--verify"]) == 1
+
+    assert reindex_main([]) == 0
+    assert storage.verify_index()["ok"]
+    assert reindex_main(["--verify"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_trip_tools_use_index(data_path):
+    """get_trip/delete_trip resolve records through the index"""
+    write_trip(data_path, "trip-001", "2023-01")
+
+    result = await get_trip.execute({"trip_id": "trip-001"})
+    assert result["success"]
+    assert result["trip"]["trip_id"] == "trip-001"
+
+    result = await delete_trip.execute({"trip_id": "trip-001"})
+    assert result["success"]
+
+    result = await get_trip.execute({"trip_id": "trip-001"})
+    assert result["error"]["code"] == "NOT_FOUND"
+
+
+def test_manifest_tracks_writes_and_deletes(data_path):
+    """Month manifest holds filter columns and follows record changes"""
+    write_trip(data_path, "trip-001", day=3)
+    trip_file = write_trip(data_path, "trip-002", day=5, purpose="Personal", distance_km=40)
+    month_folder = data_path / "trips" / "2025-11"
+
+    rows = {r["id"]: r for r in storage.read_manifest("trips", month_folder)}
+    assert rows["trip-002"] == {
+        "id": "trip-002",
+        "folder": "2025-11",
+        "vehicle_id": "vehicle-001",
+        "datetime": "2025-11-05T08:00:00",
+        "purpose": "Personal",
+        "distance_km": 40,
+    }
+
+    storage.delete_json(trip_file)
+    manifest = storage.read_json(month_folder / storage.MANIFEST_FILE_NAME)
+    assert manifest["columns"]["id"] == ["trip-001"]
+
+    # Manifest never shows up as a record
+    assert [f.stem for f in storage.list_json_files(month_folder)] == ["trip-001"]
+    assert storage.verify_index()["ok"]
+
+
+def test_manifest_reconciles_manual_files(data_path):
+    """Records added by hand are folded into the manifest on read"""
+    write_trip(data_path, "trip-001")
+    with open(data_path / "trips" / "2025-11" / "trip-manual.json", "w") as f:
+        json.dump({"trip_id": "trip-manual", "purpose": "Personal", "distance_km": 7}, f)
+
+    rows = list(storage.iter_manifest_rows("trips"))
+    assert sorted(r["id"] for r in rows) == ["trip-001", "trip-manual"]
+
+
+def test_manifest_reconciles_edited_files(data_path):
+    """Records edited by hand (same ID set) are re-read into the manifest"""
+    trip_file = write_trip(data_path, "trip-001", distance_km=120)
+    with open(trip_file, "w") as f:
+        json.dump({
+            "trip_id": "trip-001",
+            "vehicle_id": "vehicle-001",
+            "trip_start_datetime": "2025-11-03T08:00:00",
+            "purpose": "Personal",
+            "distance_km": 75,
+        }, f)
+
+    rows = list(storage.iter_manifest_rows("trips"))
+    assert rows[0]["purpose"] == "Personal"
+    assert rows[0]["distance_km"] == 75
+    assert storage.verify_index()["ok"]
+
+
+def _write_trips_in_process(data_path: str, prefix: str, count: int) -> None:
+    """Worker of test_concurrent_writers_keep_derived_data"""
+    os.environ["DATA_PATH"] = data_path
+    for i in range(count):
+        write_trip(Path(data_path), f"{prefix}-{i:03d}", day=1 + i % 28)
+
+
+def test_concurrent_writers_keep_derived_data(data_path):
+    """Processes writing the same month never drop each other's entries"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        futures = [
+            pool.submit(_write_trips_in_process, str(data_path), f"trip-{n}", 25)
+            for n in range(3)
+        ]
+        for future in futures:
+            future.result()
+
+    # The stored manifest itself (not a reconciled read) has every row
+    manifest = storage.read_json(data_path / "trips" / "2025-11" / storage.MANIFEST_FILE_NAME)
+    assert manifest["count"] == 75
+    assert storage.verify_index()["ok"]
+
+
+@pytest.mark.asyncio
+async def test_list_trips_filters_on_manifest(data_path):
+    """list_trips filters and summarizes from manifests, loads only limited rows"""
+    write_trip(data_path, "trip-001", "2025-10", day=20)
+    write_trip(data_path, "trip-002", "2025-11", day=2, purpose="Personal", distance_km=40)
+    write_trip(data_path, "trip-003", "2025-11", day=9)
+
+    result = await list_trips.execute({"limit": 2})
+    assert [t["trip_id"] for t in result["trips"]] == ["trip-003", "trip-002"]
+    assert result["summary"]["total_distance_km"] == 280
+    assert result["summary"]["personal_trips"] == 1
+
+    result = await list_trips.execute({
+        "purpose": "Business",
+        "start_date": "2025-11-01",
+        "end_date": "2025-11-30",
+    })
+    assert [t["trip_id"] for t in result["trips"]] == ["trip-003"]
+
+
+@pytest.mark.asyncio
+async def test_list_trips_pages_with_cursor(data_path):
+    """Pages follow next_cursor; summary always covers every matching trip"""
+    for day in range(1, 6):
+        write_trip(data_path, f"trip-{day:03d}", day=day, distance_km=10)
+    # Same start time as trip-003: ties are broken by ID
+    write_trip(data_path, "trip-003b", day=3, distance_km=10)
+
+    seen = []
+    cursor = None
+    while True:
+        arguments = {"limit": 4}
+        if cursor:
+            arguments["after"] = cursor
+        result = await list_trips.execute(arguments)
+        assert result["summary"]["total_distance_km"] == 60
+        seen.extend(t["trip_id"] for t in result["trips"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["trip-005", "trip-004", "trip-003b", "trip-003", "trip-002", "trip-001"]
+
+    result = await list_trips.execute({"after": {"datetime": "2025-11-03"}})
+    assert result["error"]["field"] == "after"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+async def test_update_trip_moves_to_new_month(data_path, monkeypatch, backend):
+    """A trip whose start date changes month is moved to that month's folder"""
+    monkeypatch.setenv(storage.STORAGE_BACKEND_ENV, backend)
+    for month in ("2025-01", "2025-02", "2025-03", "2025-04"):
+        write_trip(data_path, f"trip-{month}", month, day=10)
+
+    result = await update_trip.execute({
+        "trip_id": "trip-2025-01",
+        "updates": {"trip_start_datetime": "2025-06-10T08:00:00"},
+    })
+    assert result["success"], result
+
+    moved = data_path / "trips" / "2025-06" / "trip-2025-01.json"
+    assert storage.find_record_file("trips", "trip-2025-01") == moved
+    assert not storage.path_exists(data_path / "trips" / "2025-01" / "trip-2025-01.json")
+
+    result = await list_trips.execute({"start_date": "2025-06-01"})
+    assert [t["trip_id"] for t in result["trips"]] == ["trip-2025-01"]
+    assert result["summary"]["total_distance_km"] == 120
+
+    result = await list_trips.execute({"start_date": "2025-01-01", "end_date": "2025-01-31"})
+    assert result["trips"] == []
+    assert storage.verify_index()["ok"]
+
+    result = await update_trip.execute({
+        "trip_id": "trip-2025-01",
+        "updates": {"trip_start_datetime": "June 10"},
+    })
+    assert result["error"]["field"] == "trip_start_datetime"
+
+
+def test_select_newest_keeps_bounded_top(data_path):
+    """Heap selection matches a full sort"""
+    rows = [{"id": f"r{i:03d}", "datetime": f"2025-11-{i % 28 + 1:02d}T08:00:00"} for i in range(200)]
+    expected = sorted(rows, key=lambda r: (r["datetime"], r["id"]), reverse=True)
+
+    page, cursor = storage.select_newest(iter(rows), 7)
+    assert page == expected[:7]
+    assert cursor == {"datetime": expected[6]["datetime"], "id": expected[6]["id"]}
+
+    page, cursor = storage.select_newest(iter(rows), 500, after=cursor)
+    assert page == expected[7:]
+    assert cursor is None
+
+
+def test_select_newest_stops_on_row_month_not_folder(data_path):
+    """The early stop trusts a row's own datetime, not the folder it sits in"""
+    rows = [
+        {"id": "trip-apr", "folder": "2025-04", "datetime": "2025-04-10T08:00:00"},
+        {"id": "trip-mar", "folder": "2025-03", "datetime": "2025-03-10T08:00:00"},
+        {"id": "trip-jun", "folder": "2025-02", "datetime": "2025-06-10T08:00:00"},
+        {"id": "trip-jan", "folder": "2025-01", "datetime": "2025-01-10T08:00:00"},
+    ]
+    page, _ = storage.select_newest(iter(rows), 1, newest_months_first=True)
+    assert [row["id"] for row in page] == ["trip-jun"]
+
+
+@pytest.mark.asyncio
+async def test_list_trips_newest_after_moving_trip(data_path):
+    """A trip moved to a later month tops the unfiltered newest-first listing"""
+    for month in ("2025-01", "2025-02", "2025-03", "2025-04"):
+        write_trip(data_path, f"trip-{month}", month, day=10)
+    result = await update_trip.execute({
+        "trip_id": "trip-2025-01",
+        "updates": {"trip_start_datetime": "2025-06-10T08:00:00"},
+    })
+    assert result["success"], result
+
+    result = await list_trips.execute({"limit": 1})
+    assert [t["trip_id"] for t in result["trips"]] == ["trip-2025-01"]
+
+
+def test_iter_month_folders_prunes_by_range(data_path):
+    """Only month folders overlapping the date range are yielded, in order"""
+    for month in ("2025-12", "2024-01", "2025-10", "2025-11"):
+        write_trip(data_path, f"trip-{month}", month)
+    (data_path / "trips" / "archive").mkdir()
+
+    trips_dir = data_path / "trips"
+    names = [f.name for f in storage.iter_month_folders(trips_dir)]
+    assert names == ["2024-01", "2025-10", "2025-11", "2025-12", "archive"]
+
+    names = [
+        f.name for f in storage.iter_month_folders(
+            trips_dir, date(2025, 10, 15), datetime(2025, 11, 30, 23, 59)
+        )
+    ]
+    assert names == ["2025-10", "2025-11", "archive"]
+
+    rows = storage.iter_manifest_rows("trips", start=date(2025, 12, 1))
+    assert [r["id"] for r in rows] == ["trip-2025-12"]
+
+
+def test_list_trips_between_keeps_offset_boundary_trips(data_path):
+    """Range pruning keeps trips whose local month differs from the UTC range"""
+    from validation.tools.validate_checkpoint_pair import list_trips_between
+
+    trip_file = data_path / "trips" / "2025-10" / "trip-late.json"
+    storage.atomic_write_json(trip_file, {
+        "trip_id": "trip-late",
+        "vehicle_id": "vehicle-001",
+        "trip_start_datetime": "2025-10-31T23:30:00-02:00",
+        "distance_km": 10,
+    })
+    write_trip(data_path, "trip-early", "2025-09")
+
+    trips = list_trips_between(
+        "vehicle-001", "2025-11-01T00:00:00Z", "2025-11-30T23:59:59Z"
+    )
+    assert [t["trip_id"] for t in trips] == ["trip-late"]
+
+
+def test_batch_write_updates_index_and_manifest(data_path):
+    """Batch writes land every file and register them in index and manifest"""
+    month_folder = data_path / "trips" / "2025-11"
+    items = [
+        (month_folder / f"trip-{i:03d}.json", {"trip_id": f"trip-{i:03d}", "distance_km": i})
+        for i in range(20)
+    ]
+
+    assert storage.atomic_write_json_batch(items) == 20
+    assert storage.read_record("trips", "trip-007")["distance_km"] == 7
+    assert len(storage.read_manifest("trips", month_folder)) == 20
+    assert not list(month_folder.glob("*.tmp*"))
+    assert storage.verify_index()["ok"]
+
+
+def test_batch_write_rolls_back_on_rename_failure(data_path, monkeypatch):
+    """A failed rename restores overwritten files and removes new ones"""
+    existing = write_trip(data_path, "trip-001", distance_km=120)
+    month_folder = existing.parent
+    items = [
+        (existing, {"trip_id": "trip-001", "distance_km": 999}),
+        (month_folder / "trip-002.json", {"trip_id": "trip-002"}),
+        (month_folder / "trip-003.json", {"trip_id": "trip-003"}),
+    ]
+
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 3:
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        storage.atomic_write_json_batch(items)
+    monkeypatch.undo()
+
+    assert storage.read_json(existing)["distance_km"] == 120
+    assert sorted(f.name for f in month_folder.iterdir()) == [
+        storage.MANIFEST_FILE_NAME, "trip-001.json"
+    ]
+
+
+def test_read_cache_hits_and_invalidation(data_path):
+    """read_json serves repeat reads from cache and notices changes"""
+    storage.clear_read_cache()
+    trip_file = write_trip(data_path, "trip-001", distance_km=120)
+
+    first = storage.read_json(trip_file)
+    first["distance_km"] = 0  # callers get copies, the cache stays intact
+    assert storage.read_json(trip_file)["distance_km"] == 120
+    stats = storage.read_cache_stats()
+    assert stats["hits"] >= 1 and stats["misses"] >= 1
+
+    # Our own writes invalidate the entry
+    write_trip(data_path, "trip-001", distance_km=130)
+    assert storage.read_json(trip_file)["distance_km"] == 130
+
+    # External edits are detected through mtime/size
+    with open(trip_file, "w", encoding="utf-8") as f:
+        json.dump({"trip_id": "trip-001", "distance_km": 1400}, f)
+    assert storage.read_json(trip_file)["distance_km"] == 1400
+
+    storage.delete_json(trip_file)
+    assert storage.read_json(trip_file) is None
+
+
+def test_read_cache_is_bounded(data_path, monkeypatch):
+    """The LRU never holds more than CAR_LOG_READ_CACHE_SIZE documents"""
+    monkeypatch.setenv(storage.READ_CACHE_SIZE_ENV, "3")
+    storage.clear_read_cache()
+    files = [write_trip(data_path, f"trip-{i}") for i in range(5)]
+
+    for trip_file in files:
+        storage.read_json(trip_file)
+    assert storage.read_cache_stats()["size"] == 3
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "ujson"])
+@pytest.mark.parametrize("style", ["pretty", "compact"])
+def test_json_codecs_round_trip(data_path, monkeypatch, codec, style):
+    """Every codec/style writes files every other codec can read"""
+    if codec != "json":
+        pytest.importorskip(codec)
+    monkeypatch.setenv(json_codec.JSON_CODEC_ENV, codec)
+    monkeypatch.setenv(json_codec.JSON_STYLE_ENV, style)
+
+    trip_file = write_trip(data_path, "trip-001")
+    storage.atomic_write_json(trip_file, {"trip_id": "trip-001", "driver_name": "Ján Novák"})
+
+    raw = trip_file.read_text(encoding="utf-8")
+    assert "Ján Novák" in raw
+    assert ("\n" in raw) == (style == "pretty")
+    assert json.loads(raw)["driver_name"] == "Ján Novák"
+
+    monkeypatch.setenv(json_codec.JSON_CODEC_ENV, "json")
+    storage.clear_read_cache()
+    assert storage.read_json(trip_file)["driver_name"] == "Ján Novák"
+
+
+def test_json_codec_rejects_bad_settings(data_path, monkeypatch):
+    """Corrupted files raise JSONDecodeError and typos in settings fail loudly"""
+    trip_file = write_trip(data_path, "trip-001")
+    trip_file.write_text("{not json", encoding="utf-8")
+    storage.clear_read_cache()
+    with pytest.raises(json.JSONDecodeError):
+        storage.read_json(trip_file)
+
+    monkeypatch.setenv(json_codec.JSON_STYLE_ENV, "tiny")
+    with pytest.raises(ValueError):
+        json_codec.dumps({})
+    monkeypatch.setenv(json_codec.JSON_CODEC_ENV, "simdjson")
+    with pytest.raises(ValueError):
+        json_codec.get_codec_name()
+
+
+def write_checkpoint(data_path: Path, checkpoint_id: str, when: str, odometer_km: int,
+                     vehicle_id: str = "veh-001") -> Path:
+    """Write a minimal checkpoint record into its month folder"""
+    checkpoint_file = data_path / "checkpoints" / when[:7] / f"{checkpoint_id}.json"
+    storage.atomic_write_json(checkpoint_file, {
+        "checkpoint_id": checkpoint_id,
+        "vehicle_id": vehicle_id,
+        "datetime": when,
+        "odometer_km": odometer_km,
+    })
+    return checkpoint_file
+
+
+def test_checkpoint_timeline_neighbours(data_path):
+    """Predecessor/successor lookups follow writes and deletes across months"""
+    write_checkpoint(data_path, "cp-b", "2025-11-02T08:00:00Z", 10200)
+    write_checkpoint(data_path, "cp-a", "2025-10-30T08:00:00Z", 10000)
+    write_checkpoint(data_path, "cp-c", "2025-11-20T08:00:00Z", 10900)
+    write_checkpoint(data_path, "cp-x", "2025-11-10T08:00:00Z", 99999, vehicle_id="veh-002")
+
+    timeline = storage.get_checkpoint_timeline("veh-001")
+    assert [e["checkpoint_id"] for e in timeline] == ["cp-a", "cp-b", "cp-c"]
+
+    when = datetime.fromisoformat("2025-11-02T08:00:00+00:00")
+    assert storage.find_checkpoint_before("veh-001", when)["checkpoint_id"] == "cp-a"
+    assert storage.find_checkpoint_after("veh-001", when)["checkpoint_id"] == "cp-c"
+    assert storage.find_checkpoint_before("veh-001", when, exclude_id="cp-a") is None
+    # Naive datetimes are treated as UTC
+    assert storage.find_checkpoint_before("veh-001", datetime(2025, 12, 1))["odometer_km"] == 10900
+
+    storage.delete_json(data_path / "checkpoints" / "2025-10" / "cp-a.json")
+    assert storage.find_checkpoint_before("veh-001", when) is None
+    assert storage.verify_index()["ok"]
+
+
+def test_checkpoint_timeline_rebuilt(data_path):
+    """Missing timelines are built on first use; stale ones are reported and rebuilt"""
+    write_checkpoint(data_path, "cp-a", "2025-11-01T08:00:00Z", 10000)
+    timeline_file = data_path / ".index" / "timelines" / "veh-001.json"
+    timeline_file.unlink()
+
+    write_checkpoint(data_path, "cp-b", "2025-11-05T08:00:00Z", 10300)
+    assert [e["checkpoint_id"] for e in storage.get_checkpoint_timeline("veh-001")] == [
+        "cp-a", "cp-b"
+    ]
+
+    storage.atomic_write_json(timeline_file, {"vehicle_id": "veh-001", "entries": []})
+    assert storage.verify_index()["stale_timelines"] == ["veh-001"]
+    storage.rebuild_index()
+    assert storage.verify_index()["ok"]
+    assert len(storage.get_checkpoint_timeline("veh-001")) == 2
+
+
+def test_references_follow_writes_and_deletes(data_path):
+    """vehicle->checkpoints/trips and checkpoint->trips stay exact"""
+    write_checkpoint(data_path, "cp-a", "2025-11-01T08:00:00Z", 10000)
+    write_checkpoint(data_path, "cp-b", "2025-11-02T08:00:00Z", 10300)
+    trip_file = write_trip(data_path, "trip-001")
+    trip = storage.read_json(trip_file)
+    trip.update({"vehicle_id": "veh-001", "start_checkpoint_id": "cp-a", "end_checkpoint_id": "cp-b"})
+    storage.atomic_write_json(trip_file, trip)
+
+    assert storage.find_dependents("vehicles", "veh-001", "checkpoints") == ["cp-a", "cp-b"]
+    assert storage.find_dependents("vehicles", "veh-001", "trips") == ["trip-001"]
+    assert storage.find_dependents("checkpoints", "cp-b", "trips") == ["trip-001"]
+
+    # Re-pointing a trip moves it between parents
+    trip["end_checkpoint_id"] = "cp-c"
+    storage.atomic_write_json(trip_file, trip)
+    assert storage.find_dependents("checkpoints", "cp-b", "trips") == []
+    assert storage.find_dependents("checkpoints", "cp-c", "trips") == ["trip-001"]
+
+    assert storage.delete_json_batch([trip_file, data_path / "trips" / "2025-11" / "gone.json"]) == 1
+    assert storage.find_dependents("vehicles", "veh-001", "trips") == []
+    assert storage.verify_index()["ok"]
+
+    with pytest.raises(ValueError):
+        storage.find_dependents("trips", "trip-001", "vehicles")
+
+
+@pytest.mark.asyncio
+async def test_cascade_delete_uses_references(data_path):
+    """delete_checkpoint/delete_vehicle find dependents without reading other records"""
+    from car_log_core.tools import delete_checkpoint, delete_vehicle
+
+    storage.atomic_write_json(data_path / "vehicles" / "veh-001.json", {"vehicle_id": "veh-001"})
+    write_checkpoint(data_path, "cp-a", "2025-11-01T08:00:00Z", 10000)
+    trip_file = write_trip(data_path, "trip-001")
+    trip = storage.read_json(trip_file)
+    trip.update({"vehicle_id": "veh-001", "start_checkpoint_id": "cp-a"})
+    storage.atomic_write_json(trip_file, trip)
+    write_trip(data_path, "trip-002")
+
+    result = await delete_checkpoint.execute({"checkpoint_id": "cp-a"})
+    assert result["error"]["dependent_trips"] == ["trip-001"]
+
+    result = await delete_vehicle.execute({"vehicle_id": "veh-001", "cascade": True})
+    assert result["success"], result
+    assert not trip_file.exists()
+    assert (data_path / "trips" / "2025-11" / "trip-002.json").exists()
+    assert storage.verify_index()["ok"]
+
+
+def test_references_built_on_upgrade(data_path):
+    """Installs without references get them from record files on first use"""
+    write_checkpoint(data_path, "cp-a", "2025-11-01T08:00:00Z", 10000)
+    shutil.rmtree(data_path / ".index" / "refs")
+
+    write_checkpoint(data_path, "cp-b", "2025-11-02T08:00:00Z", 10300)
+    assert storage.find_dependents("vehicles", "veh-001", "checkpoints") == ["cp-a", "cp-b"]
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_templates_revision_changes_on_bump(data_path, monkeypatch, backend):
+    """Every bump yields a new revision token, on either backend"""
+    monkeypatch.setenv(storage.STORAGE_BACKEND_ENV, backend)
+    assert storage.get_templates_revision() is None
+
+    first = storage.bump_templates_revision()
+    assert storage.get_templates_revision() == first
+    second = storage.bump_templates_revision()
+    assert second != first
+    assert storage.get_templates_revision() == second
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_record_version_tracks_changes(data_path, monkeypatch, backend):
+    """Versions come from manifests and file stats; rewrites change them"""
+    monkeypatch.setenv(storage.STORAGE_BACKEND_ENV, backend)
+    write_trip(data_path, "trip-b", day=15)
+    trip_file = write_trip(data_path, "trip-a", day=3)
+
+    rows = list(storage.iter_trip_rows(purpose="Business"))
+    assert [row["id"] for row in rows] == ["trip-a", "trip-b"]
+
+    version = storage.record_version(trip_file)
+    assert version is not None
+    assert storage.record_version(trip_file) == version
+    write_trip(data_path, "trip-a", day=3, distance_km=1200)
+    assert storage.record_version(trip_file) != version
+    assert storage.record_version(data_path / "trips" / "2025-11" / "missing.json") is None
+
+
+def test_iter_trips_streams_in_datetime_order(data_path):
+    """Trips come out ordered across months, filtered on manifests, lazily"""
+    write_trip(data_path, "trip-c", month="2025-12", day=1)
+    write_trip(data_path, "trip-a", month="2025-10", day=30, purpose="Personal")
+    write_trip(data_path, "trip-b", month="2025-11", day=15)
+    write_trip(data_path, "trip-d", month="2025-11", day=2)
+
+    assert [t["trip_id"] for t in storage.iter_trips()] == ["trip-a", "trip-d", "trip-b", "trip-c"]
+    assert [t["trip_id"] for t in storage.iter_trips(reverse=True)][:2] == ["trip-c", "trip-b"]
+    assert [t["trip_id"] for t in storage.iter_trips(purpose="Personal")] == ["trip-a"]
+    assert [
+        t["trip_id"] for t in storage.iter_trips(start=date(2025, 11, 2), end=date(2025, 11, 30))
+    ] == ["trip-d", "trip-b"]
+    assert list(storage.iter_trips(vehicle_id="other")) == []
+
+    # Nothing is read until the consumer asks for it
+    stream = storage.iter_trips()
+    storage.clear_read_cache()
+    assert storage.read_cache_stats()["misses"] == 0
+    assert next(stream)["trip_id"] == "trip-a"
+
+
+def test_iter_checkpoints_filters_by_type(data_path):
+    """Checkpoint stream honours vehicle and type filters"""
+    write_checkpoint(data_path, "cp-b", "2025-11-02T08:00:00Z", 10300)
+    write_checkpoint(data_path, "cp-a", "2025-11-01T08:00:00Z", 10000)
+    write_checkpoint(data_path, "cp-x", "2025-11-03T08:00:00Z", 500, vehicle_id="veh-002")
+
+    assert [c["checkpoint_id"] for c in storage.iter_checkpoints("veh-001")] == ["cp-a", "cp-b"]
+    assert list(storage.iter_checkpoints(checkpoint_type="refuel")) == []
+
+
+def test_rollups_follow_trip_writes(data_path):
+    """Per-(vehicle, month, purpose) rollups change with every trip write/delete"""
+    write_trip(data_path, "trip-001", distance_km=100)
+    trip_file = write_trip(data_path, "trip-002", distance_km=200)
+    trip = storage.read_json(trip_file)
+    trip.update({"fuel_consumption_liters": 14, "fuel_efficiency_l_per_100km": 7.0})
+    storage.atomic_write_json(trip_file, trip)
+    write_trip(data_path, "trip-003", month="2025-12", purpose="Personal", distance_km=50)
+
+    rollups = list(storage.iter_rollups())
+    assert [(r["month"], r["purpose"], r["trips"]) for r in rollups] == [
+        ("2025-11", "Business", 2), ("2025-12", "Personal", 1)
+    ]
+
+    summary = storage.summarize_rollups(rollups)
+    assert summary["total_distance_km"] == 350
+    assert summary["business_distance_km"] == 300
+    assert summary["total_fuel_liters"] == 14
+    assert summary["average_efficiency_l_per_100km"] == 7.0
+
+    storage.delete_json(trip_file)
+    summary = storage.summarize_rollups(storage.iter_rollups(purpose="Business"))
+    assert (summary["total_trips"], summary["total_fuel_liters"]) == (1, 0)
+    assert storage.verify_index()["ok"]
+
+
+@pytest.mark.asyncio
+async def test_list_trips_summary_from_rollups_matches_rows(data_path):
+    """Rollup summary (no dates) equals the row-by-row summary (with dates)"""
+    for month in ("2025-09", "2025-10", "2025-11"):
+        for day in (3, 17):
+            write_trip(data_path, f"trip-{month}-{day}", month, day=day,
+                       purpose="Personal" if day == 17 else "Business", distance_km=day * 10)
+
+    from_rollups = await list_trips.execute({"limit": 1})
+    from_rows = await list_trips.execute({"start_date": "2025-01-01", "end_date": "2025-12-31"})
+    assert from_rollups["summary"] == from_rows["summary"]
+    assert from_rollups["summary"]["total_trips"] == 6
+    assert [t["trip_id"] for t in from_rollups["trips"]] == ["trip-2025-11-17"]
+
+
+def test_rollups_rebuilt_after_failed_write(data_path, monkeypatch):
+    """A rollup write that failed next to its manifest write is not trusted"""
+    trip_file = write_trip(data_path, "trip-001", distance_km=100)
+    assert storage.summarize_rollups(storage.iter_rollups())["total_distance_km"] == 100
+
+    def failing_write(month, rows):
+        raise OSError("disk full")
+
+    # Same trip count, new distance: only the manifest gets written
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, "_write_rollups", failing_write)
+        trip = storage.read_json(trip_file)
+        trip["distance_km"] = 400
+        storage.atomic_write_json(trip_file, trip)
+
+    assert storage.summarize_rollups(storage.iter_rollups())["total_distance_km"] == 400
+    assert storage.verify_index()["ok"]
+
+
+def test_rollups_checked_and_rebuilt(data_path):
+    """Stale rollups are reported by verify and fixed by rebuild"""
+    write_trip(data_path, "trip-001")
+    rollup_file = data_path / ".index" / "rollups" / "2025-11.json"
+    storage.atomic_write_json(rollup_file, {"month": "2025-11", "records": 1, "rollups": []})
+    assert storage.verify_index()["stale_rollups"] == ["2025-11"]
+
+    storage.rebuild_index()
+    assert storage.verify_index()["ok"]
+
+    # Old manifests without the fuel columns are rebuilt on read
+    manifest_file = data_path / "trips" / "2025-11" / "index.json"
+    manifest = storage.read_json(manifest_file)
+    del manifest["columns"]["fuel_liters"]
+    storage.atomic_write_json(manifest_file, manifest)
+    rows = storage.read_manifest("trips", data_path / "trips" / "2025-11")
+    assert [row["id"] for row in rows] == ["trip-001"]
+    assert "fuel_liters" in storage.read_json(manifest_file)["columns"]
@@ -0,0 +1,653 @@
+"""
+Unit tests for trip-reconstructor template matching.
+
+Covers the spatial pre-filter, the NumPy batch path and early-exit address
+scoring: all must return exactly what scoring every template one by one
+would. Also covers the optional distance/day pre-filter and the compiled
+template set cache with its invalidation.
+"""
+
+import itertools
+import pytest
+import os
+import random
+
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp-servers"))
+
+from trip_reconstructor import gap_solver, matching, template_cache
+from trip_reconstructor.matching import (
+    calculate_hybrid_score,
+    haversine_distance,
+    match_checkpoint_to_template,
+)
+from trip_reconstructor.prefilter import TemplatePrefilterIndex
+from trip_reconstructor.spatial_index import TemplateSpatialIndex
+from trip_reconstructor.tools import match_templates, reconstruct_gaps
+from car_log_core.tools import create_checkpoint, create_template, create_vehicle
+
+BRATISLAVA = (48.1486, 17.1077)
+KOSICE = (48.7164, 21.2611)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    """Point DATA_PATH at an empty temporary directory"""
+    os.environ["DATA_PATH"] = str(tmp_path)
+    yield tmp_path
+    del os.environ["DATA_PATH"]
+
+
+def checkpoint(lat, lng, address=None, when="2025-11-17T08:00:00Z"):
+    """Gap checkpoint with GPS coordinates"""
+    return {
+        "datetime": when,
+        "location": {"coords": {"latitude": lat, "longitude": lng}, "address": address},
+    }
+
+
+def synthetic_templates(count, seed=7):
+    """Templates scattered around Bratislava and Košice (some within 5 km)"""
+    rng = random.Random(seed)
+    templates = []
+    for i in range(count):
+        spread = rng.choice([0.01, 0.05, 0.5])
+        templates.append({
+            "template_id": f"tmpl-{i}",
+            "name": f"Route {i}",
+            "from_coords": {
+                "lat": BRATISLAVA[0] + rng.uniform(-spread, spread),
+                "lng": BRATISLAVA[1] + rng.uniform(-spread, spread),
+            },
+            "to_coords": {
+                "lat": KOSICE[0] + rng.uniform(-spread, spread),
+                "lng": KOSICE[1] + rng.uniform(-spread, spread),
+            },
+            "from_address": rng.choice(["Hlavná 12, Bratislava", "Mlynské nivy 1, Bratislava"]),
+            "to_address": rng.choice(["Hlavná 1, Košice", "Južná trieda 5, Košice"]),
+            "distance_km": rng.choice([400, 410, 450, 800]),
+            "typical_days": rng.choice([["Monday"], ["Friday"], []]),
+        })
+    return templates
+
+
+def brute_force_matches(gap_data, templates, threshold):
+    """Template IDs and scores from scoring every template"""
+    expected = {}
+    for template in templates:
+        start = match_checkpoint_to_template(
+            gap_data["start_checkpoint"], template, "from", gap_data["distance_km"], "Monday"
+        )
+        end = match_checkpoint_to_template(
+            gap_data["end_checkpoint"], template, "to", gap_data["distance_km"], "Monday"
+        )
+        average = (start["score"] + end["score"]) / 2
+        if average >= threshold:
+            expected[template["template_id"]] = round(average, 2)
+    return expected
+
+
+ADDRESSES = [
+    "Hlavná 12, Bratislava",
+    "Hlavna 12 Bratislava",
+    "Mlynské nivy 1, Bratislava",
+    "Hlavná 1, Košice",
+    "Južná trieda 5, Košice",
+    "Námestie SNP 3, Banská Bystrica",
+    "Prešov",
+]
+
+
+def plain_levenshtein(s1, s2):
+    """Reference edit distance (full dynamic programming table)"""
+    rows = [[i + j if i * j == 0 else 0 for j in range(len(s2) + 1)] for i in range(len(s1) + 1)]
+    for i in range(1, len(s1) + 1):
+        for j in range(1, len(s2) + 1):
+            substitution = rows[i - 1][j - 1] + (s1[i - 1] != s2[j - 1])
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, substitution)
+    return rows[-1][-1]
+
+
+class TestAddressScoring:
+    """Bounded edit distance and early-exit address scores stay exact."""
+
+    @pytest.mark.parametrize("use_rapidfuzz", [False, True])
+    def test_bounded_levenshtein(self, use_rapidfuzz, monkeypatch):
+        if use_rapidfuzz:
+            pytest.importorskip("rapidfuzz")
+        else:
+            monkeypatch.setattr(matching, "rapidfuzz_levenshtein", None)
+
+        words = ["", "hlavna", "hlavana", "mlynske nivy", "juzna trieda", "kosice", "a"]
+        for s1 in words:
+            for s2 in words:
+                exact = plain_levenshtein(s1, s2)
+                assert matching.levenshtein_distance(s1, s2) == exact
+                for bound in range(0, 8):
+                    bounded = matching.levenshtein_distance(s1, s2, bound)
+                    assert bounded == (exact if exact <= bound else bound + 1)
+
+    @pytest.mark.parametrize("use_rapidfuzz", [False, True])
+    def test_min_score_never_changes_reachable_scores(self, use_rapidfuzz, monkeypatch):
+        if use_rapidfuzz:
+            pytest.importorskip("rapidfuzz")
+        else:
+            monkeypatch.setattr(matching, "rapidfuzz_levenshtein", None)
+
+        for address1 in ADDRESSES:
+            for address2 in ADDRESSES:
+                exact = matching.score_address_match(address1, address2)
+                for min_score in range(-10, 111, 5):
+                    score = matching.score_address_match(address1, address2, min_score)
+                    if exact >= min_score:
+                        assert score == exact
+                    else:
+                        assert score <= exact
+
+    def test_components_are_copies(self):
+        components = matching.extract_address_components("Hlavná 12, Bratislava")
+        assert components == {
+            "city": "bratislava", "street": "hlavna", "number": "12",
+            "full": "hlavna 12, bratislava",
+        }
+        components["city"] = "nitra"
+        assert matching.extract_address_components("Hlavná 12, Bratislava")["city"] == "bratislava"
+
+
+class TestSpatialIndex:
+    """Grid lookups never miss an endpoint within the radius."""
+
+    def test_near_is_superset_of_radius(self):
+        templates = synthetic_templates(300)
+        index = TemplateSpatialIndex(templates)
+        lat, lng = BRATISLAVA
+
+        found = index.near("from", lat, lng)
+        for position, template in enumerate(templates):
+            coords = template["from_coords"]
+            if haversine_distance(lat, lng, coords["lat"], coords["lng"]) < 5000:
+                assert position in found
+        # And the grid actually prunes the far ones
+        assert len(found) < len(templates)
+
+    def test_antimeridian_and_missing_coords(self):
+        templates = [
+            {"from_coords": {"lat": 10.0, "lng": 179.99}},
+            {"from_coords": {"lat": 10.0, "lng": -179.99}},
+            {"to_coords": {"lat": 10.0, "lng": 0.0}},
+        ]
+        index = TemplateSpatialIndex(templates)
+        assert index.near("from", 10.0, 179.999) == {0, 1}
+        assert index.near("from", 10.0, 0.0) == set()
+
+
+class TestMatchTemplatesPruning:
+    """Pruned matching returns the same templates as exhaustive scoring."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("threshold", [40, 55, 65, 70, 85])
+    async def test_parity_with_exhaustive_scoring(self, threshold):
+        templates = synthetic_templates(200)
+        gap_data = {
+            "distance_km": 410,
+            "start_checkpoint": checkpoint(*BRATISLAVA, "Hlavná 12, Bratislava"),
+            "end_checkpoint": checkpoint(*KOSICE, "Hlavná 1, Košice"),
+        }
+
+        result = await match_templates.execute({
+            "gap_data": gap_data,
+            "templates": templates,
+            "confidence_threshold": threshold,
+        })
+
+        assert result["success"], result
+        assert result["templates_evaluated"] == 200
+        matched = {m["template_id"]: m["confidence_score"] for m in result["matched_templates"]}
+        assert matched == brute_force_matches(gap_data, templates, threshold)
+
+
+class TestBatchScoring:
+    """NumPy batch functions agree with the scalar ones."""
+
+    def test_gps_scores_match_scalar(self):
+        np = pytest.importorskip("numpy")
+        templates = synthetic_templates(500)
+        coords = [(t["from_coords"]["lat"], t["from_coords"]["lng"]) for t in templates]
+        distances, scores = matching.score_endpoints_batch(BRATISLAVA, coords)
+
+        for (lat, lng), distance, score in zip(coords, distances, scores):
+            expected = calculate_hybrid_score(BRATISLAVA, (lat, lng))
+            assert float(distance) == pytest.approx(expected["distance_meters"], abs=0.01)
+            assert int(score) == expected["gps_score"]
+
+        # Exact threshold distances
+        boundaries = np.array([0, 99.99, 100, 499, 500, 1999, 2000, 4999.9, 5000, 9000.0])
+        assert matching.score_gps_match_batch(boundaries).tolist() == [
+            matching.score_gps_match(d) for d in boundaries.tolist()
+        ]
+
+    def test_distance_bonus_matches_scalar(self):
+        np = pytest.importorskip("numpy")
+        template_distances = [None, 0, -50, 100, 300, 369, 370, 400, 410, 451, 500, 520]
+        for gap_distance in (0, None, 410, 450):
+            bonuses = matching.score_distance_bonus_batch(
+                np.array([d or np.nan for d in template_distances], dtype=np.float64),
+                gap_distance,
+            )
+            assert bonuses.tolist() == [
+                matching.score_distance_bonus(d, gap_distance) for d in template_distances
+            ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("threshold", [40, 70, 85])
+    async def test_match_templates_batch_parity(self, threshold, monkeypatch):
+        pytest.importorskip("numpy")
+        templates = synthetic_templates(300)
+        templates.append({"template_id": "no-coords", "name": "Missing", "from_coords": None})
+        gap_data = {
+            "distance_km": 410,
+            "start_checkpoint": checkpoint(*BRATISLAVA, "Hlavná 12, Bratislava"),
+            "end_checkpoint": checkpoint(*KOSICE, "Hlavná 1, Košice"),
+        }
+        arguments = {
+            "gap_data": gap_data,
+            "templates": templates,
+            "confidence_threshold": threshold,
+        }
+
+        monkeypatch.setattr(template_cache, "BATCH_MIN_TEMPLATES", 10**9)
+        template_cache.clear_template_sets()
+        scalar = await match_templates.execute(arguments)
+        monkeypatch.setattr(template_cache, "BATCH_MIN_TEMPLATES", 1)
+        template_cache.clear_template_sets()
+        batch = await match_templates.execute(arguments)
+        template_cache.clear_template_sets()
+
+        assert scalar["success"] and batch["success"]
+        assert batch["matched_templates"] == scalar["matched_templates"]
+        assert batch["reconstruction_proposal"] == scalar["reconstruction_proposal"]
+
+
+class TestPrefilter:
+    """Distance/day pre-filter skips exactly the templates it reports."""
+
+    GAP_DATA = {
+        "distance_km": 410,
+        "start_checkpoint": checkpoint(*BRATISLAVA, "Hlavná 12, Bratislava"),
+        "end_checkpoint": checkpoint(*KOSICE, "Hlavná 1, Košice"),
+    }
+
+    def test_index_lookups(self):
+        index = TemplatePrefilterIndex([
+            {"distance_km": 300},
+            {"distance_km": 300, "is_round_trip": True},
+            {"distance_km": None, "typical_days": ["Monday"]},
+            {"distance_km": 500, "typical_days": ["Friday", "Saturday"]},
+            {"typical_days": []},
+        ])
+
+        assert sorted(index.longer_than(400)) == [1, 3]
+        assert index.longer_than(600) == []
+        assert index.not_on_day("Monday") == {3}
+        assert index.not_on_day("Friday") == {2}
+        assert index.not_on_day(None) == set()
+
+        pruned, pruned_by = index.prune(["day", "distance"], 400, "Sunday")
+        assert pruned == {1, 2, 3}
+        assert pruned_by == {"distance": 2, "day": 1}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("batch_min", [10**9, 1])
+    async def test_distance_stage_keeps_proposal(self, batch_min, monkeypatch):
+        if batch_min == 1:
+            pytest.importorskip("numpy")
+        monkeypatch.setattr(template_cache, "BATCH_MIN_TEMPLATES", batch_min)
+        template_cache.clear_template_sets()
+        templates = synthetic_templates(200)
+        arguments = {"gap_data": self.GAP_DATA, "templates": templates, "confidence_threshold": 55}
+
+        full = await match_templates.execute(arguments)
+        pruned = await match_templates.execute({**arguments, "prefilter": ["distance"]})
+        template_cache.clear_template_sets()
+
+        too_long = {t["template_id"] for t in templates if t["distance_km"] > 410}
+        assert full["templates_pruned"] == 0 and full["pruned_by"] == {}
+        assert pruned["templates_pruned"] == len(too_long) > 0
+        assert pruned["pruned_by"] == {"distance": len(too_long)}
+        assert pruned["matched_templates"] == [
+            m for m in full["matched_templates"] if m["template_id"] not in too_long
+        ]
+        assert pruned["reconstruction_proposal"] == full["reconstruction_proposal"]
+
+    @pytest.mark.asyncio
+    async def test_day_stage(self):
+        templates = synthetic_templates(200)
+        arguments = {"gap_data": self.GAP_DATA, "templates": templates, "confidence_threshold": 55}
+
+        full = await match_templates.execute(arguments)
+        pruned = await match_templates.execute({**arguments, "prefilter": ["day"]})
+
+        # 2025-11-17 is a Monday; templates without typical_days stay
+        off_day = {
+            t["template_id"] for t in templates
+            if t["typical_days"] and "Monday" not in t["typical_days"]
+        }
+        assert pruned["templates_pruned"] == len(off_day) > 0
+        assert pruned["matched_templates"] == [
+            m for m in full["matched_templates"] if m["template_id"] not in off_day
+        ]
+
+        result = await match_templates.execute({**arguments, "prefilter": ["weather"]})
+        assert result["error"]["field"] == "prefilter"
+
+
+class TestTemplateSetCache:
+    """Compiled template sets are reused by handle until templates change."""
+
+    GAP_DATA = {
+        "distance_km": 410,
+        "start_checkpoint": checkpoint(*BRATISLAVA, "Hlavná 12, Bratislava"),
+        "end_checkpoint": checkpoint(*KOSICE, "Hlavná 1, Košice"),
+    }
+
+    def test_handle_is_content_hash(self):
+        templates = synthetic_templates(20)
+        reordered = [dict(reversed(list(t.items()))) for t in templates]
+
+        handle = template_cache.template_set_handle(templates)
+        assert handle.startswith("tset-")
+        assert template_cache.template_set_handle(reordered) == handle
+        assert template_cache.template_set_handle(templates[1:]) != handle
+
+    @pytest.mark.asyncio
+    async def test_handle_reuse(self, data_path):
+        template_cache.clear_template_sets()
+        templates = synthetic_templates(50)
+
+        first = await match_templates.execute({"gap_data": self.GAP_DATA, "templates": templates})
+        again = await match_templates.execute({
+            "gap_data": self.GAP_DATA,
+            "template_set": first["template_set"],
+        })
+
+        assert first["success"] and again["success"], (first, again)
+        assert again == first
+        assert template_cache.compile_templates(templates) is (
+            template_cache.get_template_set(first["template_set"])
+        )
+
+        result = await match_templates.execute({
+            "gap_data": self.GAP_DATA,
+            "templates": templates,
+            "template_set": first["template_set"],
+        })
+        assert result["error"]["field"] == "template_set"
+
+    @pytest.mark.asyncio
+    async def test_template_change_invalidates(self, data_path):
+        template_cache.clear_template_sets()
+        first = await match_templates.execute({
+            "gap_data": self.GAP_DATA,
+            "templates": synthetic_templates(50),
+        })
+        assert first["success"], first
+
+        result = await create_template.execute({
+            "name": "Bratislava - Košice",
+            "from_coords": {"lat": BRATISLAVA[0], "lng": BRATISLAVA[1]},
+            "to_coords": {"lat": KOSICE[0], "lng": KOSICE[1]},
+        })
+        assert result["success"], result
+
+        result = await match_templates.execute({
+            "gap_data": self.GAP_DATA,
+            "template_set": first["template_set"],
+        })
+        assert not result["success"]
+        assert result["error"]["code"] == "NOT_FOUND"
+        assert result["error"]["field"] == "template_set"
+
+
+def matched(template_id, distance_km, confidence, is_round_trip=False):
+    """Matched-template entry as match_templates builds it"""
+    return {
+        "template_id": template_id,
+        "template_name": template_id,
+        "confidence_score": confidence,
+        "template": {"distance_km": distance_km, "is_round_trip": is_round_trip},
+    }
+
+
+class TestReconstructionProposal:
+    """Optimal gap filling beats greedy and keeps the proposal schema."""
+
+    def test_optimal_covers_what_greedy_leaves(self):
+        matches = [matched("long", 60, 95), matched("short", 50, 90)]
+        gap_data = {"distance_km": 100}
+
+        greedy = match_templates.generate_reconstruction_proposal(gap_data, matches, "greedy")
+        optimal = match_templates.generate_reconstruction_proposal(gap_data, matches)
+
+        assert greedy["remaining_km"] == 40
+        assert optimal["solver"] == "optimal"
+        assert optimal["remaining_km"] == 0
+        assert [(t["template_id"], t["num_trips"]) for t in optimal["proposed_trips"]] == [
+            ("short", 2)
+        ]
+        assert optimal.keys() == greedy.keys()
+        assert optimal["proposed_trips"][0].keys() == greedy["proposed_trips"][0].keys()
+
+    def test_round_trips_and_confidence_preference(self):
+        matches = [
+            matched("office", 25, 98, is_round_trip=True),
+            matched("client", 50, 80),
+            matched("warehouse", 7.5, 75),
+        ]
+        proposal = match_templates.generate_reconstruction_proposal({"distance_km": 410}, matches)
+
+        # 8 office round trips (400 km) beat 8 client trips on confidence;
+        # the last 10 km are only worth it within the tolerance
+        trips = {t["template_id"]: t["num_trips"] for t in proposal["proposed_trips"]}
+        assert trips["office"] == 8
+        assert proposal["reconstructed_km"] <= 410
+        assert proposal["remaining_km"] < 10
+
+    def test_never_exceeds_gap(self):
+        rng = random.Random(11)
+        matches = sorted(
+            (matched(f"t{i}", round(rng.uniform(3, 300), 1), round(rng.uniform(70, 100), 2))
+             for i in range(100)),
+            key=lambda m: m["confidence_score"], reverse=True,
+        )
+        for gap in (0, 2.9, 149.95, 820, 5000):
+            # Generous budget: this checks totals, not speed
+            proposal = match_templates.generate_reconstruction_proposal(
+                {"distance_km": gap}, matches, time_budget_ms=10_000
+            )
+            assert proposal["solver"] == "optimal"
+            assert proposal["reconstructed_km"] <= gap
+            greedy = match_templates.generate_reconstruction_proposal(
+                {"distance_km": gap}, matches, "greedy"
+            )
+            assert proposal["reconstructed_km"] >= greedy["reconstructed_km"] - 50
+
+    @pytest.mark.parametrize("use_numpy", [False, True])
+    def test_optimal_matches_exhaustive_search(self, use_numpy, monkeypatch):
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(gap_solver, "np", None)
+
+        def value(allocation):
+            return sum(num * distance * m["confidence_score"] for m, num, distance in allocation)
+
+        def exhaustive(gap, matches, tolerance_km):
+            """Best value within tolerance of the best coverage, all count combinations"""
+            capacity = int(gap / gap_solver.RESOLUTION_KM + 1e-9)
+            sizes = {}
+            for m in matches:
+                distance = gap_solver.effective_distance_km(m["template"])
+                sizes.setdefault(gap_solver._units(distance), (m, distance))
+            items = [(u, m, d) for u, (m, d) in sizes.items() if u <= capacity]
+            best = {}
+            for counts in itertools.product(*(range(capacity // u + 1) for u, _, _ in items)):
+                total = sum(n * u for n, (u, _, _) in zip(counts, items))
+                if total <= capacity:
+                    v = value([(m, n, d) for n, (_, m, d) in zip(counts, items)])
+                    best[total] = max(best.get(total, v), v)
+            lowest = max(best) - int(tolerance_km / gap_solver.RESOLUTION_KM + 1e-9)
+            return max(v for total, v in best.items() if total >= lowest)
+
+        rng = random.Random(5)
+        for _ in range(60):
+            matches = sorted(
+                (matched(f"t{i}", round(rng.uniform(3, 40), 1), round(rng.uniform(70, 100), 2),
+                         rng.random() < 0.3)
+                 for i in range(rng.randint(1, 3))),
+                key=lambda m: m["confidence_score"], reverse=True,
+            )
+            gap = round(rng.uniform(0, 120), 1)
+            tolerance_km = rng.choice([0, 5, 20, 50])
+            allocation = gap_solver.solve_optimal(gap, matches, tolerance_km, time_budget_ms=10_000)
+            assert sum(num * distance for _, num, distance in allocation) <= gap
+            assert value(allocation) == pytest.approx(exhaustive(gap, matches, tolerance_km))
+
+    def test_time_budget_falls_back_to_greedy(self):
+        matches = [matched("long", 60, 95), matched("short", 50, 90)]
+        proposal = match_templates.generate_reconstruction_proposal(
+            {"distance_km": 100}, matches, time_budget_ms=0
+        )
+        assert proposal["solver"] == "greedy"
+        assert proposal["remaining_km"] == 40
+
+    @pytest.mark.asyncio
+    async def test_unknown_solver_rejected(self):
+        result = await match_templates.execute({
+            "gap_data": {
+                "distance_km": 100,
+                "start_checkpoint": checkpoint(*BRATISLAVA),
+                "end_checkpoint": checkpoint(*KOSICE),
+            },
+            "templates": [],
+            "solver": "annealing",
+        })
+        assert result["error"]["code"] == "VALIDATION_ERROR"
+        assert result["error"]["field"] == "solver"
+
+
+async def create_month_of_checkpoints():
+    """Vehicle refuelling alternately in Bratislava and Košice, plus one template"""
+    result = await create_vehicle.execute({
+        "name": "Škoda Octavia Business",
+        "license_plate": "BA-456CD",
+        "vin": "WBAXX01234ABC5678",
+        "make": "Škoda",
+        "model": "Octavia",
+        "year": 2022,
+        "fuel_type": "Diesel",
+        "initial_odometer_km": 15000,
+    })
+    assert result["success"], result
+    vehicle_id = result["vehicle_id"]
+
+    stops = [
+        ("2025-10-30T08:00:00Z", 15000, BRATISLAVA, "Hlavná 12, Bratislava"),
+        ("2025-11-03T08:00:00Z", 15820, KOSICE, "Hlavná 1, Košice"),
+        ("2025-11-10T08:00:00Z", 16640, BRATISLAVA, "Hlavná 12, Bratislava"),
+        ("2025-11-17T08:00:00Z", 17460, KOSICE, "Hlavná 1, Košice"),
+        ("2025-11-24T08:00:00Z", 17500, KOSICE, None),
+    ]
+    for when, odometer, (lat, lng), address in stops:
+        arguments = {
+            "vehicle_id": vehicle_id,
+            "checkpoint_type": "refuel",
+            "datetime": when,
+            "odometer_km": odometer,
+            "location_coords": {"latitude": lat, "longitude": lng},
+        }
+        if address:
+            arguments["location_address"] = address
+        result = await create_checkpoint.execute(arguments)
+        assert result["success"], result
+
+    result = await create_template.execute({
+        "name": "Bratislava - Košice",
+        "from_coords": {"lat": BRATISLAVA[0], "lng": BRATISLAVA[1]},
+        "from_address": "Hlavná 12, Bratislava",
+        "to_coords": {"lat": KOSICE[0], "lng": KOSICE[1]},
+        "to_address": "Hlavná 1, Košice",
+        "distance_km": 410,
+        "is_round_trip": True,
+    })
+    assert result["success"], result
+    return vehicle_id
+
+
+class TestReconstructGaps:
+    """One call reconstructs every checkpoint gap in a date range."""
+
+    @pytest.mark.asyncio
+    async def test_month_of_gaps(self, data_path):
+        vehicle_id = await create_month_of_checkpoints()
+
+        result = await reconstruct_gaps.execute({
+            "vehicle_id": vehicle_id,
+            "start_date": "2025-11-01",
+            "end_date": "2025-11-30",
+            "workers": 1,
+        })
+
+        assert result["success"], result
+        # Checkpoints from Nov 3 on: three gaps
+        assert result["gaps_found"] == 3
+        first, second, last = result["gaps"]
+        # Košice -> Bratislava does not match the Bratislava -> Košice template
+        assert first["distance_km"] == 820
+        assert first["templates_matched"] == 0
+        assert second["reconstruction_proposal"]["coverage_percent"] == 100
+        assert second["reconstruction_proposal"]["proposed_trips"][0]["num_trips"] == 1
+        assert last["distance_km"] == 40
+        assert result["summary"]["total_gap_km"] == 820 + 820 + 40
+        assert result["summary"]["gaps_with_proposal"] == 1
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_matches_inline(self, data_path, monkeypatch):
+        monkeypatch.setattr(reconstruct_gaps, "POOL_MIN_GAPS", 1)
+        vehicle_id = await create_month_of_checkpoints()
+
+        try:
+            inline = await reconstruct_gaps.execute({"vehicle_id": vehicle_id, "workers": 1})
+            pooled = await reconstruct_gaps.execute({"vehicle_id": vehicle_id, "workers": 2})
+            pool = reconstruct_gaps._pool
+            again = await reconstruct_gaps.execute({"vehicle_id": vehicle_id, "workers": 2})
+
+            assert inline["success"] and pooled["success"], (inline, pooled)
+            assert inline["gaps_found"] == 4
+            assert pooled == inline
+            # Same template set: the pool is kept
+            assert pool is not None and reconstruct_gaps._pool is pool
+            assert again == pooled
+        finally:
+            reconstruct_gaps.shutdown_pool()
+
+    @pytest.mark.asyncio
+    async def test_small_batches_run_inline(self, data_path):
+        reconstruct_gaps.shutdown_pool()
+        vehicle_id = await create_month_of_checkpoints()
+
+        result = await reconstruct_gaps.execute({"vehicle_id": vehicle_id, "workers": 2})
+
+        assert result["success"] and result["gaps_found"] == 4
+        assert reconstruct_gaps._pool is None
+
+    @pytest.mark.asyncio
+    async def test_validation(self, data_path):
+        result = await reconstruct_gaps.execute({"vehicle_id": "missing"})
+        assert result["error"]["code"] == "NOT_FOUND"
+
+        result = await reconstruct_gaps.execute({"vehicle_id": "v", "start_date": "11/2025"})
+        assert result["error"]["field"] == "start_date"
+
+        result = await reconstruct_gaps.execute({"vehicle_id": "v", "workers": 0})
+        assert result["error"]["field"] == "workers"